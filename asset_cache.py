@@ -0,0 +1,241 @@
+# asset_cache.py
+import os
+import json
+import mmap
+import time
+import struct
+import hashlib
+import threading
+import pygame
+from startup_profile import startup_profiler
+
+ASSET_CACHE_PATH = "assets/cache/assets.bin"
+CACHE_MAGIC = b"GTBC"
+CACHE_VERSION = 3 # 3: variants are nearest-neighbour scaled, like images without variants
+HEADER = struct.Struct("<4sIQI") # magic, version, index offset, index length; the JSON index follows the pixel blocks
+ALIGNMENT = 16 # Pixel blocks start on 16-byte boundaries
+
+def _source_hash(path):
+    """SHA-1 of a source image file, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def _source_stat(path):
+    """[size, mtime_ns] of a source image file, or None if it cannot be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _entry_key(path, alpha, scale_to):
+    return f"{path}|{'RGBA' if alpha else 'RGB'}|{scale_to[0]}x{scale_to[1]}" if scale_to else f"{path}|{'RGBA' if alpha else 'RGB'}"
+
+class AssetCache:
+    """
+    One binary file holding every image already converted (and scaled) the way the
+    game uses it: raw RGB/RGBA pixel blocks followed by a JSON index. The file is
+    memory-mapped and surfaces are built with pygame.image.frombuffer straight from
+    the mapping, so a cached image costs a stat of its source file and a convert
+    instead of a PNG decode.
+
+    Entries are keyed by (path, pixel format, scale) and store the SHA-1 of the source
+    file plus its size and mtime; an entry whose source changed is ignored. The source is
+    only hashed again when its size or mtime differ, and at most once per change for all
+    its entries. Images loaded from source are handed to put() and the file is rewritten
+    by save() (see AssetManager.shutdown), so stale or missing entries are rebuilt
+    automatically on the next run; so is a file that is corrupt or truncated.
+    """
+    def __init__(self, path=ASSET_CACHE_PATH):
+        self.path = path
+        self.index = {} # entry key -> {"hash", "offset", "size", "format"}
+        self.mapped = None # mmap of the file
+        self.buffer = None # memoryview over the mapped file
+        self.pending = {} # entry key -> (hash, stat, format, size, pixel bytes) to write on save()
+        self.source_hashes = {} # path -> (stat, SHA-1) of the source files looked at so far
+        self.lock = threading.Lock() # lookups also run on the prefetch worker
+        self.hits = 0
+        self.misses = 0
+        self._open()
+
+    def _open(self):
+        try:
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return # No cache yet (or an empty file): everything is a miss
+        try:
+            magic, version, index_offset, index_length = HEADER.unpack_from(mapped, 0)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                print(f"Ignoring asset cache {self.path}: unknown format")
+                mapped.close()
+                return
+            index = json.loads(bytes(mapped[index_offset:index_offset + index_length]))
+            for entry in index.values():
+                if entry["offset"] + entry["size"][0] * entry["size"][1] * len(entry["format"]) > index_offset:
+                    raise ValueError("pixel block past the index")
+        except (struct.error, ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+            print(f"Ignoring asset cache {self.path}: corrupt ({e}), it is rebuilt")
+            mapped.close()
+            return
+        self.index = index
+        self.mapped = mapped
+        self.buffer = memoryview(mapped)
+
+    def _close(self):
+        """
+        Unmaps the file, so it can be replaced (Windows refuses while it is mapped). False if
+        surfaces from lookup() that were not converted yet still use the mapping.
+        """
+        if self.mapped is None: return True
+        self.buffer.release()
+        try:
+            self.mapped.close()
+        except BufferError:
+            self.buffer = memoryview(self.mapped)
+            return False
+        self.mapped = None
+        self.buffer = None
+        self.index = {}
+        return True
+
+    def _source_hash(self, path, stat):
+        """SHA-1 of `path` as of `stat` (see _source_stat), hashing the file only if it changed since the last call."""
+        with self.lock:
+            known = self.source_hashes.get(path)
+        if known and known[0] == stat: return known[1]
+        source_hash = _source_hash(path)
+        with self.lock:
+            self.source_hashes[path] = (stat, source_hash)
+        return source_hash
+
+    def lookup(self, path, alpha, scale_to=None):
+        """The cached, already scaled surface for `path` (not yet converted to the display format), or None."""
+        started = time.perf_counter()
+        entry = self.index.get(_entry_key(path, alpha, scale_to))
+        stat = _source_stat(path) if entry else None
+        if entry and stat and (entry.get("stat") == stat or entry["hash"] == self._source_hash(path, stat)):
+            entry["stat"] = stat # Written on the next save(), so the file is not hashed again
+            start = entry["offset"]
+            end = start + entry["size"][0] * entry["size"][1] * len(entry["format"])
+            with self.lock: self.hits += 1
+            surface = pygame.image.frombuffer(self.buffer[start:end], tuple(entry["size"]), entry["format"])
+            startup_profiler.asset("cache", path, started, surface)
+            return surface
+        with self.lock: self.misses += 1
+        return None
+
+    def put(self, path, alpha, scale_to, surface):
+        """Queues a surface loaded from source (converted and scaled) to be written on save()."""
+        stat = _source_stat(path)
+        source_hash = self._source_hash(path, stat) if stat else None
+        if source_hash is None: return
+        pixel_format = "RGBA" if alpha else "RGB"
+        with self.lock:
+            self.pending[_entry_key(path, alpha, scale_to)] = (source_hash, stat, pixel_format, surface.get_size(),
+                                                                pygame.image.tobytes(surface, pixel_format))
+
+    def save(self):
+        """
+        Rewrites the cache file with the still-valid old entries plus the new ones. No-op if
+        nothing changed, or (with a warning) if the old file cannot be unmapped yet; the new
+        entries are kept for the next save() then.
+        """
+        with self.lock:
+            if not self.pending: return False
+            blocks = {}
+            for key, entry in self.index.items():
+                if key in self.pending: continue
+                start = entry["offset"]
+                end = start + entry["size"][0] * entry["size"][1] * len(entry["format"])
+                # Copied out: the old file is unmapped before it is replaced
+                blocks[key] = (entry["hash"], entry.get("stat"), entry["format"], tuple(entry["size"]), bytes(self.buffer[start:end]))
+            if not self._close():
+                print(f"Asset cache {self.path} not updated: unconverted surfaces still use it")
+                return False
+            blocks.update(self.pending)
+            self.pending = {}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = self.path + ".tmp"
+        index = {}
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, 0, 0)) # Rewritten once the index is known
+            for key, (source_hash, stat, pixel_format, size, pixels) in blocks.items():
+                f.write(b"\0" * (-f.tell() % ALIGNMENT))
+                index[key] = {"hash": source_hash, "stat": stat, "offset": f.tell(), "size": list(size), "format": pixel_format}
+                f.write(pixels)
+            index_offset = f.tell()
+            encoded_index = json.dumps(index, separators=(",", ":")).encode()
+            f.write(encoded_index)
+            f.seek(0)
+            f.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, index_offset, len(encoded_index)))
+        os.replace(temp_path, self.path)
+        self._open()
+        return True
+
+    def stats(self):
+        return {'entries': len(self.index), 'hits': self.hits, 'misses': self.misses, 'pending': len(self.pending)}
+
+def build_asset_cache(path=ASSET_CACHE_PATH):
+    """Offline step: decodes every asset once and writes the cache file. Returns the number of entries."""
+    from asset_manager import AssetManager
+    from asset_store import AssetStore # A private store, so every image really is loaded
+    from scene_registry import compile_scenes
+    _init_display()
+    cache = AssetCache(path)
+    AssetManager(compile_scenes(), prefetch=False, cache=cache, store=AssetStore()).load_all()
+    cache.save()
+    return len(cache.index)
+
+def _init_display():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    if not pygame.display.get_surface():
+        pygame.display.set_mode((1200, 600)) # convert()/convert_alpha() need the game's display format
+
+def benchmark_asset_loading(path="assets/cache/benchmark.bin", repeats=3):
+    """
+    Times loading every asset three ways: straight from PNG (what load_assets did at
+    startup), cold (PNG decode plus writing a fresh cache file) and warm (from the
+    memory-mapped cache). Returns a report dict of the best time of each in ms.
+    """
+    from asset_manager import AssetManager
+    from asset_store import AssetStore
+    from scene_registry import compile_scenes
+    _init_display()
+    registry = compile_scenes()
+
+    def timed(make_cache, finish=None):
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            cache = make_cache()
+            AssetManager(registry, prefetch=False, cache=cache, store=AssetStore()).load_all()
+            if finish: finish(cache)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def fresh_cache():
+        if os.path.exists(path): os.remove(path)
+        return AssetCache(path)
+
+    report = {
+        "png_ms": timed(lambda: None),
+        "cold_cache_ms": timed(fresh_cache, lambda cache: cache.save()),
+        "warm_cache_ms": timed(lambda: AssetCache(path)),
+        "cache_bytes": os.path.getsize(path),
+    }
+    os.remove(path)
+    return report
+
+def print_cache_benchmark(report):
+    print("Loading every asset (best of runs):")
+    print(f"  PNG decode      {report['png_ms']:9.1f} ms")
+    print(f"  cold cache      {report['cold_cache_ms']:9.1f} ms (decode + write)")
+    print(f"  warm cache      {report['warm_cache_ms']:9.1f} ms ({report['png_ms'] / report['warm_cache_ms']:.1f}x faster than PNG)")
+    print(f"  cache file      {report['cache_bytes'] / (1024 * 1024):9.1f} MB")
@@ -0,0 +1,528 @@
+# asset_manager.py
+import time
+import queue
+import threading
+import pygame
+from collections import OrderedDict
+from screen import _decode_image, _convert_image
+from asset_store import asset_store
+from startup_profile import startup_profiler
+from scene_loader import run_steps
+from image_variants import png_size, variant_plan, make_variants, ImageVariants
+from blit_format import fast_format, KINDS
+from scene_config import GAME_WIDTH, GAME_HEIGHT
+
+# Every image the game can use, under the key scene_config refers to it by: key -> (path, alpha, scale_to)
+ASSET_FILES = {
+    # Menu
+    'start_button_img': ("assets/image/start_button.png", True, (200, 100)),
+    'exit_button_img': ("assets/image/exit_button.png", True, (200, 100)),
+    'home_screen': ("assets/image/home_screen.png", True, None),
+
+    # Scene 1
+    'bg1': ("assets/image/platform/pl1/bg1.png", False, None),
+    'floor1_1': ("assets/image/platform/pl1/floor1_1.png", True, None),
+    'floor1_2': ("assets/image/platform/pl1/floor1_2.png", True, None),
+    'floor1_3': ("assets/image/platform/pl1/floor1_3.png", True, None),
+    'floor1_4': ("assets/image/platform/pl1/floor1_4.png", True, None),
+    'wall1': ("assets/image/platform/pl1/wall1.png", True, None),
+
+    # Scene 2
+    'second_bg': ("assets/image/platform/pl2/bg2.png", False, None),
+    'floor1_img': ("assets/image/platform/pl2/floor2_1.png", True, None),
+    'floor2_img': ("assets/image/platform/pl2/floor2_2.png", True, None),
+    'platform_img': ("assets/image/platform/pl2/platform2.png", True, None),
+    'benchbottom_img': ("assets/image/platform/pl2/benchbottom.png", True, None),
+    'benchside2_1_img': ("assets/image/platform/pl2/benchside2_1.png", True, None),
+    'benchside2_2_img': ("assets/image/platform/pl2/benchside2_2.png", True, None),
+    'wall_img': ("assets/image/platform/pl2/wall2_1.png", True, None),
+
+    # Scene 3
+    'bg3': ("assets/image/platform/pl3/bg3.png", False, (1600, GAME_HEIGHT)),
+    'floor3_1': ("assets/image/platform/pl3/floor3_1.png", True, None),
+    'floor3_2': ("assets/image/platform/pl3/floor3_2.png", True, None),
+    'upfloor3_1': ("assets/image/platform/pl3/upfloor3_1.png", True, None),
+    'upfloor3_2': ("assets/image/platform/pl3/upfloor3_2.png", True, None),
+    'upfloor3_3': ("assets/image/platform/pl3/upfloor3_3.png", True, None),
+    'upfloor3_4': ("assets/image/platform/pl3/upfloor3_4.png", True, None),
+    'upfloor3_5': ("assets/image/platform/pl3/upfloor3_5.png", True, None),
+    'upfloor3_6': ("assets/image/platform/pl3/upfloor3_6.png", True, None),
+    'floatfloor3': ("assets/image/platform/pl3/floatFloor3.png", True, None),
+    'wall3': ("assets/image/platform/pl3/wall3.png", True, None),
+
+    # Scene 4
+    'bg4': ("assets/image/platform/pl4/bg4.png", False, None),
+    'floor4_1': ("assets/image/platform/pl4/floor4_1.png", True, None),
+    'floor4_2': ("assets/image/platform/pl4/floor4_2.png", True, None),
+    'floor4_3': ("assets/image/platform/pl4/floor4_3.png", True, None),
+    'wall4_1': ("assets/image/platform/pl4/wall4_1.png", True, None),
+    'wall4_2': ("assets/image/platform/pl4/wall4_2.png", True, None),
+
+    # Scene 5
+    'bg5': ("assets/image/platform/pl5/bg5.png", False, None),
+    'floor5_1': ("assets/image/platform/pl5/floor5_1.png", True, None),
+    'floor5_2': ("assets/image/platform/pl5/floor5_2.png", True, None),
+    'wall5_1': ("assets/image/platform/pl5/wall5_1.png", True, None),
+    'wall5_2': ("assets/image/platform/pl5/wall5_2.png", True, None),
+
+    # NPCs
+    'truth_seeker': ("assets/image/truth_seeker.gif", True, None),
+    'steelsoul': ("assets/image/steelsoul.png", True, None),
+    'noze_img': ("assets/image/noze.png", True, None),
+    'hornhead_img': ("assets/image/hornhead.png", True, None),
+    'witcher_img': ("assets/image/boss1.png", True, None),
+    'witcher2_img': ("assets/image/boss2.png", True, None), # Second Witcher frame
+    'bullet_img': ("assets/image/bullet.png", True, None),
+
+    # Standard enemy
+    'mob1_1': ("assets/image/mob1_1.png", True, None),
+    'mob1_2': ("assets/image/mob1_2.png", True, None),
+}
+
+# Loaded at startup and never unloaded: the menu, plus the bullet the projectile pool is created with
+GLOBAL_ASSET_KEYS = ('start_button_img', 'exit_button_img', 'home_screen', 'bullet_img')
+
+# Images an NPC needs besides its own image_key
+NPC_EXTRA_ASSET_KEYS = {'witcher': ('witcher2_img', 'bullet_img')}
+
+# World size Game uses for scenes without world_dimensions; backgrounds are drawn at the world size
+DEFAULT_WORLD_SIZE = (GAME_WIDTH * 2, GAME_HEIGHT)
+
+# Owner name of the AssetManager's references in the AssetStore
+STORE_OWNER = 'AssetManager'
+
+# Animation frame name (as Enemy expects them) -> asset key; needed by every scene with enemies
+ENEMY_FRAME_KEYS = {
+    'idle': 'mob1_1',
+    'walk1': 'mob1_1',
+    'walk2': 'mob1_2',
+    'attack1': 'mob1_1',
+    'attack2': 'mob1_2',
+    'attack3': 'mob1_2',
+}
+
+def scene_asset_keys(scene):
+    """Manifest of one compiled Scene: every asset key its background, platforms, NPCs and enemies use."""
+    keys = [scene.background_key]
+    keys.extend(p_def[4] for p_def in scene.platform_definitions)
+    for npc_def in scene.npc_definitions:
+        keys.append(npc_def['image_key'])
+        keys.extend(NPC_EXTRA_ASSET_KEYS.get(npc_def['name'], ()))
+    if scene.enemy_definitions:
+        keys.extend(ENEMY_FRAME_KEYS.values())
+    # Keys without a file are left out; looking them up gives None, as before
+    return tuple(key for key in dict.fromkeys(keys) if key in ASSET_FILES)
+
+def scene_draw_sizes(scene):
+    """Asset key -> set of (width, height) one compiled Scene draws it at: its background at the world size, platform images at their rects."""
+    sizes = {scene.background_key: {tuple(scene.world_dimensions or DEFAULT_WORLD_SIZE)}}
+    for x, y, width, height, image_key, is_wall in scene.platform_definitions:
+        if width > 0 and height > 0:
+            sizes.setdefault(image_key, set()).add((width, height))
+    return sizes
+
+class AssetManager:
+    """
+    Loads images on demand instead of all at startup. Only GLOBAL_ASSET_KEYS are loaded
+    up front; a scene's assets (from its manifest, see scene_asset_keys) are loaded the
+    first time the scene is entered. Assets of the scenes visited longest ago are dropped
+    once more than max_resident_scenes scenes are resident, unless another resident
+    scene still uses them.
+
+    With prefetch on, entering a scene also queues the assets of its neighbours (the
+    scenes its transitions lead to) for a worker thread, which only decodes the files.
+    The main thread converts finished decodes a little each frame (convert_prefetched),
+    so the next transition usually finds everything resident.
+
+    With an AssetCache, images come from its memory-mapped file when it has them and
+    images decoded from source are added to it (written out on shutdown). With an Atlas,
+    the images it packs are zero-copy subsurfaces of a sheet that is loaded once.
+
+    Backgrounds and platform images (not the atlas ones) are never kept at their source
+    size, which for some is several times what is drawn: they are loaded as variants, one
+    per size a scene draws them at plus, for max_zoom above 1, the closest of the native,
+    half and quarter size (see image_variants), all scaled from the source (scaled to its
+    scale_to first, if it has one) the way images without variants are. They are made once,
+    by the prefetch worker when prefetched, and cached like any other image; get() with a
+    size returns the closest one.
+
+    Every image ends up in the format that blits fastest for its content (see blit_format):
+    opaque ones without alpha, binary-alpha ones with an RLE colorkey, only the rest with
+    per-pixel alpha. The AssetCache keeps the convert_alpha pixels, so it is done after.
+
+    Surfaces are held in the shared AssetStore (one reference per resident key), which
+    shares identical images between keys and keeps unloaded ones around while its
+    memory budget allows, so coming back to a scene does not decode them again.
+    Pinned scenes (see pin_scenes) keep their assets resident however long ago they were
+    visited, for as long as something built from them is kept.
+
+    get() works like the old asset dicts: a missing file gives the magenta placeholder,
+    a key that is not loaded (or not known) gives None.
+    """
+    def __init__(self, scene_registry, max_resident_scenes=2, prefetch=True, cache=None, atlas=None, store=None, max_zoom=1.0,
+                 optimize_formats=True):
+        self.max_resident_scenes = max_resident_scenes
+        self.store = store if store is not None else asset_store
+        self.cache = cache # asset_cache.AssetCache or None
+        self.atlas = atlas # atlas.Atlas or None
+        self.sheets = {} # Atlas sheet name -> converted sheet, while any of its images is resident
+        self.scene_keys = {scene.id: scene_asset_keys(scene) for scene in scene_registry}
+        self.scene_neighbours = {scene.id: scene.neighbours for scene in scene_registry}
+        draw_sizes = {}
+        for scene in scene_registry:
+            for key, sizes in scene_draw_sizes(scene).items():
+                draw_sizes.setdefault(key, set()).update(sizes)
+        self.variant_plans = {} # key -> sizes its variants are kept at, instead of the source image
+        for key, sizes in draw_sizes.items():
+            if key not in ASSET_FILES or (atlas and key in atlas): continue
+            native_size = ASSET_FILES[key][2] or png_size(ASSET_FILES[key][0])
+            if native_size:
+                self.variant_plans[key] = variant_plan(native_size, sorted(sizes), max_zoom)
+        self.surfaces = {}
+        self.variant_sets = {} # key -> ImageVariants, for resident keys with variants
+        self.resident_scenes = OrderedDict() # scene_id -> None, least recently visited first
+        self.prefetch_targets = () # Neighbours of the active scene, whose assets are kept / being prefetched
+        self.pinned_scenes = () # Scenes whose assets stay resident whatever was visited since (see pin_scenes)
+        self.placeholder = pygame.Surface((50, 50)); self.placeholder.fill((255, 0, 255)) # Magenta
+        self.optimize_formats = optimize_formats # False keeps every image as converted (convert_alpha), to compare
+        self.format_counts = dict.fromkeys(KINDS, 0) # Images prepared per blit_format kind
+        self.loads = 0
+        self.unloads = 0
+        self.load_seconds = 0.0
+
+        # Prefetch state: keys queued for the worker, and its decoded (not yet converted) results
+        self.requested = set()
+        self.decoded = {} # key -> _decode() result; written by the worker
+        self.decoded_sheets = {} # Atlas sheet name -> _read() result (None while being read)
+        self.decoded_lock = threading.Lock()
+        self.prefetch_queue = None
+        self.worker = None
+        self.prefetch_hits = 0 # Scene assets already resident when their scene was entered
+        self.prefetch_misses = 0 # Scene assets that had to be loaded on the transition frame itself
+        self.prefetch_decode_seconds = 0.0 # Worker thread time
+        self.convert_seconds = 0.0 # Main thread time spent converting prefetched images
+        self.last_transition_seconds = 0.0
+        if prefetch:
+            self.prefetch_queue = queue.Queue()
+            self.worker = threading.Thread(target=self._prefetch_worker, name="asset-prefetch", daemon=True)
+            self.worker.start()
+
+        self.load_keys(GLOBAL_ASSET_KEYS)
+
+    def get(self, key, default=None, size=None):
+        """The surface of `key`; with a (width, height) `size`, the variant closest to it if `key` has variants."""
+        if size and key in self.variant_sets:
+            return self.variant_sets[key].closest(size)
+        return self.surfaces.get(key, default)
+
+    def variants(self, key):
+        """The ImageVariants of `key`, or None if it has none (or is not resident)."""
+        return self.variant_sets.get(key)
+
+    def _in_store(self, key):
+        """Whether the AssetStore already has everything `key` needs, so loading it decodes nothing."""
+        path, alpha, scale_to = ASSET_FILES[key]
+        if key in self.variant_plans:
+            return all(self.store.get(path, alpha, size) is not None for size in self.variant_plans[key])
+        return self.store.get(path, alpha, scale_to) is not None
+
+    def _read(self, path, alpha, scale_to):
+        """
+        Reads one image: (surface, from_cache). Cached surfaces are already scaled;
+        surface is None if the file is missing or unreadable. Safe off the main thread.
+        """
+        if self.cache:
+            surface = self.cache.lookup(path, alpha, scale_to)
+            if surface: return surface, True
+        return _decode_image(path), False
+
+    def _prepare(self, path, alpha, scale_to, read, rle=True):
+        """Converts a _read() result for the display; None if the file was unreadable."""
+        surface, from_cache = read
+        if not surface: return None
+        if from_cache: return self._fast(_convert_image(surface, alpha, path=path), path, rle)
+        surface = _convert_image(surface, alpha, scale_to, path)
+        if self.cache: self.cache.put(path, alpha, scale_to, surface)
+        return self._fast(surface, path, rle)
+
+    def _fast(self, surface, path, rle=True):
+        """`surface` in its fastest blit format (see blit_format.fast_format), unless optimize_formats is off."""
+        if not self.optimize_formats: return surface
+        start = time.perf_counter()
+        surface, kind = fast_format(surface, rle)
+        self.format_counts[kind] += 1
+        startup_profiler.asset("format", path, start, surface)
+        return surface
+
+    def _decode(self, key):
+        """Reads what `key` needs: its own file, or its atlas sheet unless that was read already. Safe off the main thread."""
+        if self.atlas and key in self.atlas:
+            sheet_name, sheet_path, _ = self.atlas.locate(key)
+            with self.decoded_lock:
+                if sheet_name in self.sheets or sheet_name in self.decoded_sheets: return None
+                self.decoded_sheets[sheet_name] = None # Claimed, the sheet's other images won't read it again
+            read = self._read(sheet_path, True, None)
+            with self.decoded_lock:
+                if sheet_name in self.sheets: self.decoded_sheets.pop(sheet_name, None) # Converted meanwhile
+                else: self.decoded_sheets[sheet_name] = read
+            return None
+        path, alpha, scale_to = ASSET_FILES[key]
+        if key in self.variant_plans:
+            return self._read_variants(key)
+        return self._read(path, alpha, scale_to)
+
+    def _read_variants(self, key, sizes=None):
+        """
+        Reads the variants of `key` at `sizes` (default: all of them): ({size: cached
+        surface}, {size: surface scaled from the source}), neither converted yet. The source
+        is only decoded if the cache lacks some. Safe off the main thread.
+        """
+        path, alpha, scale_to = ASSET_FILES[key]
+        cached = {}
+        for size in sizes or self.variant_plans[key]:
+            surface = self.cache.lookup(path, alpha, size) if self.cache else None
+            if surface: cached[size] = surface
+        missing = [size for size in sizes or self.variant_plans[key] if size not in cached]
+        source = _decode_image(path) if missing else None
+        if not source: return cached, {}
+        start = time.perf_counter()
+        if scale_to: source = pygame.transform.scale(source, scale_to)
+        made = make_variants(source, missing)
+        startup_profiler.asset("resample", path, start, max(made.values(), key=lambda s: s.get_width() * s.get_height()))
+        return cached, made
+
+    def _build_variants(self, key, decoded, sizes):
+        """Display-ready variants of `key` at `sizes` from a _read_variants() result (read now if there is none); only converts."""
+        path, alpha, _ = ASSET_FILES[key]
+        cached, made = decoded or self._read_variants(key, sizes)
+        variants = {}
+        for size in sizes:
+            if size in cached:
+                variants[size] = _convert_image(cached[size], alpha, path=path)
+            elif size in made:
+                variants[size] = _convert_image(made[size], alpha, path=path)
+                if self.cache: self.cache.put(path, alpha, size, variants[size])
+        return {size: self._fast(surface, path) for size, surface in variants.items()}
+
+    def _atlas_view(self, key):
+        """`key` as a subsurface of its atlas sheet, converting the sheet first if needed."""
+        sheet_name, sheet_path, rect = self.atlas.locate(key)
+        sheet = self.sheets.get(sheet_name)
+        if sheet is None:
+            with self.decoded_lock:
+                read = self.decoded_sheets.pop(sheet_name, None)
+            sheet = self._prepare(sheet_path, True, None, read or self._read(sheet_path, True, None), rle=False) # Only cut into subsurfaces
+            if not sheet: return None
+            self.sheets[sheet_name] = sheet
+        return sheet.subsurface(rect)
+
+    def _build(self, key, decoded):
+        """The display-ready surface of `key` from a _decode() result (read now if there is none)."""
+        path, alpha, scale_to = ASSET_FILES[key]
+        surface = None
+        if self.atlas and key in self.atlas:
+            surface = self._atlas_view(key)
+        if surface is None: # Not in the atlas, or its sheet is missing: the image's own file
+            surface = self._prepare(path, alpha, scale_to, decoded or self._read(path, alpha, scale_to))
+        return surface
+
+    def _store(self, key, decoded):
+        """Makes `key` resident, from the AssetStore if its content is there, else from `decoded`."""
+        path, alpha, scale_to = ASSET_FILES[key]
+        if key in self.variant_plans:
+            surface = self._store_variants(key, decoded)
+        else:
+            surface = self.store.acquire(path, STORE_OWNER, alpha, scale_to, loader=lambda: self._build(key, decoded))
+        if surface is None:
+            print(f"Using placeholder for missing asset: {key}")
+            surface = self.placeholder
+        self.surfaces[key] = surface
+
+    def _store_variants(self, key, decoded):
+        """Acquires every variant of `key` from the AssetStore, building the ones it lacks. Returns the largest, or None."""
+        path, alpha, _ = ASSET_FILES[key]
+        plan = self.variant_plans[key]
+        missing = [size for size in plan if self.store.get(path, alpha, size) is None]
+        built = self._build_variants(key, decoded, missing) if missing else {}
+        surfaces = {}
+        for size in plan:
+            surface = self.store.acquire(path, STORE_OWNER, alpha, size, loader=lambda size=size: built.get(size))
+            if surface: surfaces[size] = surface
+        if not surfaces: return None
+        self.variant_sets[key] = ImageVariants(surfaces)
+        return self.variant_sets[key].largest()
+
+    def load_keys(self, keys):
+        """Loads every key of `keys` that is not resident yet, using prefetched decodes where there are any."""
+        for key in keys:
+            if key in self.surfaces: continue
+            start = time.perf_counter()
+            with self.decoded_lock:
+                prefetched = key in self.decoded
+                decoded = self.decoded.pop(key, None)
+            self.requested.discard(key)
+            if not prefetched and not self._in_store(key):
+                decoded = self._decode(key) # Not even unreferenced in the store: read it
+            self._store(key, decoded)
+            self.load_seconds += time.perf_counter() - start
+            self.loads += 1
+
+    def load_scene_assets(self, scene_id):
+        """
+        Makes every asset of `scene_id` resident, unloads the least recently visited scenes
+        over the limit and starts prefetching the neighbours. Returns (hits, misses): how
+        many of the scene's assets were already resident and how many were loaded now.
+        """
+        return run_steps(self.scene_asset_steps(scene_id))
+
+    def scene_asset_steps(self, scene_id):
+        """load_scene_assets() as a step generator (see scene_loader.SceneLoad): one step per asset loaded."""
+        start = time.perf_counter()
+        busy = 0.0
+        keys = self.scene_keys.get(scene_id, ())
+        # Keys still in the store (unreferenced, or shared with another key) cost no decode either
+        missing = [key for key in keys if key not in self.surfaces and not self._in_store(key)]
+        for key in keys:
+            if key in self.surfaces: continue
+            self.load_keys((key,))
+            busy += time.perf_counter() - start
+            yield
+            start = time.perf_counter()
+        self.prefetch_hits += len(keys) - len(missing)
+        self.prefetch_misses += len(missing)
+
+        self.resident_scenes[scene_id] = None
+        self.resident_scenes.move_to_end(scene_id)
+        while len(self.resident_scenes) > max(1, self.max_resident_scenes):
+            self.resident_scenes.popitem(last=False)
+        self.prefetch_targets = self.scene_neighbours.get(scene_id, ())
+        self._release_unneeded()
+        self._queue_prefetch()
+        self.last_transition_seconds = busy + time.perf_counter() - start # Without the frames in between
+        return len(keys) - len(missing), len(missing)
+
+    def unload_scene_assets(self, scene_id):
+        """Drops the assets of `scene_id` that no global key, resident scene or prefetch target needs."""
+        self.resident_scenes.pop(scene_id, None)
+        self._release_unneeded()
+
+    def pin_scenes(self, scene_ids):
+        """
+        Keeps the assets of `scene_ids` resident, in place of the scenes pinned before, whose
+        assets are dropped now unless still needed otherwise. For scenes whose built state
+        (a scene_cache.SceneInstance) holds their surfaces.
+        """
+        self.pinned_scenes = tuple(scene_ids)
+        self._release_unneeded()
+
+    def _needed_keys(self):
+        needed = set(GLOBAL_ASSET_KEYS)
+        for scene_id in list(self.resident_scenes) + list(self.prefetch_targets) + list(self.pinned_scenes):
+            needed.update(self.scene_keys.get(scene_id, ()))
+        return needed
+
+    def _release_unneeded(self):
+        needed = self._needed_keys()
+        for key in [key for key in self.surfaces if key not in needed]:
+            path, alpha, scale_to = ASSET_FILES[key]
+            surface = self.surfaces.pop(key)
+            variants = self.variant_sets.pop(key, None)
+            if variants:
+                for size in variants.surfaces:
+                    self.store.release(path, STORE_OWNER, alpha, size)
+            elif surface is not self.placeholder:
+                self.store.release(path, STORE_OWNER, alpha, scale_to)
+            self.unloads += 1
+        with self.decoded_lock:
+            for key in [key for key in self.decoded if key not in needed]:
+                del self.decoded[key]
+                self.requested.discard(key)
+        if self.atlas:
+            resident_sheets = {self.atlas.locate(key)[0] for key in self.surfaces if key in self.atlas}
+            needed_sheets = {self.atlas.locate(key)[0] for key in needed if key in self.atlas}
+            for name in [name for name in self.sheets if name not in resident_sheets]:
+                del self.sheets[name]
+            with self.decoded_lock:
+                for name in [name for name in self.decoded_sheets if name not in needed_sheets]:
+                    del self.decoded_sheets[name]
+
+    def _queue_prefetch(self):
+        if not self.prefetch_queue: return
+        for scene_id in self.prefetch_targets:
+            for key in self.scene_keys.get(scene_id, ()):
+                if key not in self.surfaces and key not in self.requested and not self._in_store(key):
+                    self.requested.add(key)
+                    self.prefetch_queue.put(key)
+
+    def _prefetch_worker(self):
+        while True:
+            key = self.prefetch_queue.get()
+            if key is None: return # shutdown()
+            start = time.perf_counter()
+            decoded = self._decode(key)
+            with self.decoded_lock:
+                self.decoded[key] = decoded
+                self.prefetch_decode_seconds += time.perf_counter() - start
+
+    def convert_prefetched(self, max_seconds=0.002):
+        """Main thread, once per frame: converts finished prefetch decodes for up to `max_seconds`."""
+        if not self.worker: return
+        start = time.perf_counter()
+        needed = None
+        while time.perf_counter() - start < max_seconds:
+            with self.decoded_lock:
+                if not self.decoded: break
+                key, decoded = self.decoded.popitem()
+            self.requested.discard(key)
+            if needed is None: needed = self._needed_keys()
+            if key in self.surfaces or key not in needed: continue # Loaded meanwhile, or no longer wanted
+            self._store(key, decoded)
+            self.loads += 1
+        self.convert_seconds += time.perf_counter() - start
+
+    def shutdown(self):
+        """Stops the prefetch worker and writes new images to the cache (call before pygame.quit)."""
+        if self.worker:
+            self.prefetch_queue.put(None)
+            self.worker.join(timeout=1.0)
+            self.worker = None
+        with self.decoded_lock: # Unconverted reads may use the cache's mapping, which save() replaces
+            self.decoded.clear()
+            self.decoded_sheets.clear()
+        self.requested.clear()
+        if self.cache and self.cache.save():
+            print(f"Asset cache updated: {self.cache.path}")
+
+    def load_all(self):
+        """Loads every known asset (the old load-everything-at-startup behaviour)."""
+        self.load_keys(ASSET_FILES)
+
+    def enemy_frames(self):
+        """Frame name -> surface dict for Enemy, from the resident enemy assets."""
+        return {frame: self.surfaces.get(key) for frame, key in ENEMY_FRAME_KEYS.items()}
+
+    def _resident_surfaces(self):
+        surfaces = list(self.surfaces.values())
+        for variants in self.variant_sets.values():
+            surfaces.extend(variants.surfaces.values())
+        return surfaces
+
+    def stats(self):
+        return {
+            'resident_assets': len(self.surfaces),
+            'resident_scenes': list(self.resident_scenes),
+            'prefetch_targets': list(self.prefetch_targets),
+            'pinned_scenes': list(self.pinned_scenes),
+            'bytes': sum(s.get_pitch() * s.get_height() for s in {s.get_parent() or s for s in self._resident_surfaces()}),
+            'variant_keys': len(self.variant_sets),
+            'formats': dict(self.format_counts),
+            'atlas_sheets': len(self.sheets),
+            'loads': self.loads,
+            'unloads': self.unloads,
+            'load_seconds': self.load_seconds,
+            'prefetch_hits': self.prefetch_hits,
+            'prefetch_misses': self.prefetch_misses,
+            'prefetch_decode_seconds': self.prefetch_decode_seconds,
+            'convert_seconds': self.convert_seconds,
+            'last_transition_seconds': self.last_transition_seconds,
+        }
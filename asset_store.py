@@ -0,0 +1,131 @@
+# asset_store.py
+import hashlib
+from collections import OrderedDict
+from screen import _load_image
+
+class StoredSurface:
+    """One resident surface of the AssetStore and who is using it."""
+    def __init__(self, surface, path):
+        self.surface = surface
+        self.bytes = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self.paths = {path} # Every source path with this content
+        self.owners = {} # owner name -> reference count
+
+    @property
+    def refs(self):
+        return sum(self.owners.values())
+
+class AssetStore:
+    """
+    Every image surface the game loads, in one place. Entries are content-addressed:
+    keyed by the SHA-1 of the source file plus how it was converted (alpha, scale), so
+    paths with identical bytes (the player's idle/walk/attack frames share files with
+    enemy sprites, for instance) share a single surface, and a path is only hashed once.
+
+    Users acquire() a surface under an owner name and release() it when done. Entries
+    nobody holds stay resident, so acquiring them again is free, until the total size
+    goes over max_bytes; then unreferenced entries are evicted least recently used first.
+    Referenced entries are never evicted, even over budget.
+    """
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # content key -> StoredSurface, least recently used first
+        self.path_hashes = {} # path -> SHA-1 of its bytes (None if unreadable)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def content_key(self, path, alpha=True, scale_to=None):
+        """(content hash, alpha, scale) for `path`, or None if the file cannot be read."""
+        if path not in self.path_hashes:
+            try:
+                with open(path, "rb") as f:
+                    self.path_hashes[path] = hashlib.sha1(f.read()).hexdigest()
+            except OSError:
+                self.path_hashes[path] = None
+        content_hash = self.path_hashes[path]
+        return (content_hash, alpha, tuple(scale_to) if scale_to else None) if content_hash else None
+
+    def get(self, path, alpha=True, scale_to=None):
+        """The resident surface with the content of `path`, or None. Does not take a reference."""
+        key = self.content_key(path, alpha, scale_to)
+        entry = self.entries.get(key) if key else None
+        if not entry: return None
+        self.entries.move_to_end(key)
+        entry.paths.add(path)
+        return entry.surface
+
+    def acquire(self, path, owner, alpha=True, scale_to=None, loader=None):
+        """
+        The surface for `path`, loading it with `loader()` (default: decode and convert the
+        file) if its content is not resident. Adds a reference for `owner`. Returns None
+        if the image cannot be loaded; nothing is stored then.
+        """
+        key = self.content_key(path, alpha, scale_to)
+        entry = self.entries.get(key) if key else None
+        if entry:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            entry.paths.add(path)
+        else:
+            self.misses += 1
+            surface = loader() if loader else _load_image(path, alpha, scale_to)
+            if not surface or not key: return surface # Unreadable (or a placeholder): not stored
+            entry = self.entries[key] = StoredSurface(surface, path)
+            self.current_bytes += entry.bytes
+        entry.owners[owner] = entry.owners.get(owner, 0) + 1
+        self.evict()
+        return entry.surface
+
+    def release(self, path, owner, alpha=True, scale_to=None):
+        """Drops one reference of `owner`; the surface stays resident until the budget needs the room."""
+        entry = self.entries.get(self.content_key(path, alpha, scale_to))
+        if not entry or owner not in entry.owners: return
+        entry.owners[owner] -= 1
+        if not entry.owners[owner]:
+            del entry.owners[owner]
+        self.evict()
+
+    def evict(self):
+        """Evicts unreferenced entries, least recently used first, until under max_bytes."""
+        if self.current_bytes <= self.max_bytes: return
+        for key in [key for key, entry in self.entries.items() if not entry.owners]:
+            entry = self.entries.pop(key)
+            self.current_bytes -= entry.bytes
+            self.evictions += 1
+            if self.current_bytes <= self.max_bytes: break
+
+    def report(self):
+        """One row per resident surface, biggest first."""
+        rows = [{
+            'paths': sorted(entry.paths),
+            'size': entry.surface.get_size(),
+            'bytes': entry.bytes,
+            'refs': entry.refs,
+            'owners': dict(entry.owners),
+        } for entry in self.entries.values()]
+        return sorted(rows, key=lambda row: -row['bytes'])
+
+    def print_report(self):
+        rows = self.report()
+        print(f"AssetStore: {len(rows)} surfaces, {self.current_bytes / (1024 * 1024):.1f} of "
+              f"{self.max_bytes / (1024 * 1024):.0f} MB, {self.hits} hits, {self.misses} misses, {self.evictions} evictions")
+        print(f"{'MB':>8}{'refs':>6}  {'size':<12}path(s)")
+        for row in rows:
+            size = f"{row['size'][0]}x{row['size'][1]}"
+            print(f"{row['bytes'] / (1024 * 1024):>8.2f}{row['refs']:>6}  {size:<12}{', '.join(row['paths'])}")
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'referenced': sum(1 for entry in self.entries.values() if entry.owners),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+# Shared instance every module gets its image surfaces from
+asset_store = AssetStore()
@@ -0,0 +1,129 @@
+# atlas.py
+import os
+import json
+import pygame
+from asset_cache import _source_hash, _init_display
+
+ATLAS_DIR = "assets/atlas"
+ATLAS_INDEX_PATH = os.path.join(ATLAS_DIR, "atlas.json")
+ATLAS_VERSION = 1
+ATLAS_FOLDERS = ('pl2', 'pl3', 'pl4', 'pl5', 'pl6') # Platform folders whose small images are packed, one sheet set each
+MAX_SHEET_SIZE = 2048
+MAX_ITEM_SIZE = 1024 # Bigger images (long floors, tall walls) stay separate files
+PADDING = 1
+
+def atlas_candidates():
+    """Asset key -> path of every image that goes into an atlas, grouped by platform folder."""
+    from asset_manager import ASSET_FILES
+    groups = {folder: {} for folder in ATLAS_FOLDERS}
+    for key, (path, alpha, scale_to) in ASSET_FILES.items():
+        parts = path.split("/")
+        if len(parts) < 2 or parts[-2] not in groups: continue
+        if not alpha or scale_to: continue # Backgrounds are opaque and large
+        groups[parts[-2]][key] = path
+    return groups
+
+def pack(sizes, max_size=MAX_SHEET_SIZE, padding=PADDING):
+    """
+    Shelf-packs {key: (w, h)} into as few sheets as needed. Tallest first: each shelf is
+    as high as its first image and filled left to right. Returns a list of
+    (sheet_size, {key: (x, y)}); sheets are a power of two wide and only as high as used.
+    """
+    order = sorted(sizes, key=lambda key: (-sizes[key][1], -sizes[key][0], key))
+    sheet_width = 256
+    while sheet_width < max_size and any(w + padding > sheet_width for w, _ in sizes.values()):
+        sheet_width *= 2
+
+    sheets = []
+    placements, x, y, shelf_height = {}, 0, 0, 0
+    for key in order:
+        w, h = sizes[key]
+        if x + w + padding > sheet_width: # Next shelf
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + h + padding > max_size: # Next sheet
+            sheets.append(placements)
+            placements, x, y, shelf_height = {}, 0, 0, 0
+        placements[key] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h + padding)
+    if placements:
+        sheets.append(placements)
+
+    packed = []
+    for placements in sheets:
+        used_height = max(y + sizes[key][1] for key, (_, y) in placements.items())
+        packed.append(((sheet_width, used_height), placements))
+    return packed
+
+def build_atlases(out_dir=ATLAS_DIR):
+    """Build step: packs the small platform images into PNG sheets plus a JSON index. Returns the index."""
+    _init_display()
+    os.makedirs(out_dir, exist_ok=True)
+    index = {"version": ATLAS_VERSION, "sheets": {}, "entries": {}}
+    for folder, paths in atlas_candidates().items():
+        images = {}
+        for key, path in paths.items():
+            try:
+                image = pygame.image.load(path).convert_alpha()
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Atlas: skipping {key}: {e}")
+                continue
+            if max(image.get_size()) <= MAX_ITEM_SIZE:
+                images[key] = image
+        if not images: continue
+
+        for i, (sheet_size, placements) in enumerate(pack({key: image.get_size() for key, image in images.items()})):
+            name = f"{folder}_{i}"
+            sheet = pygame.Surface(sheet_size, pygame.SRCALPHA, 32)
+            sheet.fill((0, 0, 0, 0))
+            for key, (x, y) in placements.items():
+                # Adding onto a transparent sheet copies the pixels exactly (a normal blit would blend)
+                sheet.blit(images[key], (x, y), special_flags=pygame.BLEND_RGBA_ADD)
+                index["entries"][key] = {"sheet": name, "rect": [x, y, *images[key].get_size()],
+                                         "source": paths[key], "hash": _source_hash(paths[key])}
+            sheet_path = os.path.join(out_dir, name + ".png")
+            pygame.image.save(sheet, sheet_path)
+            index["sheets"][name] = {"path": sheet_path.replace(os.sep, "/"), "size": list(sheet_size)}
+
+    with open(os.path.join(out_dir, "atlas.json"), "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return index
+
+class Atlas:
+    """
+    The runtime side: which asset keys live in which sheet, and where. Entries whose
+    source image changed since the atlas was built are left out, so those images are
+    loaded from their own files until the atlas is rebuilt.
+    """
+    def __init__(self, index):
+        self.sheet_paths = {name: sheet["path"] for name, sheet in index["sheets"].items()}
+        self.entries = {} # key -> (sheet name, pygame.Rect)
+        stale = 0
+        for key, entry in index["entries"].items():
+            if entry["sheet"] not in self.sheet_paths or _source_hash(entry["source"]) != entry["hash"]:
+                stale += 1
+                continue
+            self.entries[key] = (entry["sheet"], pygame.Rect(entry["rect"]))
+        if stale:
+            print(f"Atlas is out of date for {stale} image(s), loading them separately (rebuild with --build-atlas)")
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def locate(self, key):
+        """(sheet name, sheet path, rect) of `key`."""
+        sheet_name, rect = self.entries[key]
+        return sheet_name, self.sheet_paths[sheet_name], rect
+
+def load_atlas(path=ATLAS_INDEX_PATH):
+    """The built Atlas, or None when there is none (every image is then loaded from its own file)."""
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != ATLAS_VERSION:
+        print(f"Ignoring atlas {path}: unknown version")
+        return None
+    return Atlas(index)
@@ -0,0 +1,254 @@
+# benchmark.py
+import os
+import json
+import math
+import time
+
+# Headless by default; must be set before pygame opens a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from enemy import Enemy
+from scene_config import SCENES_DATA
+from screen import render_stats
+from sprite_cache import sprite_cache
+
+# Walk right, jump, attack, walk back. Each step: frame count, keys held, keys pressed on its first frame.
+DEFAULT_INPUT_SCRIPT = [
+    {"frames": 90, "hold": ["RIGHT"]},
+    {"frames": 1, "hold": ["RIGHT"], "press": ["SPACE"]},
+    {"frames": 45, "hold": ["RIGHT"]},
+    {"frames": 20, "hold": ["z"]},
+    {"frames": 90, "hold": ["LEFT"]},
+    {"frames": 1, "hold": ["LEFT"], "press": ["SPACE"]},
+    {"frames": 45, "hold": ["LEFT"]},
+    {"frames": 30, "hold": []},
+]
+
+PHASES = ("events", "update", "collisions", "draw", "total")
+
+def _key_code(name):
+    key = getattr(pygame, "K_" + name, None)
+    if key is None:
+        raise ValueError(f"Unknown key name in input script: {name!r}")
+    return key
+
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed(): indexable by K_* constants."""
+    def __init__(self, held):
+        self.held = held
+
+    def __getitem__(self, key):
+        return key in self.held
+
+class ScriptedInput:
+    """Replays an input script (see DEFAULT_INPUT_SCRIPT) frame by frame, looping at the end."""
+    def __init__(self, script):
+        self.frames = [] # per frame: (held key set, list of KEYDOWN key codes)
+        for step in script:
+            held = frozenset(_key_code(name) for name in step.get("hold", []))
+            pressed = [_key_code(name) for name in step.get("press", [])]
+            for i in range(max(1, int(step.get("frames", 1)))):
+                self.frames.append((held, pressed if i == 0 else []))
+        if not self.frames:
+            self.frames.append((frozenset(), []))
+        self.keys = ScriptedKeys(frozenset())
+
+    def begin_frame(self, frame_index):
+        """Returns this frame's events and makes its held keys current."""
+        held, pressed = self.frames[frame_index % len(self.frames)]
+        self.keys = ScriptedKeys(held)
+        return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0) for key in pressed]
+
+    def get_pressed(self):
+        return self.keys
+
+class PhaseTimer:
+    """Accumulates time spent inside wrapped functions during one frame."""
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.elapsed += time.perf_counter() - start
+        return timed
+
+def percentile(sorted_values, pct):
+    if not sorted_values: return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)) # Nearest rank
+    return sorted_values[index]
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "mean_ms": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else 0.0,
+    }
+
+def load_input_script(path):
+    with open(path) as f:
+        return json.load(f)
+
+def run_benchmark(scene_id, frames=600, input_script=None, dt_seconds=1.0 / 60.0, dirty_rect_rendering=False, tick_rate=60,
+                  enemy_batching=False):
+    """
+    Runs Game headless in `scene_id` for `frames` frames, driven by a scripted input
+    sequence and with no frame cap. Each frame feeds `dt_seconds` of game time into the
+    fixed-step simulation (at `tick_rate` steps per second). Returns a JSON-serialisable
+    report of per-phase frame times (events / update / collisions / draw).
+    """
+    if not any(sc['id'] == scene_id for sc in SCENES_DATA):
+        raise ValueError(f"Unknown scene '{scene_id}'. Available: {', '.join(sc['id'] for sc in SCENES_DATA)}")
+
+    from game import Game # Imported here so the SDL env vars above are in place first
+    game = Game(dirty_rect_rendering=dirty_rect_rendering, tick_rate=tick_rate, enemy_batching=enemy_batching)
+    game.state = "playing"
+    game.load_scene(scene_id)
+
+    scripted = ScriptedInput(input_script or DEFAULT_INPUT_SCRIPT)
+    game.get_key_state = scripted.get_pressed
+
+    # Collision work happens inside update(); time it separately and subtract it
+    collisions = PhaseTimer()
+    game.check_horizontal_collisions = collisions.wrap(game.check_horizontal_collisions)
+    game.check_vertical_collisions = collisions.wrap(game.check_vertical_collisions)
+    original_enemy_methods = (Enemy.check_horizontal_collision, Enemy.check_vertical_collision)
+    Enemy.check_horizontal_collision = collisions.wrap(Enemy.check_horizontal_collision)
+    Enemy.check_vertical_collision = collisions.wrap(Enemy.check_vertical_collision)
+
+    samples = {phase: [] for phase in PHASES}
+    resets = 0
+    drawn = culled = 0
+    try:
+        for frame_index in range(frames):
+            collisions.elapsed = 0.0
+
+            start = time.perf_counter()
+            events = scripted.begin_frame(frame_index)
+            pygame.event.pump() # Keep SDL's own queue drained, its events are not used
+            game.handle_events(events)
+            after_events = time.perf_counter()
+            game.advance_simulation(dt_seconds)
+            after_update = time.perf_counter()
+            game.render_interpolated(dt_seconds)
+            after_draw = time.perf_counter()
+
+            collision_ms = collisions.elapsed * 1000.0
+            samples["events"].append((after_events - start) * 1000.0)
+            samples["update"].append((after_update - after_events) * 1000.0 - collision_ms)
+            samples["collisions"].append(collision_ms)
+            samples["draw"].append((after_draw - after_update) * 1000.0)
+            samples["total"].append((after_draw - start) * 1000.0)
+            drawn += render_stats['drawn']; culled += render_stats['culled']
+
+            if game.state != "playing": # Player died: restart the scene so every frame measures gameplay
+                resets += 1
+                game.reset_game()
+                game.state = "playing"
+                game.load_scene(scene_id)
+    finally:
+        Enemy.check_horizontal_collision, Enemy.check_vertical_collision = original_enemy_methods
+
+    return {
+        "scene": scene_id,
+        "frames": frames,
+        "dt_seconds": dt_seconds,
+        "tick_rate": tick_rate,
+        "sim_steps": game.sim_steps,
+        "dirty_rect_rendering": dirty_rect_rendering,
+        "enemy_batching": enemy_batching,
+        "phases": {phase: summarize(values) for phase, values in samples.items()},
+        "resets": resets,
+        "avg_drawn_objects": drawn / frames if frames else 0,
+        "avg_culled_objects": culled / frames if frames else 0,
+        "sprite_cache": sprite_cache.stats(),
+        "assets": game.assets.stats(),
+        "asset_store": game.assets.store.stats(),
+        "scene_cache": game.scene_cache.stats(),
+    }
+
+def print_report(report):
+    print(f"Benchmark: {report['scene']}, {report['frames']} frames (dt {report['dt_seconds']:.4f}s, "
+          f"{report['sim_steps']} steps at {report['tick_rate']} Hz)")
+    print(f"{'phase':<12}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for phase in PHASES:
+        s = report["phases"][phase]
+        print(f"{phase:<12}{s['mean_ms']:>9.3f}{s['p50_ms']:>9.3f}{s['p95_ms']:>9.3f}{s['p99_ms']:>9.3f}{s['max_ms']:>9.3f}")
+
+# Scene changes walked by run_transition_benchmark, starting from scene1
+TRANSITION_ROUTE = ("scene2", "scene3", "scene4", "scene5", "scene4", "scene3", "scene2", "scene1")
+
+def run_transition_benchmark(route=TRANSITION_ROUTE, frames_per_scene=30, dt_seconds=1.0 / 60.0, use_scene_cache=False):
+    """
+    Frame times around scene changes, with each change loaded inside one frame (load_scene,
+    the old behaviour) and spread over frames (request_scene with incremental loading).
+    Each mode walks `route` once to get every asset resident, then again measured: a change
+    is requested, frames run until it is swapped in, then `frames_per_scene` more. Unless
+    use_scene_cache, the scene cache is emptied before each change so every scene is built.
+    Returns {mode: stats}; "transition" frames are those from the request up to the swap.
+    """
+    from game import Game # Imported here so the SDL env vars above are in place first
+    report = {}
+    for mode in ("sync", "incremental"):
+        game = Game(seed=1, incremental_scene_loading=(mode == "incremental"))
+        game.state = "playing"
+        game.load_scene("scene1")
+        transition_ms, steady_ms, slice_ms, hold_frames = [], [], [], 0
+        for measured in (False, True):
+            for scene_id in route:
+                if not use_scene_cache: game.clear_scene_cache()
+                frame, requested, in_transition = 0, False, True
+                while frame < frames_per_scene:
+                    start = time.perf_counter()
+                    pygame.event.pump()
+                    if not requested:
+                        game.request_scene(scene_id) # As a transition trigger would, from inside the frame
+                        requested = True
+                    if game.scene_load:
+                        game.scene_load.run(game.scene_build_budget)
+                    game.advance_simulation(dt_seconds)
+                    game.render_interpolated(dt_seconds)
+                    game.assets.convert_prefetched()
+                    elapsed_ms = (time.perf_counter() - start) * 1000.0
+                    if game.state != "playing": game.state = "playing" # Keep going if an enemy got the idle player
+
+                    if not measured: pass
+                    elif in_transition:
+                        transition_ms.append(elapsed_ms)
+                        hold_frames += 1 if game.scene_loading else 0
+                    else:
+                        steady_ms.append(elapsed_ms)
+                    if in_transition and not game.scene_load and game.current_scene_id == scene_id:
+                        in_transition = False
+                        if measured: slice_ms.append(game.last_scene_build_slice_seconds * 1000.0)
+                    if not in_transition: frame += 1
+        game.assets.shutdown()
+        report[mode] = {
+            "transitions": len(route),
+            "transition_frames": summarize(transition_ms),
+            "steady_frames": summarize(steady_ms),
+            "hold_frames": hold_frames,
+            "build_slice": summarize(slice_ms), # Scene building done within a single frame
+        }
+    return report
+
+def print_transition_report(report):
+    print(f"Scene changes: {report['sync']['transitions']} per mode, frames from request to swap vs. the rest (ms)")
+    print(f"{'mode':<13}{'worst':>9}{'p95':>9}{'mean':>9}{'steady max':>12}{'build/frame':>13}{'hold frames':>13}")
+    for mode, stats in report.items():
+        t, steady = stats["transition_frames"], stats["steady_frames"]
+        print(f"{mode:<13}{t['max_ms']:>9.3f}{t['p95_ms']:>9.3f}{t['mean_ms']:>9.3f}{steady['max_ms']:>12.3f}"
+              f"{stats['build_slice']['max_ms']:>13.3f}{stats['hold_frames']:>13d}")
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
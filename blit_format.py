@@ -0,0 +1,132 @@
+# blit_format.py
+import time
+import numpy as np
+import pygame
+
+# What an image's alpha channel holds, from cheapest to dearest to blit
+OPAQUE = "opaque" # Every pixel fully opaque: no alpha needed at all
+BINARY_ALPHA = "binary" # Only fully opaque and fully transparent pixels: a colorkey does the same
+TRUE_ALPHA = "alpha" # Some pixels in between (soft edges, glows): needs per-pixel alpha
+KINDS = (OPAQUE, BINARY_ALPHA, TRUE_ALPHA)
+
+# Colorkeys tried for binary-alpha images, in order; the first that no visible pixel has is used
+COLORKEYS = ((255, 0, 255), (0, 255, 0), (1, 254, 253), (254, 1, 2))
+
+def classify(surface):
+    """OPAQUE, BINARY_ALPHA or TRUE_ALPHA for a converted surface (one with a colorkey counts as BINARY_ALPHA)."""
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return BINARY_ALPHA if surface.get_colorkey() else OPAQUE
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    opaque = alpha.min() == 255
+    partial = not opaque and np.any(alpha - np.uint8(1) < 254) # 1..254 become 0..253, 0 wraps around to 255
+    del alpha # Unlocks the surface
+    return OPAQUE if opaque else TRUE_ALPHA if partial else BINARY_ALPHA
+
+def _colorkeyed(surface, rle):
+    """`surface` flattened onto a colorkey no visible pixel uses, or None if every COLORKEYS colour is taken."""
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    transparent = np.count_nonzero(alpha == 0)
+    del alpha
+    flat = pygame.Surface(surface.get_size()).convert()
+    for key in COLORKEYS:
+        flat.fill(key)
+        flat.blit(surface, (0, 0)) # Alpha is 0 or 255, so this copies the visible pixels exactly
+        if pygame.mask.from_threshold(flat, key, (1, 1, 1, 255)).count() == transparent: # Exact matches only
+            flat.set_colorkey(key, pygame.RLEACCEL if rle else 0)
+            return flat
+    return None
+
+def fast_format(surface, rle=True):
+    """
+    `surface` (converted with convert_alpha) in the format that blits fastest and looks
+    the same, plus its kind: opaque images lose their alpha channel (convert), binary-alpha
+    ones get a colorkey, RLE-accelerated unless `rle` is off (for surfaces that are cut
+    into subsurfaces, like atlas sheets), and true-alpha ones stay as they are.
+    """
+    kind = classify(surface)
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return surface, kind # Already without per-pixel alpha
+    if kind == OPAQUE:
+        return surface.convert(), kind
+    if kind == BINARY_ALPHA:
+        keyed = _colorkeyed(surface, rle)
+        if keyed: return keyed, kind
+    return surface, kind
+
+def benchmark_scene_blits(repeats=200):
+    """
+    Per scene, times drawing its images with every image converted with convert_alpha (as
+    before) and with fast_format: building its static layer (background plus platforms),
+    and blitting its sprites (NPCs, enemy frames, the bullet and the player's frames) at
+    their draw sizes, the way a frame does. Returns a report dict; times are best-of in ms.
+    """
+    from asset_cache import _init_display
+    from asset_manager import AssetManager, DEFAULT_WORLD_SIZE, ENEMY_FRAME_KEYS
+    from asset_store import AssetStore
+    from gameobject import create_platforms_for_level
+    from scene_registry import compile_scenes
+    from screen import build_static_layer, _decode_image, _convert_image
+    from sprite_cache import SpriteCache
+    _init_display()
+    registry = compile_scenes()
+    frame = pygame.Surface(pygame.display.get_surface().get_size()).convert()
+    player_paths = [f"assets/image/{name}.png" for name in ("player_idle", "walk1", "walk2", "att1", "att2", "att3")]
+    player_frames = [_convert_image(surface, path=path) for path in player_paths for surface in [_decode_image(path)] if surface]
+
+    def best_ms(run, times):
+        best = None
+        for _ in range(times):
+            start = time.perf_counter()
+            run()
+            elapsed = (time.perf_counter() - start) * 1000.0
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    report = {"scenes": {}, "formats": {}}
+    for optimize in (False, True):
+        mode = "fast_format" if optimize else "convert_alpha"
+        assets = AssetManager(registry, max_resident_scenes=len(registry), prefetch=False, store=AssetStore(), optimize_formats=optimize)
+        players = [fast_format(surface)[0] if optimize else surface for surface in player_frames]
+        for scene in registry:
+            assets.load_scene_assets(scene.id)
+            world_width, world_height = scene.world_dimensions or DEFAULT_WORLD_SIZE
+            background = assets.get(scene.background_key, size=(world_width, world_height))
+            platforms = create_platforms_for_level(scene.platform_definitions, assets)
+            sprites = SpriteCache() # The game draws sprites through one; it also keeps scaled copies RLE-accelerated
+            draws = [(assets.get(npc_def['image_key']), (npc_def.get('width', 50), npc_def.get('height', 70))) for npc_def in scene.npc_definitions]
+            for enemy_def in scene.enemy_definitions:
+                draws.extend((assets.get(key), (enemy_def.get('width', 40), enemy_def.get('height', 40))) for key in dict.fromkeys(ENEMY_FRAME_KEYS.values()))
+            draws.append((assets.get('bullet_img'), (10, 10)))
+            draws.extend((surface, (40, 50)) for surface in players)
+            draws = [(sprites.get(surface, size), ((i * 97) % 1100, (i * 53) % 500)) for i, (surface, size) in enumerate(draws) if surface]
+
+            def blit_sprites():
+                for _ in range(20):
+                    for surface, position in draws:
+                        frame.blit(surface, position)
+
+            blit_sprites() # RLE surfaces are encoded on their first blit
+            kinds = {}
+            for surface in [background] + [platform.image for platform in platforms] + [surface for surface, _ in draws]:
+                kind = classify(surface)
+                kinds[kind] = kinds.get(kind, 0) + 1
+            report["scenes"].setdefault(scene.id, {})[mode] = {
+                "static_layer_ms": best_ms(lambda: build_static_layer(background, platforms, world_width, world_height), max(3, repeats // 20)),
+                "sprites_ms": best_ms(blit_sprites, repeats) / 20, # One pass over the sprites
+                "sprites": len(draws),
+                "kinds": kinds,
+            }
+        report["formats"][mode] = assets.stats()["formats"]
+        assets.shutdown()
+    return report
+
+def print_blit_benchmark(report):
+    print("Blit time per scene, every image per-pixel alpha (convert_alpha) vs. fast_format (best of runs):")
+    print(f"{'scene':<10}{'static layer ms':>24}{'sprite pass ms':>24}   surfaces with fast_format")
+    print(f"{'':<10}{'before':>9}{'after':>9}{'':>6}{'before':>9}{'after':>9}")
+    for scene_id, modes in report["scenes"].items():
+        before, after = modes["convert_alpha"], modes["fast_format"]
+        kinds = ", ".join(f"{after['kinds'].get(kind, 0)} {kind}" for kind in KINDS)
+        print(f"{scene_id:<10}{before['static_layer_ms']:>9.3f}{after['static_layer_ms']:>9.3f}{before['static_layer_ms'] / after['static_layer_ms']:>5.1f}x"
+              f"{before['sprites_ms']:>9.3f}{after['sprites_ms']:>9.3f}{before['sprites_ms'] / after['sprites_ms']:>5.1f}x   {kinds}")
+    print(f"Assets loaded, by kind: {report['formats']['fast_format']}")
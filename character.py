@@ -1,6 +1,8 @@
 # character.py
 import pygame
 from gameobject import Animation
+from sprite_cache import sprite_cache
+from asset_store import asset_store
 
 class Player:
     def __init__(self, x, y, width, height):
@@ -14,6 +16,7 @@ class Player:
 
         self.jump_power = -13 # Keep as instantaneous velocity change
         self.velocity_y = 0
+        self.fall_dy = 0 # Vertical distance moved by the last apply_gravity, used by collision checks
         self.on_ground = False
         self.health = 100
         self.max_health = 3
@@ -31,19 +34,16 @@ class Player:
         self.time_accumulated_for_heal_tick = 0.0 # Accumulator for heal ticks
 
     def load_animations(self):
-        try:
-            idle_img = pygame.image.load("assets/image/player_idle.png").convert_alpha()
-            walk1 = pygame.image.load("assets/image/walk1.png").convert_alpha()
-            walk2 = pygame.image.load("assets/image/walk2.png").convert_alpha()
-            att1 = pygame.image.load("assets/image/att1.png").convert_alpha()
-            att2 = pygame.image.load("assets/image/att2.png").convert_alpha()
-            att3 = pygame.image.load("assets/image/att3.png").convert_alpha()
-
+        # Through the shared store: several of these files are byte-identical and share one surface
+        idle_img, walk1, walk2, att1, att2, att3 = frames = [
+            asset_store.acquire(f"assets/image/{name}.png", "Player")
+            for name in ("player_idle", "walk1", "walk2", "att1", "att2", "att3")]
+        if all(frames):
             self.idle_anim = Animation([idle_img], 0.2)
             self.walk_anim = Animation([walk1, walk2], 0.1)
             self.attack_anim = Animation([att1, att2, att3], 0.07, loop=False) # Faster attack
-        except pygame.error as e:
-            print(f"Error loading player animation images: {e}")
+        else:
+            print("Error loading player animation images")
             # Fallback animations with placeholder surfaces
             placeholder = pygame.Surface((self.rect.width, self.rect.height)); placeholder.fill((0,255,0))
             self.idle_anim = Animation([placeholder], 1)
@@ -72,11 +72,14 @@ class Player:
             self.velocity_y = self.jump_power
             self.on_ground = False # Will be corrected by collision if immediately lands
 
-    def apply_gravity(self, gravity_accel=30, max_fall_speed=20):
-        self.velocity_y += gravity_accel * (1.0/60.0) # Assuming dt for physics is ~1/60 for now.
+    def apply_gravity(self, gravity_accel=30, max_fall_speed=20, dt_seconds=1.0/60.0):
+        # Tuned in 60 Hz ticks: velocity_y is pixels per 1/60 s, scaled to the actual physics step
+        tick_scale = dt_seconds * 60.0
+        self.velocity_y += gravity_accel * (1.0/60.0) * tick_scale
         if self.velocity_y > max_fall_speed:
             self.velocity_y = max_fall_speed
-        self.rect.y += self.velocity_y
+        self.fall_dy = self.velocity_y * tick_scale
+        self.rect.y += self.fall_dy
 
     def attack(self):
         """Initiates an attack if not already attacking and cooldown allows."""
@@ -103,9 +106,10 @@ class Player:
         else: # facing left
             return pygame.Rect(self.rect.left - attack_width, self.rect.top, attack_width, attack_height)
 
-    def update(self, dt_seconds, enemies_list):
+    def update(self, dt_seconds, enemies_list, keys=None, entity_index=None):
         """
         Updates player state, animations, attack logic, and healing.
+        With an entity_index (spatial.DynamicGrid) only enemies under the attack rect are tested.
         """
         # Cooldown timer
         if self.attack_cooldown_timer > 0:
@@ -127,7 +131,8 @@ class Player:
                 # you might need a list of enemies already hit in this current swing.
                 # For simplicity, this hits on frame 1.
                 if self.attack_anim.current_frame_index == 1: # Or other specific damage frames
-                    for enemy_instance in enemies_list:
+                    targets = entity_index.query_rect(attack_rect, 'enemy') if entity_index else enemies_list
+                    for enemy_instance in targets:
                         if enemy_instance.alive and attack_rect.colliderect(enemy_instance.rect):
                             enemy_instance.take_damage(1) # Player damage = 1
                             # To hit only one enemy per swing or per frame, add more logic here
@@ -138,7 +143,8 @@ class Player:
             # This requires getting key state, which is usually done in the game loop's input handling.
             # For now, we assume that if player.move was called with non-zero dx, they are "trying to move".
             # A more robust way is to check pygame.key.get_pressed() here.
-            keys = pygame.key.get_pressed() # Get current key state for accurate animation
+            if keys is None:
+                keys = pygame.key.get_pressed() # Get current key state for accurate animation
             is_moving_input = keys[pygame.K_LEFT] or keys[pygame.K_RIGHT]
 
             if not self.on_ground:
@@ -175,15 +181,11 @@ class Player:
                                 self.rect.width * zoom, self.rect.height * zoom))
             return
 
-        display_frame = frame_to_draw
-        if self.facing == "left":
-            display_frame = pygame.transform.flip(frame_to_draw, True, False)
-
         scaled_width = int(self.rect.width * zoom)
         scaled_height = int(self.rect.height * zoom)
         if scaled_width <=0 or scaled_height <=0: return # Avoid scaling to zero or negative
 
-        scaled_img = pygame.transform.scale(display_frame, (scaled_width, scaled_height))
+        scaled_img = sprite_cache.get(frame_to_draw, (scaled_width, scaled_height), flip_x=self.facing == "left")
 
         screen_x = int((self.rect.x - camera_rect.x) * zoom)
         screen_y = int((self.rect.y - camera_rect.y) * zoom)
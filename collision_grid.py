@@ -0,0 +1,87 @@
+# collision_grid.py
+import numpy as np
+
+class CollisionGrid:
+    """
+    A scene's platforms rasterized into boolean cell grids, built once in load_scene.
+    Layers: 'ground' (non-wall platforms), 'wall' and 'solid' (both). A cell is set when
+    any platform of the layer touches it, so probes never miss a platform; with
+    cell_size=1 they are exact, with bigger cells they may also report platforms up to
+    one cell away. Every probe is O(1): it reads a summed-area table instead of cells.
+    """
+    LAYERS = ('ground', 'wall', 'solid')
+
+    def __init__(self, platforms, world_width, world_height, cell_size=4):
+        cs = self.cell_size = cell_size
+        rects = [p.rect for p in platforms if p.rect.width > 0 and p.rect.height > 0]
+        left = min([0] + [r.left for r in rects])
+        top = min([0] + [r.top for r in rects])
+        right = max([world_width] + [r.right for r in rects])
+        bottom = max([world_height] + [r.bottom for r in rects])
+        self.origin_x, self.origin_y = (left // cs) * cs, (top // cs) * cs
+        self.cols = -(-(right - self.origin_x) // cs)
+        self.rows = -(-(bottom - self.origin_y) // cs)
+
+        cells = {layer: np.zeros((self.rows, self.cols), dtype=bool) for layer in self.LAYERS}
+        for platform in platforms:
+            rect = platform.rect
+            if rect.width <= 0 or rect.height <= 0: continue
+            c0, c1 = (rect.left - self.origin_x) // cs, (rect.right - 1 - self.origin_x) // cs + 1
+            r0, r1 = (rect.top - self.origin_y) // cs, (rect.bottom - 1 - self.origin_y) // cs + 1
+            cells['wall' if platform.is_wall else 'ground'][r0:r1, c0:c1] = True
+        cells['solid'] = cells['ground'] | cells['wall']
+        self.cells = cells
+
+        # Summed-area tables: area[r, c] = set cells in rows < r and columns < c
+        self.area = {}
+        for layer, grid in cells.items():
+            area = np.zeros((self.rows + 1, self.cols + 1), dtype=np.int32)
+            area[1:, 1:] = grid.cumsum(axis=0, dtype=np.int32).cumsum(axis=1, dtype=np.int32)
+            self.area[layer] = area
+
+    def _cell_range(self, start, end, origin, count):
+        """Cell indices [c0, c1) covering pixels [start, end), clipped to the grid."""
+        cs = self.cell_size
+        c0 = min(max((start - origin) // cs, 0), count)
+        c1 = min(max((end - 1 - origin) // cs + 1, 0), count)
+        return c0, c1
+
+    def _count(self, layer, x0, y0, x1, y1):
+        if x1 <= x0 or y1 <= y0: return 0
+        c0, c1 = self._cell_range(x0, x1, self.origin_x, self.cols)
+        r0, r1 = self._cell_range(y0, y1, self.origin_y, self.rows)
+        if c1 <= c0 or r1 <= r0: return 0
+        area = self.area[layer]
+        return area[r1, c1] - area[r0, c1] - area[r1, c0] + area[r0, c0]
+
+    def point(self, x, y, layer='solid'):
+        """Is pixel (x, y) inside a platform of `layer`?"""
+        return self._count(layer, x, y, x + 1, y + 1) > 0
+
+    def row_span(self, y, x0, x1, layer='solid'):
+        """Any platform of `layer` on pixel row y between x0 (inclusive) and x1 (exclusive)? E.g. ground under feet."""
+        return self._count(layer, x0, y, x1, y + 1) > 0
+
+    def column_span(self, x, y0, y1, layer='solid'):
+        """Any platform of `layer` in pixel column x between y0 and y1 (exclusive)? E.g. a wall ahead."""
+        return self._count(layer, x, y0, x + 1, y1) > 0
+
+    def rect_any(self, rect, layer='solid'):
+        """Any platform of `layer` overlapping `rect`?"""
+        return self._count(layer, rect.left, rect.top, rect.right, rect.bottom) > 0
+
+    def row_spans(self, y, x0, x1, layer='solid'):
+        """Vectorized row_span over arrays of rows and pixel ranges."""
+        y, x0, x1 = np.asarray(y), np.asarray(x0), np.asarray(x1)
+        cs, area = self.cell_size, self.area[layer]
+        c0 = np.clip((x0 - self.origin_x) // cs, 0, self.cols)
+        c1 = np.clip((x1 - 1 - self.origin_x) // cs + 1, 0, self.cols)
+        row = (y - self.origin_y) // cs
+        r0, r1 = np.clip(row, 0, self.rows), np.clip(row + 1, 0, self.rows)
+        counts = area[r1, c1] - area[r0, c1] - area[r1, c0] + area[r0, c0]
+        return (counts > 0) & (x1 > x0) & (c1 > c0) & (r1 > r0)
+
+    def points(self, x, y, layer='solid'):
+        """Vectorized point over arrays of pixel coordinates."""
+        x = np.asarray(x)
+        return self.row_spans(y, x, x + 1, layer)
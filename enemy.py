@@ -1,9 +1,10 @@
 # enemy.py
 import pygame
 from gameobject import Animation, GameObject 
+from sprite_cache import sprite_cache
 
 class Enemy(GameObject):
-    def __init__(self, x, y, width, height, animation_images_dict, attack_range=50, damage=1,enemy_uid=None): # Takes dict of images
+    def __init__(self, x, y, width, height, animation_images_dict, attack_range=50, damage=1,enemy_uid=None, edge_aware=False): # Takes dict of images
         super().__init__(x, y, width, height)
         self.uid = enemy_uid # ADDED: Store the unique ID
         self.initial_x = x # Store initial position for potential dynamic ID generation fallback
@@ -16,12 +17,14 @@ class Enemy(GameObject):
         self.attack_range = attack_range 
         self.damage = damage
         self.direction = 1 
+        self.edge_aware = edge_aware # Turn around at platform edges instead of walking off (needs a collision grid)
         self.health = 3 
         self.max_health = 3
         self.is_attacking = False
         self.facing = "left" 
         
         self.velocity_y = 0
+        self.fall_dy = 0 # Vertical distance moved by the last apply_gravity, used by collision checks
         self.on_ground = False
         self.attack_cooldown_time = 2.0 
         self.last_attack_time = 0 
@@ -50,6 +53,22 @@ class Enemy(GameObject):
                                       self.animation_images['attack2'], 
                                       self.animation_images['attack3']], 0.1, loop=False)
 
+    def respawn(self):
+        """Back to the state __init__ leaves it in, keeping the built animations (for a scene entered again)."""
+        self.rect.topleft = (self.initial_x, self.initial_y)
+        self.alive = True
+        self.direction = 1
+        self.health = self.max_health
+        self.is_attacking = False
+        self.facing = "left"
+        self.velocity_y = 0
+        self.fall_dy = 0
+        self.on_ground = False
+        self.last_attack_time = 0
+        for animation in (self.idle_anim, self.walk_anim, self.attack_anim):
+            animation.reset()
+        self.current_animation = self.idle_anim
+
     def take_damage(self, damage_amount):
         self.health -= damage_amount
         if self.health <= 0:
@@ -60,9 +79,20 @@ class Enemy(GameObject):
         self.alive = False
         self.current_animation = self.idle_anim # Or a death animation
 
-    def patrol(self, dt_seconds):
+    def at_ledge(self, collision_grid):
+        """Standing on something, but with no ground just past the leading foot."""
+        if not collision_grid.row_span(self.rect.bottom, self.rect.left, self.rect.right):
+            return False # In the air, there is no edge to stop at
+        ahead_x = self.rect.right if self.direction == 1 else self.rect.left - 1
+        return not collision_grid.point(ahead_x, self.rect.bottom)
+
+    def patrol(self, dt_seconds, collision_grid=None):
         if self.is_attacking: return
 
+        if self.edge_aware and collision_grid and self.at_ledge(collision_grid):
+            self.direction = -self.direction
+            self.facing = "right" if self.direction == 1 else "left"
+
         self.rect.x += self.speed * self.direction * dt_seconds # Time-based movement
 
         # Patrol boundary collision
@@ -76,12 +106,14 @@ class Enemy(GameObject):
         if not self.is_attacking: # Only set to walk if not in attack animation
             self.current_animation = self.walk_anim
 
-    def apply_gravity(self, gravity_accel=30, max_fall_speed=15): # Similar to player
+    def apply_gravity(self, gravity_accel=30, max_fall_speed=15, dt_seconds=1.0/60.0): # Similar to player
         if not self.on_ground:
-            self.velocity_y += gravity_accel * (1.0/60.0) # Approx for now, pass dt if physics step varies
+            tick_scale = dt_seconds * 60.0 # Tuned in 60 Hz ticks, see Player.apply_gravity
+            self.velocity_y += gravity_accel * (1.0/60.0) * tick_scale
             if self.velocity_y > max_fall_speed:
                 self.velocity_y = max_fall_speed
-            self.rect.y += self.velocity_y
+            self.fall_dy = self.velocity_y * tick_scale
+            self.rect.y += self.fall_dy
 
     def check_vertical_collision(self, platforms): # Renamed for consistency if user prefers
         self.on_ground = False 
@@ -89,13 +121,13 @@ class Enemy(GameObject):
             if platform.is_wall: continue
             if self.rect.colliderect(platform.rect):
                 if self.velocity_y > 0: 
-                    previous_rect_bottom = self.rect.bottom - self.velocity_y
+                    previous_rect_bottom = self.rect.bottom - self.fall_dy
                     if previous_rect_bottom <= platform.rect.top + 1 and self.rect.bottom >= platform.rect.top:
                         self.rect.bottom = platform.rect.top
                         self.velocity_y = 0
                         self.on_ground = True
                 elif self.velocity_y < 0: 
-                    previous_rect_top = self.rect.top - self.velocity_y 
+                    previous_rect_top = self.rect.top - self.fall_dy 
                     if previous_rect_top >= platform.rect.bottom - 1 and self.rect.top <= platform.rect.bottom:
                         self.rect.top = platform.rect.bottom
                         self.velocity_y = 0
@@ -125,7 +157,7 @@ class Enemy(GameObject):
         self.attack_anim.reset()
         self.last_attack_time = current_game_time_seconds
 
-    def update(self, dt_seconds, player_rect, platforms, current_game_time_seconds):
+    def update(self, dt_seconds, player_rect, platforms, current_game_time_seconds, platform_grid=None, collision_grid=None):
         if not self.alive: return 0 
         
         damage_dealt_this_frame = 0
@@ -165,12 +197,18 @@ class Enemy(GameObject):
                 if eff_attack_rect.colliderect(player_rect):
                     damage_dealt_this_frame = self.damage
             else: 
-                self.patrol(dt_seconds) # This updates self.rect.x and potentially self.facing/self.direction
+                self.patrol(dt_seconds, collision_grid) # This updates self.rect.x and potentially self.facing/self.direction
 
-        self.check_horizontal_collision(platforms, original_x)
+        nearby_platforms = platforms
+        if platform_grid: # Broadphase: only platforms overlapping this frame's horizontal sweep
+            nearby_platforms = platform_grid.query(self.rect.union(self.rect.move(original_x - self.rect.x, 0)))
+        self.check_horizontal_collision(nearby_platforms, original_x)
         
-        self.apply_gravity() # apply_gravity updates self.rect.y
-        self.check_vertical_collision(platforms)
+        rect_before_fall = self.rect.copy()
+        self.apply_gravity(dt_seconds=dt_seconds) # apply_gravity updates self.rect.y
+        if platform_grid:
+            nearby_platforms = platform_grid.query(rect_before_fall.union(self.rect).inflate(0, 4))
+        self.check_vertical_collision(nearby_platforms)
         
         # Final animation selection based on state
         if self.is_attacking:
@@ -195,15 +233,11 @@ class Enemy(GameObject):
         frame = self.current_animation.get_current_frame()
         if not frame: return # Further safety
 
-        current_display_frame = frame
-        if self.facing == "left":
-            current_display_frame = pygame.transform.flip(frame, True, False)
-        
         scaled_width = int(self.rect.width * zoom)
         scaled_height = int(self.rect.height * zoom)
         if scaled_width <=0 or scaled_height <=0: return
 
-        scaled_img = pygame.transform.scale(current_display_frame, (scaled_width, scaled_height))
+        scaled_img = sprite_cache.get(frame, (scaled_width, scaled_height), flip_x=self.facing == "left")
         screen_x = int((self.rect.x - camera_rect.x) * zoom)
         screen_y = int((self.rect.y - camera_rect.y) * zoom)
         screen.blit(scaled_img, (screen_x, screen_y))
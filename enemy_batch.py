@@ -0,0 +1,216 @@
+# enemy_batch.py
+import numpy as np
+
+def _rect_round(values):
+    """Rounds the way pygame.Rect attribute assignment does: halves go away from zero."""
+    rounded = np.rint(values)
+    truncated = np.trunc(values)
+    halves = np.abs(values - truncated) == 0.5
+    rounded[halves] = (truncated + np.sign(values))[halves]
+    return rounded.astype(np.int64)
+
+def _overlaps(x, y, w, h, rect):
+    """Vectorized pygame.Rect.colliderect of every (x, y, w, h) box against one rect."""
+    return (x < rect.right) & (y < rect.bottom) & (x + w > rect.left) & (y + h > rect.top)
+
+class EnemyBatch:
+    """
+    Updates every standard Enemy of a scene at once. Kinematic and AI state (position,
+    patrol direction, facing, fall speed, attack cooldown) lives in NumPy arrays; patrol,
+    bound reversal, player distance, attack eligibility, gravity and platform collisions
+    are computed for all enemies in a handful of vectorized operations per platform, and
+    the results are scattered back onto the Enemy objects for drawing and animation.
+
+    The maths mirrors Enemy.update step for step (including Rect rounding and the
+    platform_grid candidate sets), so a batched step gives the same result as calling
+    Enemy.update on each enemy.
+    """
+    def __init__(self):
+        self.enemies = []
+        self.enemy_ids = ()
+
+    def invalidate(self):
+        """Forgets the gathered enemies, so the next update reads their state from the objects again."""
+        self.enemies = []
+        self.enemy_ids = ()
+
+    def _gather(self, enemies):
+        """(Re)builds the state arrays from the Enemy objects, which are kept in sync after every step."""
+        self.enemies = list(enemies)
+        self.enemy_ids = tuple(id(e) for e in self.enemies)
+        def column(getter, dtype):
+            return np.fromiter((getter(e) for e in self.enemies), dtype=dtype, count=len(self.enemies))
+        self.x = column(lambda e: e.rect.x, np.int64)
+        self.y = column(lambda e: e.rect.y, np.int64)
+        self.w = column(lambda e: e.rect.width, np.int64)
+        self.h = column(lambda e: e.rect.height, np.int64)
+        self.speed = column(lambda e: e.speed, np.float64)
+        self.direction = column(lambda e: e.direction, np.int64)
+        self.facing_left = column(lambda e: e.facing == "left", bool)
+        self.velocity_y = column(lambda e: e.velocity_y, np.float64)
+        self.fall_dy = column(lambda e: e.fall_dy, np.float64)
+        self.on_ground = column(lambda e: e.on_ground, bool)
+        self.is_attacking = column(lambda e: e.is_attacking, bool)
+        self.last_attack_time = column(lambda e: e.last_attack_time, np.float64)
+        self.attack_cooldown_time = column(lambda e: e.attack_cooldown_time, np.float64)
+        self.attack_range = column(lambda e: e.attack_range, np.float64)
+        self.damage = column(lambda e: e.damage, np.int64)
+        self.edge_aware = column(lambda e: e.edge_aware, bool)
+        self.patrol_left = column(lambda e: e.patrol_bounds[0], np.float64)
+        self.patrol_right = column(lambda e: e.patrol_bounds[1], np.float64)
+
+    def update(self, enemies, dt_seconds, player_rect, platforms, current_game_time_seconds, platform_grid=None, collision_grid=None):
+        """
+        Batched Enemy.update for every enemy in `enemies` (all alive). Returns a list of
+        (enemy, damage) for the enemies that hit the player this step, in list order.
+        """
+        if tuple(id(e) for e in enemies) != self.enemy_ids:
+            self._gather(enemies) # Enemies were added or removed since the last step
+        if not self.enemies: return []
+        x, y, w, h = self.x, self.y, self.w, self.h
+        original_x = x.copy()
+
+        center_x = x + w // 2
+        center_y = y + h // 2
+        distance_to_player = np.abs(center_x - player_rect.centerx)
+        vertical_distance = np.abs(center_y - player_rect.centery)
+        player_left_of = player_rect.centerx < center_x
+
+        # Face a nearby player unless mid-attack
+        was_attacking = self.is_attacking.copy()
+        self.facing_left = np.where(~was_attacking & (distance_to_player < self.attack_range * 2), player_left_of, self.facing_left)
+
+        # Attacks end when their (non-looping) animation has finished
+        attacking_idx = np.flatnonzero(was_attacking)
+        attack_done = np.fromiter((self.enemies[i].attack_anim.done for i in attacking_idx), dtype=bool, count=len(attacking_idx))
+        self.is_attacking[attacking_idx[attack_done]] = False
+
+        # Start attacks / patrol for the rest
+        idle = ~was_attacking
+        can_attack = current_game_time_seconds - self.last_attack_time >= self.attack_cooldown_time
+        starts = idle & (distance_to_player < self.attack_range) & (vertical_distance < h) & can_attack
+        self.facing_left = np.where(starts, player_left_of, self.facing_left)
+        self.is_attacking |= starts
+        self.last_attack_time = np.where(starts, current_game_time_seconds, self.last_attack_time)
+        hitbox_w = w + 20
+        hitbox_x = np.where(self.facing_left, center_x - hitbox_w, center_x)
+        hits = starts & _overlaps(hitbox_x, y, hitbox_w, h, player_rect)
+
+        patrolling = idle & ~starts
+        if collision_grid is not None and self.edge_aware.any():
+            # Enemy.at_ledge: standing on something with no ground past the leading foot
+            feet_y = y + h
+            ahead_x = np.where(self.direction == 1, x + w, x - 1)
+            at_ledge = (patrolling & self.edge_aware & collision_grid.row_spans(feet_y, x, x + w)
+                        & ~collision_grid.points(ahead_x, feet_y))
+            self.direction[at_ledge] *= -1
+            self.facing_left[at_ledge] = self.direction[at_ledge] == -1
+        x[:] = np.where(patrolling, _rect_round(x + self.speed * self.direction * dt_seconds), x)
+        turn_left = patrolling & (self.direction == 1) & (x + w >= self.patrol_right)
+        turn_right = patrolling & (self.direction == -1) & (x <= self.patrol_left) & ~turn_left
+        self.direction[turn_left] = -1; self.facing_left[turn_left] = True
+        self.direction[turn_right] = 1; self.facing_left[turn_right] = False
+
+        self._horizontal_collisions(platforms, platform_grid, original_x)
+
+        # Gravity (skipped while standing on something)
+        y_before_fall = y.copy()
+        falling = ~self.on_ground
+        tick_scale = dt_seconds * 60.0
+        velocity_y = np.where(falling, self.velocity_y + 30 * (1.0/60.0) * tick_scale, self.velocity_y)
+        velocity_y = np.where(falling & (velocity_y > 15), 15.0, velocity_y)
+        self.velocity_y = velocity_y
+        self.fall_dy = np.where(falling, velocity_y * tick_scale, self.fall_dy)
+        y[:] = np.where(falling, _rect_round(y + self.fall_dy), y)
+
+        self._vertical_collisions(platforms, platform_grid, y_before_fall)
+
+        return self._scatter(dt_seconds, current_game_time_seconds, starts, patrolling, hits)
+
+    def _candidates(self, platforms, platform_grid, left, top, right, bottom):
+        """
+        Per platform, which enemies would have it among their candidates: every enemy
+        without a grid, otherwise those whose query rect overlaps it (as StaticGrid.query).
+        """
+        for platform in platforms:
+            prect = platform.rect
+            if prect.width <= 0 or prect.height <= 0: continue # colliderect never matches an empty rect
+            if platform_grid is None:
+                yield platform, None
+                continue
+            mask = (left < prect.right) & (top < prect.bottom) & (right > prect.left) & (bottom > prect.top)
+            if mask.any():
+                yield platform, mask
+
+    def _horizontal_collisions(self, platforms, platform_grid, original_x):
+        x, y, w, h = self.x, self.y, self.w, self.h
+        # Query rect of Enemy.update: this step's horizontal sweep
+        left, right = np.minimum(x, original_x), np.maximum(x, original_x) + w
+        for platform, mask in self._candidates(platforms, platform_grid, left, y, right, y + h):
+            prect = platform.rect
+            colliding = _overlaps(x, y, w, h, prect)
+            if mask is not None: colliding &= mask
+            if not colliding.any(): continue
+            overlap_y = np.maximum(0, np.minimum(y + h, prect.bottom) - np.maximum(y, prect.top))
+            blocked = colliding & (overlap_y > h / 4)
+            moved_left = blocked & (x < original_x)
+            moved_right = blocked & (x > original_x)
+            x[moved_left] = prect.right
+            x[moved_right] = prect.left - w[moved_right]
+            turn_right = moved_left & (self.direction == -1)
+            turn_left = moved_right & (self.direction == 1)
+            self.direction[turn_right] = 1; self.facing_left[turn_right] = False
+            self.direction[turn_left] = -1; self.facing_left[turn_left] = True
+
+    def _vertical_collisions(self, platforms, platform_grid, y_before_fall):
+        x, y, w, h = self.x, self.y, self.w, self.h
+        self.on_ground = np.zeros(len(x), dtype=bool)
+        # Query rect of Enemy.update: the fall (or rise) of this step, inflated by 2px each way
+        top, bottom = np.minimum(y, y_before_fall) - 2, np.maximum(y, y_before_fall) + h + 2
+        for platform, mask in self._candidates(platforms, platform_grid, x, top, x + w, bottom):
+            if platform.is_wall: continue
+            prect = platform.rect
+            colliding = _overlaps(x, y, w, h, prect)
+            if mask is not None: colliding &= mask
+            if not colliding.any(): continue
+            landing = colliding & (self.velocity_y > 0) & ((y + h) - self.fall_dy <= prect.top + 1) & (y + h >= prect.top)
+            bumping = colliding & (self.velocity_y < 0) & (y - self.fall_dy >= prect.bottom - 1) & (y <= prect.bottom)
+            y[landing] = prect.top - h[landing]
+            y[bumping] = prect.bottom
+            self.velocity_y[landing | bumping] = 0.0
+            self.on_ground |= landing
+
+    def _scatter(self, dt_seconds, current_game_time_seconds, starts, patrolling, hits):
+        """Writes the new state back onto the Enemy objects and runs their animations."""
+        damage_events = []
+        x, y = self.x.tolist(), self.y.tolist()
+        velocity_y, fall_dy = self.velocity_y.tolist(), self.fall_dy.tolist()
+        direction, facing_left = self.direction.tolist(), self.facing_left.tolist()
+        on_ground, is_attacking = self.on_ground.tolist(), self.is_attacking.tolist()
+        starts, patrolling, hits = starts.tolist(), patrolling.tolist(), hits.tolist()
+        for i, enemy in enumerate(self.enemies):
+            enemy.rect.x = x[i]; enemy.rect.y = y[i]
+            enemy.velocity_y = velocity_y[i]; enemy.fall_dy = fall_dy[i]
+            enemy.direction = direction[i]
+            enemy.facing = "left" if facing_left[i] else "right"
+            enemy.on_ground = on_ground[i]
+            enemy.is_attacking = is_attacking[i]
+            if starts[i]:
+                enemy.current_animation = enemy.attack_anim
+                enemy.attack_anim.reset()
+                enemy.last_attack_time = current_game_time_seconds
+                if hits[i]:
+                    damage_events.append((enemy, enemy.damage))
+            elif patrolling[i]:
+                enemy.current_animation = enemy.walk_anim
+
+            # Final animation selection, as in Enemy.update
+            if enemy.is_attacking:
+                enemy.current_animation = enemy.attack_anim
+            elif not enemy.on_ground:
+                enemy.current_animation = enemy.idle_anim
+            elif enemy.current_animation != enemy.walk_anim:
+                enemy.current_animation = enemy.idle_anim
+            if enemy.current_animation:
+                enemy.current_animation.update(dt_seconds)
+        return damage_events
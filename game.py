@@ -2,90 +2,78 @@
 import pygame
 import sys
 import math
+import time
 import random # If not already imported
 
 # Import WitcherNPC along with NPC
 from npc import NPC, WitcherNPC, truth_seeker_dialogs, steelsoul_dialogs, noze_dialogs, hornhead_dialogs, witcher_dialogs
 from character import Player
 from enemy import Enemy
-from gameobject import Platform, Animation, Projectile, create_platforms_for_level # Added Projectile
-from screen import (load_assets, Camera, draw_background_scaled_with_camera, draw_objects,
-                    draw_darkness_with_light, draw_text)
-
-from scene_config import SCENES_DATA, SCENE_ID_SCENE1, SCENE_ID_SCENE2, SCENE_ID_SCENE3, SCENE_ID_SCENE4, SCENE_ID_SCENE5
+from gameobject import create_platforms_for_level
+from screen import (Camera, draw_background_scaled_with_camera, draw_objects, draw_text,
+                    DirtyRectRenderer, collect_entity_screen_rects, text_cache, overlay_pool, static_layer_steps)
+
+from spatial import StaticGrid, DynamicGrid
+from projectile_pool import ProjectilePool
+from enemy_batch import EnemyBatch
+from collision_grid import CollisionGrid
+from scene_registry import compile_scenes
+from asset_manager import AssetManager
+from scene_cache import SceneInstance, SceneCache
+from scene_loader import SceneLoad
+from asset_cache import AssetCache, ASSET_CACHE_PATH
+from atlas import load_atlas
+from startup_profile import startup_profiler
+from scene_config import SCENES_DATA, SCENE_ID_SCENE1
 
 class Game:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, dirty_rect_rendering=False, tick_rate=60, max_steps_per_frame=5, enemy_batching=False, seed=None,
+                 incremental_scene_loading=True, asset_cache_path=ASSET_CACHE_PATH):
+        with startup_profiler.phase("pygame.init"):
+            pygame.init()
         self.WIDTH, self.HEIGHT = 1200, 600
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("G The Bugs Draft - Scene Demo")
+        with startup_profiler.phase("display"):
+            self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+            pygame.display.set_caption("G The Bugs Draft - Scene Demo")
 
         self.clock = pygame.time.Clock()
+        # Opt-in: repaint/present only changed screen areas instead of a full flip every frame
+        self.dirty_rect_rendering = dirty_rect_rendering
+        self.dirty_renderer = DirtyRectRenderer((self.WIDTH, self.HEIGHT))
+        # Opt-in: step all enemies together with NumPy instead of calling Enemy.update on each
+        self.enemy_batch = EnemyBatch() if enemy_batching else None
+        # Where held keys are read from; headless/scripted runs swap in their own source
+        self.get_key_state = pygame.key.get_pressed
         self.FPS = 60
+        # All gameplay randomness comes from self.rng, so a run is reproducible from its seed (see replay.py)
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.recorder = None # replay.InputRecorder when the session is being recorded
+        # Fixed-timestep simulation: update() always advances by physics_dt, however fast frames are rendered
+        self.tick_rate = tick_rate
+        self.physics_dt = 1.0 / tick_rate
+        self.max_steps_per_frame = max_steps_per_frame # Beyond this, frame time is dropped instead of caught up
+        self.sim_accumulator = 0.0
+        self.game_time_seconds = 0.0 # Simulation clock, only advances while playing
+        self.sim_steps = 0
+        self.dropped_sim_time = 0.0
+        self.previous_positions = {} # id(obj) -> (obj, x, y) before the last step, for render interpolation
         self.zoom = 1 
-        self.font = pygame.font.Font(None, 36)
-        self.dialog_font = pygame.font.Font(None, 28)
-        self.interaction_prompt_font = pygame.font.Font(None, 22)
-
-        self.loaded_assets = load_assets(self.WIDTH, self.HEIGHT)
-
-        self.platform_image_assets = {
-            'floor1_img': self.loaded_assets.get('floor1_img'),      # From scene 2 def
-            'floor2_img': self.loaded_assets.get('floor2_img'),      # From scene 2 def
-            'platform_img': self.loaded_assets.get('platform_img'),  # From scene 2 def
-            'benchbottom_img': self.loaded_assets.get('benchbottom_img'),
-            'benchside2_1_img': self.loaded_assets.get('benchside2_1_img'),
-            'benchside2_2_img': self.loaded_assets.get('benchside2_2_img'),
-            'wall_img': self.loaded_assets.get('wall_img'),          # From scene 2 def
-
-            # Scene 1
-            'floor1_1': self.loaded_assets.get('floor1_1'),
-            'floor1_2': self.loaded_assets.get('floor1_2'),
-            'floor1_3': self.loaded_assets.get('floor1_3'),
-            'floor1_4': self.loaded_assets.get('floor1_4'),
-            'wall1': self.loaded_assets.get('wall1'),
-            # Scene 3
-            'floor3_1': self.loaded_assets.get('floor3_1'),
-            'floor3_2': self.loaded_assets.get('floor3_2'),
-            'upfloor3_1': self.loaded_assets.get('upfloor3_1'),
-            'upfloor3_2': self.loaded_assets.get('upfloor3_2'),
-            'upfloor3_3': self.loaded_assets.get('upfloor3_3'),
-            'upfloor3_4': self.loaded_assets.get('upfloor3_4'),
-            'upfloor3_5': self.loaded_assets.get('upfloor3_5'),
-            'upfloor3_6': self.loaded_assets.get('upfloor3_6'),
-            'floatfloor3': self.loaded_assets.get('floatfloor3'),
-            'wall3': self.loaded_assets.get('wall3'),
-            # Scene 4
-            'floor4_1': self.loaded_assets.get('floor4_1'),
-            'floor4_2': self.loaded_assets.get('floor4_2'),
-            'floor4_3': self.loaded_assets.get('floor4_3'),
-            'wall4_1': self.loaded_assets.get('wall4_1'),
-            'wall4_2': self.loaded_assets.get('wall4_2'),
-            # Scene 5
-            'floor5_1': self.loaded_assets.get('floor5_1'),
-            'floor5_2': self.loaded_assets.get('floor5_2'),
-            'wall5_1': self.loaded_assets.get('wall5_1'),
-            'wall5_2': self.loaded_assets.get('wall5_2'),
-        }
-        self.npc_image_assets = {
-            'truth_seeker': self.loaded_assets.get('truth_seeker_img'),
-            'steelsoul': self.loaded_assets.get('steelsoul_img'),
-            'noze_img': self.loaded_assets.get('noze_img'),
-            'hornhead_img': self.loaded_assets.get('hornhead_img'),
-            'witcher_img': self.loaded_assets.get('witcher_img'), # Base image for Witcher
-            # Add witcher2 and bullet if they are treated as NPC assets, or handle separately
-            'witcher2_img': self.loaded_assets.get('witcher2_img'),
-            'bullet_img': self.loaded_assets.get('bullet_img')
-        }
-        self.background_image_assets = {
-            'main_bg': self.loaded_assets.get('main_bg'), # Fallback or default
-            'bg1': self.loaded_assets.get('bg1'), # Scene 1 BG
-            'bg3': self.loaded_assets.get('bg3'), # Scene 3 BG
-            'bg4': self.loaded_assets.get('bg4'), # Scene 4 BG
-            'bg5': self.loaded_assets.get('bg5'), # Scene 5 BG
-            'second_bg': self.loaded_assets.get('second_bg'), # Scene 2 BG
-        }
+        with startup_profiler.phase("fonts"):
+            self.font = pygame.font.Font(None, 36)
+            self.dialog_font = pygame.font.Font(None, 28)
+            self.interaction_prompt_font = pygame.font.Font(None, 22)
+
+        with startup_profiler.phase("compile_scenes"):
+            self.scene_registry = compile_scenes(SCENES_DATA) # Validated, id-indexed scenes (raises SceneConfigError on bad data)
+        # Only the menu is loaded now; each scene's images are loaded when it is first entered,
+        # from the preprocessed cache file when it is up to date (see asset_cache.py) and with the
+        # small platform images taken from the packed atlas sheets when they have been built (see atlas.py).
+        # asset_cache_path=None reads every image from its PNG and writes no cache file
+        with startup_profiler.phase("AssetManager (menu assets)"):
+            cache = AssetCache(asset_cache_path) if asset_cache_path else None
+            self.assets = AssetManager(self.scene_registry, cache=cache, atlas=load_atlas())
+
         self.all_npc_dialogs = {
             'truth_seeker': truth_seeker_dialogs,
             'steelsoul': steelsoul_dialogs,
@@ -93,31 +81,39 @@ class Game:
             'hornhead': hornhead_dialogs,    
             'witcher': witcher_dialogs,    
         }
-        self.raw_enemy_images = { # For standard enemies
-            'idle': pygame.image.load("assets/image/mob1_1.png").convert_alpha(),
-            'walk1': pygame.image.load("assets/image/mob1_1.png").convert_alpha(),
-            'walk2': pygame.image.load("assets/image/mob1_2.png").convert_alpha(),
-            'attack1': pygame.image.load("assets/image/mob1_1.png").convert_alpha(),
-            'attack2': pygame.image.load("assets/image/mob1_2.png").convert_alpha(),
-            'attack3': pygame.image.load("assets/image/mob1_2.png").convert_alpha()
-        }
-        self.start_button_img = self.loaded_assets.get('start_button_img')
-        self.exit_button_img = self.loaded_assets.get('exit_button_img')
-        self.home_screen_img = self.loaded_assets.get('home_screen')
+        self.raw_enemy_images = {} # For standard enemies, filled from the scene's assets in load_scene
+        self.start_button_img = self.assets.get('start_button_img')
+        self.exit_button_img = self.assets.get('exit_button_img')
+        self.home_screen_img = self.assets.get('home_screen')
 
-        self.scenes_data = SCENES_DATA
+        self.current_scene = None
         self.current_scene_id = None
         self.story_flags = {}
 
         self.platforms = []
         self.npcs = []
         self.enemies = []
-        self.projectiles = [] # NEW list for projectiles
-
-        self.player = Player(0, 0, 40, 50) # Dimensions might need adjustment based on player art
+        self.projectile_pool = ProjectilePool(self.assets.get('bullet_img')) # Every live projectile, as arrays
+        self.static_layer = None # Background + platforms of the current scene, built in load_scene
+        self.platform_grid = StaticGrid([]) # Broadphase over self.platforms, rebuilt in load_scene
+        self.entity_index = DynamicGrid() # Moving entities, refilled every physics step (see index_entities)
+        self.collision_cell_size = 4 # Pixels per cell of the rasterized collision grid
+        self.collision_grid = None # Platforms as cells, for O(1) ground/wall probes; built in load_scene
+        self.scene_cache = SceneCache() # Recently visited scenes, kept built (see activate_scene_instance)
+        self.last_scene_load_seconds = 0.0
+        self.last_scene_build_slice_seconds = 0.0 # Most building done in one frame by the last scene change
+        # Scene changes during play are built a slice per frame behind a fading hold frame (see request_scene)
+        self.incremental_scene_loading = incremental_scene_loading
+        self.scene_build_budget = 0.002 # Seconds of building per frame (plus at most one step)
+        self.scene_load = None # scene_loader.SceneLoad in progress
+        self.hold_frame = None # Last frame of the old scene, shown while the new one is built
+
+        with startup_profiler.phase("Player.load_animations"):
+            self.player = Player(0, 0, 40, 50) # Dimensions might need adjustment based on player art
         self.camera = Camera(int(self.WIDTH / self.zoom), int(self.HEIGHT / self.zoom), self.zoom)
 
         self.state = "menu"
+        self.paused_frame = None # Screen composite shown while paused, see draw_frame
         self.light_angle = 0
         self.player_data = {"geo": 0, "inventory": []}
         self.jump_requested = False
@@ -134,9 +130,9 @@ class Game:
         self.dialog_choice_rect = pygame.Rect(0, 0, 0, 0)
         self.choice_option_rects = []
 
-        self.reset_game()
+        self.reset_game(load_first_scene=False) # Scene 1 (and its assets) is loaded when Start is clicked
 
-    def reset_game(self):
+    def reset_game(self, load_first_scene=True):
         self.player.health = self.player.max_health
         self.player.alive = True
         self.player.jump_power = self.player.original_jump_power 
@@ -153,108 +149,268 @@ class Game:
             "hornhead_first_talk_done": False, 
         }
         self.defeated_enemy_uids = set() 
-        self.platforms.clear()
+        self.clear_scene_cache() # Cached NPCs and enemies belong to the old run
+        self.scene_load = None
+        self.platforms = [] # Not clear(): the list is shared with a SceneInstance
         self.npcs.clear() # Clear NPCs
         self.enemies.clear() # Clear enemies
-        self.projectiles.clear() # Clear projectiles
+        self.projectile_pool.clear() # Clear projectiles
         self.npc_interaction_candidate = None 
         self.dialog_choice_active = False 
-        if self.scenes_data:
-            self.load_scene(SCENE_ID_SCENE1) # Load the first scene by default
-        else:
-            print("CRITICAL ERROR: No scenes defined in scenes_data. Cannot start game.")
+        if not self.scene_registry:
+            print("CRITICAL ERROR: No scenes defined in SCENES_DATA. Cannot start game.")
             pygame.quit()
             sys.exit("No scenes available to load.")
+        if load_first_scene:
+            self.load_scene(SCENE_ID_SCENE1) # Load the first scene by default
 
     def load_scene(self, scene_id_to_load):
-        scene_config = next((sc for sc in self.scenes_data if sc['id'] == scene_id_to_load), None)
+        scene = self.scene_registry.get(scene_id_to_load)
 
-        if not scene_config:
+        if not scene:
             print(f"CRITICAL Error: Scene with ID '{scene_id_to_load}' not found.")
             # ... (error handling as before)
-            if not self.current_scene_id and self.scenes_data:
+            if not self.current_scene_id and self.scene_registry:
                 print("Attempting to load first defined scene as emergency fallback.")
-                scene_config = self.scenes_data[0]
+                scene = self.scene_registry.first()
             else:
                 pygame.quit()
                 sys.exit(f"Failed to load scene: {scene_id_to_load}")
 
 
-        print(f"Loading scene: {scene_config['id']}")
-        self.current_scene_id = scene_config['id']
-        # Use scene-specific background key, fallback to a generic one if needed
-        self.current_background = self.background_image_assets.get(scene_config.get('background_key'), 
-                                                                  self.background_image_assets.get('main_bg'))
-        self.current_world_width, self.current_world_height = scene_config.get('world_dimensions', (self.WIDTH * 2, self.HEIGHT)) # Example larger world
-        self.player.rect.topleft = scene_config['player_start_pos']
+        self.scene_load = None # Superseded
+        load = SceneLoad(scene, self.scene_build_steps(scene))
+        load.finish()
+        self.enter_scene(load)
+
+    def request_scene(self, scene_id, player_pos=None):
+        """
+        Scene change from gameplay. With incremental_scene_loading the new scene is built a
+        slice per frame (run() gives it scene_build_budget) while the old one is held on
+        screen, fading out; it is swapped in at the start of the next simulation step after
+        it is complete (see finish_scene_load), so the simulation sees the change at the same
+        step as with load_scene. Otherwise the scene is loaded on the spot.
+        """
+        scene = self.scene_registry.get(scene_id)
+        if not self.incremental_scene_loading or not scene:
+            self.load_scene(scene_id) # Also handles unknown ids
+            self.place_player(player_pos)
+            return
+        self.npc_interaction_candidate = None
+        self.end_scene_dialog()
+        self.scene_load = SceneLoad(scene, self.scene_build_steps(scene), player_pos)
+
+    @property
+    def scene_loading(self):
+        """True while a requested scene is still being built; the simulation holds meanwhile."""
+        return self.scene_load is not None and not self.scene_load.done
+
+    def finish_scene_load(self):
+        """Completes the pending SceneLoad if needed and swaps its scene in."""
+        load, self.scene_load = self.scene_load, None
+        load.finish()
+        self.enter_scene(load)
+
+    def scene_build_steps(self, scene):
+        """
+        Everything a scene change does before the swap, as a step generator (see
+        scene_loader): looking the scene up in the scene cache, loading its assets (none for a
+        cached scene, see pin_scenes) and building its SceneInstance unless it was cached.
+        Returns (instance, cached).
+        """
+        print(f"Loading scene: {scene.id}")
+        # Scenes visited recently are still built: swap the instance back in instead of rebuilding it.
+        # Their assets are pinned while they are cached, so for them this only marks them visited
+        instance = self.scene_cache.get(scene.id)
+        hits, misses = yield from self.assets.scene_asset_steps(scene.id) # Usually all resident already (prefetched)
+        print(f"Scene assets: {hits} resident, {misses} loaded now ({self.assets.last_transition_seconds * 1000:.1f} ms)")
+        self.raw_enemy_images = self.assets.enemy_frames()
+        if instance:
+            return instance, True
+        instance = yield from self.build_scene_instance_steps(scene)
+        self.scene_cache.put(instance)
+        self.assets.pin_scenes(self.scene_cache.instances) # Evicted scenes let go of their assets
+        return instance, False
+
+    def clear_scene_cache(self):
+        """Drops every cached SceneInstance, and with them the pins on their scenes' assets."""
+        self.scene_cache.clear()
+        self.assets.pin_scenes(())
+
+    def enter_scene(self, load):
+        """Makes the scene of a finished SceneLoad the current one, all within one step."""
+        scene = load.scene
+        instance, cached = load.result
+        self.current_scene = scene
+        self.current_scene_id = scene.id
+        self.raw_enemy_images = self.assets.enemy_frames()
+        self.player.rect.topleft = scene.player_start_pos
         self.player.velocity_y = 0
         self.player.on_ground = False
         
-        self.platforms.clear()
-        self.npcs.clear()
-        self.enemies.clear()
-        self.projectiles.clear() # Clear projectiles on scene load
+        self.projectile_pool.clear() # Clear projectiles on scene load
         self.npc_interaction_candidate = None
+        self.previous_positions = {} # Player was teleported, don't interpolate across the scene change
+        self.hold_frame = None
+        if self.enemy_batch:
+            self.enemy_batch.invalidate() # Cached enemies come back as the same objects, in a new state
+
+        start = time.perf_counter()
+        self.activate_scene_instance(instance)
+        self.last_scene_load_seconds = load.busy_seconds + time.perf_counter() - start
+        self.last_scene_build_slice_seconds = load.longest_slice_seconds
+        print(f"Scene {scene.id} {'taken from the scene cache' if cached else 'built'} in {self.last_scene_load_seconds * 1000:.2f} ms"
+              f" over {max(1, load.frames)} frame(s)")
 
-        self.platforms = create_platforms_for_level(scene_config.get('platform_definitions', []), self.platform_image_assets)
+        self.camera.rect.center = self.player.rect.center # Initial camera position
+        self.camera.update(self.player, self.current_world_width, self.current_world_height) # Ensure bounds
+        self.light_angle = 0
+        self.end_scene_dialog()
+        self.place_player(load.player_pos)
 
-        npc_default_w, npc_default_h = 50, 70 # Adjust as needed
-        for npc_def in scene_config.get('npc_definitions', []):
+    def end_scene_dialog(self):
+        self.dialog_choice_active = False 
+        self.interacting_npc = None
+        self.active_dialog = []
+        self.current_dialog_line_index = 0
+
+    def place_player(self, player_pos):
+        """Puts the player at a transition's target position, if it has one."""
+        if not player_pos: return
+        self.player.rect.topleft = player_pos
+        # Ensure camera updates if player position changes drastically
+        self.camera.update(self.player, self.current_world_width, self.current_world_height) 
+        print(f"Player position set to: {player_pos} in new scene.")
+
+    def build_scene_instance_steps(self, scene):
+        """
+        Builds the SceneInstance of `scene` as a step generator: a step per platform, per
+        index, per static layer blit, and per NPC and enemy its first visit shows.
+        """
+        world_width, world_height = scene.world_dimensions or (self.WIDTH * 2, self.HEIGHT) # Example larger world
+        background = self.assets.get(scene.background_key, size=(world_width, world_height))
+        platforms = []
+        for p_def in scene.platform_definitions:
+            platforms.extend(create_platforms_for_level((p_def,), self.assets))
+            yield
+        platform_grid = StaticGrid(platforms)
+        yield
+        collision_grid = CollisionGrid(platforms, world_width, world_height, self.collision_cell_size)
+        yield
+        # Background + platforms never move, bake them once for the whole scene
+        static_layer = pygame.Surface((max(1, world_width), max(1, world_height))).convert()
+        yield from static_layer_steps(static_layer, background, platforms)
+
+        enemy_uids = []
+        for enemy_def in scene.enemy_definitions:
+            enemy_uid = enemy_def.get('id') 
+            if not enemy_uid: 
+                enemy_uid = f"{scene.id}_enemy_{enemy_def['x']}_{enemy_def['y']}_{enemy_def.get('type', 'unknown')}"
+                print(f"Warning: Enemy at ({enemy_def['x']},{enemy_def['y']}) in scene {scene.id} has no 'id'. Generated: {enemy_uid}")
+            enemy_uids.append(enemy_uid)
+        instance = SceneInstance(scene, background, (world_width, world_height), platforms,
+                                 platform_grid, collision_grid, static_layer, enemy_uids)
+
+        # Made now so the swap itself does not construct them; story flags and defeated
+        # enemies cannot change while the simulation holds for the load
+        for index, npc_def in enumerate(scene.npc_definitions):
             required_flag = npc_def.get('appears_if_flag_true')
             if required_flag and not self.story_flags.get(required_flag, False):
                 continue
-            
-            name = npc_def['name']
-            dialogs = self.all_npc_dialogs.get(name)
-            image = self.npc_image_assets.get(npc_def['image_key'])
-            
-            if dialogs and image:
-                if name == 'witcher': # Special instantiation for Witcher
-                    witcher_img2 = self.npc_image_assets.get('witcher2_img')
-                    bullet_img = self.npc_image_assets.get('bullet_img')
-                    if witcher_img2 and bullet_img:
-                        self.npcs.append(WitcherNPC(npc_def['x'], npc_def['y'], 
-                                                    npc_def.get('width', npc_default_w), 
-                                                    npc_def.get('height', npc_default_h), 
-                                                    name, dialogs, image, 
-                                                    witcher_img2, bullet_img, self)) # Pass game_ref=self
-                    else:
-                        print(f"WitcherNPC Load Warning: Missing witcher2_img or bullet_img for {name}")
-                else: # Standard NPC
-                    self.npcs.append(NPC(npc_def['x'], npc_def['y'], 
-                                         npc_def.get('width', npc_default_w), 
-                                         npc_def.get('height', npc_default_h), 
-                                         name, dialogs, image))
+            npc = self.create_npc(npc_def)
+            if npc:
+                instance.npcs[index] = npc
+                instance.fresh.add(npc)
+            yield
+        for index, enemy_def in enumerate(scene.enemy_definitions):
+            if enemy_uids[index] in self.defeated_enemy_uids: continue
+            enemy = instance.enemies[index] = self.create_enemy(enemy_def, enemy_uids[index])
+            instance.fresh.add(enemy)
+            yield
+        return instance
+
+    def activate_scene_instance(self, instance):
+        """
+        Makes `instance` the current scene, reconciled with the game state: NPCs whose story
+        flag is not set are left out, defeated enemies stay gone, and NPCs and enemies that
+        were built on an earlier visit are respawned rather than made again.
+        """
+        scene = instance.scene
+        self.current_background = instance.background
+        self.current_world_width, self.current_world_height = instance.world_size
+        self.platforms = instance.platforms
+        self.platform_grid = instance.platform_grid
+        self.collision_grid = instance.collision_grid
+        self.static_layer = instance.static_layer
+
+        self.npcs = []
+        for index, npc_def in enumerate(scene.npc_definitions):
+            required_flag = npc_def.get('appears_if_flag_true')
+            if required_flag and not self.story_flags.get(required_flag, False):
+                continue
+            npc = instance.npcs.get(index)
+            if npc:
+                if npc in instance.fresh: instance.fresh.discard(npc) # Just made, already in its spawn state
+                else: npc.respawn()
             else:
-                print(f"NPC Load Warning: Missing dialogs or image for {name} (key: {npc_def['image_key']})")
-        
-        # ... (enemy loading remains the same)
-        enemy_default_w, enemy_default_h = 60, 60
-        for enemy_def in scene_config.get('enemy_definitions', []):
-            enemy_uid = enemy_def.get('id') 
-            if not enemy_uid: 
-                enemy_uid = f"{self.current_scene_id}_enemy_{enemy_def['x']}_{enemy_def['y']}_{enemy_def.get('type', 'unknown')}"
-                print(f"Warning: Enemy at ({enemy_def['x']},{enemy_def['y']}) in scene {self.current_scene_id} has no 'id'. Generated: {enemy_uid}")
+                npc = self.create_npc(npc_def)
+                if not npc: continue
+                instance.npcs[index] = npc
+            self.npcs.append(npc)
+
+        self.enemies = []
+        for index, enemy_def in enumerate(scene.enemy_definitions):
+            enemy_uid = instance.enemy_uids[index]
             if enemy_uid in self.defeated_enemy_uids:
                 print(f"Enemy {enemy_uid} already defeated. Not spawning.")
                 continue 
-            self.enemies.append(Enemy(
-                enemy_def['x'], enemy_def['y'], 
-                enemy_def.get('width', enemy_default_w), 
-                enemy_def.get('height', enemy_default_h), 
-                self.raw_enemy_images, 
-                attack_range=enemy_def.get('attack_range', 50), 
-                damage=enemy_def.get('damage', 1),
-                enemy_uid=enemy_uid 
-            ))
+            enemy = instance.enemies.get(index)
+            if enemy:
+                if enemy in instance.fresh: instance.fresh.discard(enemy)
+                else: enemy.respawn()
+            else:
+                enemy = instance.enemies[index] = self.create_enemy(enemy_def, enemy_uid)
+            self.enemies.append(enemy)
 
-        self.dialog_choice_active = False 
-        self.camera.rect.center = self.player.rect.center # Initial camera position
-        self.camera.update(self.player, self.current_world_width, self.current_world_height) # Ensure bounds
-        self.light_angle = 0
-        self.interacting_npc = None
-        self.active_dialog = []
-        self.current_dialog_line_index = 0
+    def create_npc(self, npc_def):
+        """The NPC (or WitcherNPC) for one npc definition, or None if its dialogs or images are missing."""
+        npc_default_w, npc_default_h = 50, 70 # Adjust as needed
+        name = npc_def['name']
+        dialogs = self.all_npc_dialogs.get(name)
+        image = self.assets.get(npc_def['image_key'])
+        
+        if dialogs and image:
+            if name == 'witcher': # Special instantiation for Witcher
+                witcher_img2 = self.assets.get('witcher2_img')
+                bullet_img = self.assets.get('bullet_img')
+                if witcher_img2 and bullet_img:
+                    return WitcherNPC(npc_def['x'], npc_def['y'], 
+                                      npc_def.get('width', npc_default_w), 
+                                      npc_def.get('height', npc_default_h), 
+                                      name, dialogs, image, 
+                                      witcher_img2, bullet_img, self) # Pass game_ref=self
+                print(f"WitcherNPC Load Warning: Missing witcher2_img or bullet_img for {name}")
+            else: # Standard NPC
+                return NPC(npc_def['x'], npc_def['y'], 
+                           npc_def.get('width', npc_default_w), 
+                           npc_def.get('height', npc_default_h), 
+                           name, dialogs, image)
+        else:
+            print(f"NPC Load Warning: Missing dialogs or image for {name} (key: {npc_def['image_key']})")
+        return None
+
+    def create_enemy(self, enemy_def, enemy_uid):
+        enemy_default_w, enemy_default_h = 60, 60
+        return Enemy(
+            enemy_def['x'], enemy_def['y'], 
+            enemy_def.get('width', enemy_default_w), 
+            enemy_def.get('height', enemy_default_h), 
+            self.raw_enemy_images, 
+            attack_range=enemy_def.get('attack_range', 50), 
+            damage=enemy_def.get('damage', 1),
+            enemy_uid=enemy_uid,
+            edge_aware=enemy_def.get('edge_aware', False)
+        )
 
     def update_npc_interaction_candidate(self):
         """Identifies an NPC the player might interact with."""
@@ -262,66 +418,52 @@ class Game:
             self.npc_interaction_candidate = None
             return
 
-        self.npc_interaction_candidate = None # Reset before checking
         interaction_radius = 60 # How close player needs to be to an NPC
-        
-        # Find the first NPC in range (can be improved to find the *closest* if needed)
-        for npc_instance in self.npcs:
-            if npc_instance.active:
-                # Simple bounding box proximity check
-                dist_x = abs(self.player.rect.centerx - npc_instance.rect.centerx)
-                dist_y = abs(self.player.rect.centery - npc_instance.rect.centery)
-                
-                # Check if player's interaction range (defined by radius around player center)
-                # overlaps with NPC's interaction range (defined by radius around NPC center)
-                # Or more simply, if their centers are within a certain distance.
-                # The current approach is a rectangular area check:
-                if dist_x < interaction_radius and dist_y < (npc_instance.rect.height / 2 + interaction_radius / 2) : # Make Y range more forgiving
-                    self.npc_interaction_candidate = npc_instance
-                    return # Found a candidate, no need to check further for this simple implementation
+        player_center = self.player.rect.center
+
+        def in_interaction_range(npc_instance):
+            if not npc_instance.active: return False
+            # Rectangular area check around the NPC center, Y range is more forgiving
+            dist_x = abs(player_center[0] - npc_instance.rect.centerx)
+            dist_y = abs(player_center[1] - npc_instance.rect.centery)
+            return dist_x < interaction_radius and dist_y < (npc_instance.rect.height / 2 + interaction_radius / 2)
+
+        # Closest NPC in range; the search circle has to cover the tallest NPC's Y range
+        search_radius = math.hypot(interaction_radius, self.entity_index.max_half_h + interaction_radius / 2)
+        self.npc_interaction_candidate = self.entity_index.nearest_within(player_center, search_radius, 'npc', in_interaction_range)
 
     def check_scene_location_triggers(self):
         if not self.current_scene_id or not self.player or not self.player.alive: return
-        current_scene_cfg = next((sc for sc in self.scenes_data if sc['id'] == self.current_scene_id), None)
-        if not current_scene_cfg or not current_scene_cfg.get('transitions'): return
-
-        for transition in current_scene_cfg['transitions']:
-            is_location_type = transition.get('type') == 'player_at_location' or \
-                               transition.get('type') == 'player_at_location_and_flag'
-            if is_location_type:
-                trigger_rect = pygame.Rect(transition['rect_coords'])
-                conditions_met = False
-                if self.player.rect.colliderect(trigger_rect):
-                    if transition.get('type') == 'player_at_location_and_flag':
-                        flag_name = transition.get('required_story_flag')
-                        if flag_name and self.story_flags.get(flag_name, False):
-                            conditions_met = True
-                        elif not flag_name:
-                            conditions_met = True
-                        else:
-                            conditions_met = False
-                    else:
+        if not self.current_scene or not self.current_scene.transitions: return
+
+        # Only location transitions are compiled into scene.transitions, rects prebuilt
+        for transition in self.current_scene.transitions:
+            conditions_met = False
+            if self.player.rect.colliderect(transition.trigger_rect):
+                if transition.type == 'player_at_location_and_flag':
+                    flag_name = transition.required_story_flag
+                    if flag_name and self.story_flags.get(flag_name, False):
                         conditions_met = True
+                    elif not flag_name:
+                        conditions_met = True
+                    else:
+                        conditions_met = False
                 else:
+                    conditions_met = True
+            else:
+                conditions_met = False
+
+            if conditions_met and transition.must_all_enemies_be_slain:
+                if self.enemies:
                     conditions_met = False
+            
+            if conditions_met:
+                target_scene_id = transition.target_scene_id
+                target_player_pos_override = transition.target_player_pos # GET OVERRIDE POS
 
-                if conditions_met and transition.get('must_all_enemies_be_slain', False):
-                    if self.enemies:
-                        conditions_met = False
-                
-                if conditions_met:
-                    target_scene_id = transition['target_scene_id']
-                    target_player_pos_override = transition.get('target_player_pos') # GET OVERRIDE POS
-
-                    print(f"Player triggered scene change to: {target_scene_id} via combined conditions.")
-                    self.load_scene(target_scene_id)
-
-                    if target_player_pos_override: # APPLY OVERRIDE POS if defined
-                        self.player.rect.topleft = target_player_pos_override
-                                # Ensure camera updates if player position changes drastically
-                        self.camera.update(self.player, self.current_world_width, self.current_world_height) 
-                        print(f"Player position set to: {target_player_pos_override} in new scene.")
-                    break # Exit loop once a transition is made
+                print(f"Player triggered scene change to: {target_scene_id} via combined conditions.")
+                self.request_scene(target_scene_id, target_player_pos_override) # Player goes to the override pos, if defined
+                break # Exit loop once a transition is made
     
     def start_interaction(self, npc):
         self.interacting_npc = npc
@@ -372,10 +514,29 @@ class Game:
             box_width,
             box_height
         )
+        self.layout_dialog_choice_options()
         # Clear regular dialog as we are now in a choice prompt
         self.active_dialog = []
         self.current_dialog_line_index = 0
 
+    def choice_option_label(self, i):
+        return ("> " if i == self.dialog_choice_selected_index else "  ") + self.dialog_choice_options[i]
+
+    def layout_dialog_choice_options(self):
+        """
+        Fills choice_option_rects, where each option is drawn and can be clicked, from font
+        metrics alone (no drawing), so clicks also hit them in headless replays. Called when
+        the prompt opens and when the selection (which changes the option's prefix) moves.
+        """
+        prompt_height = self.dialog_font.size(self.dialog_choice_prompt_text)[1]
+        option_start_y = self.dialog_choice_rect.top + 20 + prompt_height + 25
+        option_spacing = self.dialog_font.get_height() + 10
+        self.choice_option_rects = []
+        for i in range(len(self.dialog_choice_options)):
+            option_width, option_height = self.dialog_font.size(self.choice_option_label(i))
+            self.choice_option_rects.append(pygame.Rect(self.dialog_choice_rect.centerx - option_width // 2,
+                                                        option_start_y + i * option_spacing, option_width, option_height))
+
 
     def handle_noze_item_choice(self, selected_option_index):
         """Callback specific to Noze's item offer choice."""
@@ -404,36 +565,21 @@ class Game:
             return
 
         # 1. Draw background box (semi-transparent)
-        overlay_surface = pygame.Surface(self.dialog_choice_rect.size, pygame.SRCALPHA)
-        overlay_surface.fill((20, 20, 20, 210)) # Dark, semi-transparent
+        overlay_surface = overlay_pool.panel(self.dialog_choice_rect.size, (20, 20, 20, 210)) # Dark, semi-transparent
         self.screen.blit(overlay_surface, self.dialog_choice_rect.topleft)
         pygame.draw.rect(self.screen, (150, 150, 150), self.dialog_choice_rect, 2, border_radius=3) # Border
 
         # 2. Draw prompt text
-        prompt_surface = self.dialog_font.render(self.dialog_choice_prompt_text, True, (230, 230, 230))
+        prompt_surface = text_cache.render(self.dialog_font, self.dialog_choice_prompt_text, True, (230, 230, 230))
         prompt_pos_x = self.dialog_choice_rect.centerx - prompt_surface.get_width() // 2
         prompt_pos_y = self.dialog_choice_rect.top + 20
         self.screen.blit(prompt_surface, (prompt_pos_x, prompt_pos_y))
 
-        # 3. Draw options ("Yes", "No")
-        self.choice_option_rects.clear() # Clear previous rects for mouse detection
-        option_start_y = prompt_pos_y + prompt_surface.get_height() + 25
-        option_spacing = self.dialog_font.get_height() + 10
-
-        for i, option_text in enumerate(self.dialog_choice_options):
-            color = (200, 200, 200) # Default color
-            prefix = "  "
-            if i == self.dialog_choice_selected_index:
-                color = (255, 255, 100) # Highlighted color for selected option
-                prefix = "> "
-            
-            option_surface = self.dialog_font.render(prefix + option_text, True, color)
-            option_pos_x = self.dialog_choice_rect.centerx - option_surface.get_width() // 2
-            option_pos_y = option_start_y + i * option_spacing
-            option_rect = option_surface.get_rect(topleft=(option_pos_x, option_pos_y))
-            
+        # 3. Draw options ("Yes", "No") where layout_dialog_choice_options put them
+        for i, option_rect in enumerate(self.choice_option_rects):
+            color = (255, 255, 100) if i == self.dialog_choice_selected_index else (200, 200, 200) # Selected option highlighted
+            option_surface = text_cache.render(self.dialog_font, self.choice_option_label(i), True, color)
             self.screen.blit(option_surface, option_rect.topleft)
-            self.choice_option_rects.append(option_rect)
 
 
     def handle_npc_dialog_completion(self):
@@ -463,10 +609,9 @@ class Game:
             # return
 
         # --- Normal on_interaction_end processing (for other NPCs or other dialogs) ---
-        current_scene_cfg = next((sc for sc in self.scenes_data if sc['id'] == self.current_scene_id), None)
         npc_config_in_scene = None
-        if current_scene_cfg:
-            npc_config_in_scene = next((npc_def for npc_def in current_scene_cfg.get('npc_definitions', []) if npc_def['name'] == npc_name_interacted), None)
+        if self.current_scene:
+            npc_config_in_scene = self.current_scene.npc_definition(npc_name_interacted)
         
         scene_changed_by_dialog = False
         if npc_config_in_scene:
@@ -489,7 +634,7 @@ class Game:
                     target_scene_id = next_scene_trigger.get('scene_id')
                     if target_scene_id and ((required_flag and self.story_flags.get(required_flag)) or not required_flag):
                         print(f"NPC {npc_name_interacted} triggering scene change to {target_scene_id}.")
-                        self.load_scene(target_scene_id)
+                        self.request_scene(target_scene_id)
                         scene_changed_by_dialog = True
         
         # If no scene change occurred and we are not in a dialog choice, end the interaction.
@@ -499,7 +644,8 @@ class Game:
 
     def check_horizontal_collisions(self, original_x):
         if not self.player or not self.player.alive: return
-        for platform in self.platforms:
+        swept_rect = self.player.rect.union(self.player.rect.move(original_x - self.player.rect.x, 0))
+        for platform in self.platform_grid.query(swept_rect):
             if self.player.rect.colliderect(platform.rect):
                 overlap_y = max(0, min(self.player.rect.bottom, platform.rect.bottom) - max(self.player.rect.top, platform.rect.top))
                 if overlap_y > self.player.rect.height / 4 or platform.is_wall:
@@ -510,10 +656,14 @@ class Game:
         if not self.player or not self.player.alive: return
         was_in_air = not self.player.on_ground # Check if player was in air before this collision check
         self.player.on_ground = False
-        for platform in self.platforms:
+        # Covers this frame's fall/rise (+ rounding), the only area a platform can be hit in
+        swept_rect = self.player.rect.union(self.player.rect.move(0, -self.player.fall_dy)).inflate(0, 4)
+        if self.collision_grid and not self.collision_grid.rect_any(swept_rect, 'ground'):
+            return # Nothing to land on or bump into, skip the platform query
+        for platform in self.platform_grid.query(swept_rect):
             if platform.is_wall: continue
             if self.player.rect.colliderect(platform.rect):
-                if self.player.velocity_y > 0 and (self.player.rect.bottom - self.player.velocity_y) <= platform.rect.top + 1 and self.player.rect.bottom >= platform.rect.top:
+                if self.player.velocity_y > 0 and (self.player.rect.bottom - self.player.fall_dy) <= platform.rect.top + 1 and self.player.rect.bottom >= platform.rect.top:
                     self.player.rect.bottom = platform.rect.top
                     self.player.velocity_y = 0
                     self.player.on_ground = True
@@ -527,7 +677,7 @@ class Game:
                     break # Player can only be on one platform at a time like this
 
                 elif self.player.velocity_y < 0 and \
-                     (self.player.rect.top - self.player.velocity_y) >= platform.rect.bottom - 1 and \
+                     (self.player.rect.top - self.player.fall_dy) >= platform.rect.bottom - 1 and \
                      self.player.rect.top <= platform.rect.bottom:
                     self.player.rect.top = platform.rect.bottom
                     self.player.velocity_y = 0
@@ -535,240 +685,410 @@ class Game:
 
             
 
-    def handle_input(self): # Event handling for KEYDOWN is now primary in the event loop
+    def handle_input(self, dt_seconds): # Event handling for KEYDOWN is now primary in the event loop
         if not self.player or not self.player.alive : return
         if self.dialog_choice_active: return
-        keys = pygame.key.get_pressed()
+        keys = self.get_key_state()
         original_x = self.player.rect.x
         player_moved_x_input = 0
         if not self.player.is_attacking and not self.active_dialog: # self.dialog_choice_active already handled above
             if keys[pygame.K_LEFT]: player_moved_x_input = -1
             if keys[pygame.K_RIGHT]: player_moved_x_input = 1
-        self.player.move(player_moved_x_input, self.clock.get_time() / 1000.0)
+        self.player.move(player_moved_x_input, dt_seconds)
         if keys[pygame.K_z] and not self.active_dialog: self.player.attack()
         if player_moved_x_input != 0 : self.check_horizontal_collisions(original_x)
 
-    def run(self):
-        running = True
-        current_game_time_seconds = 0
-        while running:
-            dt_seconds = self.clock.tick(self.FPS) / 1000.0
-            current_game_time_seconds += dt_seconds
+    def collect_overlay_items(self):
+        """
+        Gathers the interaction prompt, HUD text and dialog boxes of this frame as
+        (screen_rect, draw_function) pairs, so their screen area is known before drawing.
+        """
+        items = []
+
+        # Interaction Prompt Drawing
+        if self.npc_interaction_candidate and not self.active_dialog:
+            prompt_text = "[E] Interact"
+            prompt_surf = text_cache.render(self.interaction_prompt_font, prompt_text, True, (255, 255, 255))
+            npc_world_rect = self.npc_interaction_candidate.rect
+            prompt_world_x = npc_world_rect.centerx
+            prompt_world_y = npc_world_rect.top - 7 
+            prompt_screen_x = int((prompt_world_x - self.camera.rect.x) * self.zoom)
+            prompt_screen_y = int((prompt_world_y - self.camera.rect.y) * self.zoom)
+            prompt_display_rect = prompt_surf.get_rect(midbottom=(prompt_screen_x, prompt_screen_y))
+            bg_padding_x = 5; bg_padding_y = 2
+            bg_rect = prompt_display_rect.inflate(bg_padding_x * 2, bg_padding_y * 2)
+
+            def draw_interaction_prompt():
+                prompt_bg_surface = overlay_pool.panel(bg_rect.size, (0, 0, 0, 170), border_radius=3)
+                self.screen.blit(prompt_bg_surface, bg_rect.topleft)
+                self.screen.blit(prompt_surf, prompt_display_rect)
+            items.append((bg_rect, draw_interaction_prompt))
+
+        # UI Elements (Health, Geo, Coords)
+        health_surf = text_cache.render(self.font, f"Health: {self.player.health if self.player else 'N/A'}", True, (255,255,255))
+        items.append((health_surf.get_rect(topleft=(10,10)), lambda: self.screen.blit(health_surf, (10,10))))
+        geo_surf = text_cache.render(self.font, f"Geo: {self.player_data['geo']}", True, (255,223,0))
+        items.append((geo_surf.get_rect(topleft=(10,40)), lambda: self.screen.blit(geo_surf, (10,40))))
+        if self.player:
+            coords_surf = text_cache.render(self.font, f"Coords: ({int(self.player.rect.x)}, {int(self.player.rect.y)})", True, (200,200,200))
+            items.append((coords_surf.get_rect(topleft=(10,70)), lambda: self.screen.blit(coords_surf, (10, 70))))
+
+        # Dialog Box and Dialog Choice Prompt
+        if self.active_dialog and self.interacting_npc:
+            def draw_dialog_box():
+                pygame.draw.rect(self.screen, (30,30,30,210), self.dialog_box_rect) # Semi-transparent
+                pygame.draw.rect(self.screen, (200,200,200), self.dialog_box_rect, 2) # Border
+                if 0 <= self.current_dialog_line_index < len(self.active_dialog):
+                    draw_text(self.screen, self.active_dialog[self.current_dialog_line_index], self.dialog_font, (230,230,230), self.dialog_box_rect.inflate(-20,-20))
+                prompt_surf = text_cache.render(self.dialog_font, "E >", True, (180,180,180))
+                self.screen.blit(prompt_surf, (self.dialog_box_rect.right - prompt_surf.get_width()-10, self.dialog_box_rect.bottom - prompt_surf.get_height()-5))
+            items.append((self.dialog_box_rect.copy(), draw_dialog_box))
+        
+        if self.dialog_choice_active: # Must be drawn after normal dialog box potentially
+            items.append((self.dialog_choice_rect.copy(), self.draw_dialog_choice_prompt))
+        return items
+
+    def draw_frame(self, dt_seconds):
+        if self.state == "paused" and self.paused_frame:
+            # Nothing moves while paused: reuse the composite captured on the first paused frame
+            self.screen.blit(self.paused_frame, (0, 0))
+            return
 
-            # --- Event Handling ---
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: running = False
-                
-                # Dialog choice input handling (should take precedence)
-                if self.dialog_choice_active:
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_UP or event.key == pygame.K_w:
-                            self.dialog_choice_selected_index = (self.dialog_choice_selected_index - 1 + len(self.dialog_choice_options)) % len(self.dialog_choice_options)
-                        elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                            self.dialog_choice_selected_index = (self.dialog_choice_selected_index + 1) % len(self.dialog_choice_options)
-                        elif event.key == pygame.K_RETURN or event.key == pygame.K_e: 
-                            if self.dialog_choice_callback:
-                                self.dialog_choice_callback(self.dialog_choice_selected_index)
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        if event.button == 1: 
-                            mouse_pos = event.pos
-                            for i, option_rect in enumerate(self.choice_option_rects):
-                                if option_rect.collidepoint(mouse_pos):
-                                    self.dialog_choice_selected_index = i 
-                                    if self.dialog_choice_callback:
-                                        self.dialog_choice_callback(self.dialog_choice_selected_index)
-                                    break 
-                    if event.type != pygame.QUIT : # Consume event if choice is active
-                        continue # Skip other event processing for this event
-                
-                # Regular event handling if not in dialog choice
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = event.pos
-                    if self.state == "menu":
-                        # ... (menu button logic remains the same)
-                        play_rect_center_x = self.WIDTH // 2
-                        play_rect_center_y = self.HEIGHT // 2 - 40
-                        play_rect = self.start_button_img.get_rect(center=(play_rect_center_x, play_rect_center_y)) if self.start_button_img else pygame.Rect(play_rect_center_x - 100, play_rect_center_y - 25, 200, 50)
-                        exit_rect_center_y = self.HEIGHT // 2 + 40
-                        exit_rect = self.exit_button_img.get_rect(center=(play_rect_center_x, exit_rect_center_y)) if self.exit_button_img else pygame.Rect(play_rect_center_x - 100, exit_rect_center_y - 25, 200, 50)
-                        if play_rect.collidepoint(mouse_pos):
-                            self.state = "playing"
-                            self.reset_game()
-                        elif exit_rect.collidepoint(mouse_pos): running = False
+        self.screen.fill((10, 10, 10)) # Default dark background
+        if self.state == "menu":
+            # ... (menu drawing remains the same)
+            if self.home_screen_img: 
+                self.screen.blit(pygame.transform.scale(self.home_screen_img, (self.WIDTH, self.HEIGHT)), (0,0))
+            else: 
+                self.screen.fill((30, 30, 70)) 
+
+            if self.start_button_img: 
+                self.screen.blit(self.start_button_img, self.start_button_img.get_rect(center=(self.WIDTH//2, self.HEIGHT//2 - 40)))
+            if self.exit_button_img: 
+                self.screen.blit(self.exit_button_img, self.exit_button_img.get_rect(center=(self.WIDTH//2, self.HEIGHT//2 + 40)))
+        
+        elif self.state == "playing" or self.state == "paused":
+            # Background and platforms come pre-composited in self.static_layer (see load_scene)
+            draw_background_scaled_with_camera(self.screen, self.static_layer, self.camera.rect, self.WIDTH, self.HEIGHT)
+            
+            # Pass the projectile pool to draw_objects. Platforms are already baked into the static layer.
+            draw_objects(self.screen, self.player, [], self.npcs, self.enemies, self.projectile_pool, self.camera.rect, self.zoom)
+            self.update_light_angle(dt_seconds)
+
+            for _, draw_item in self.collect_overlay_items():
+                draw_item()
+            
+            if self.state == "paused":
+                # ... (paused overlay drawing remains the same)
+                overlay = overlay_pool.panel((self.WIDTH, self.HEIGHT), (0,0,0,150)) # alpha
+                self.screen.blit(overlay, (0,0))
+                resume_text = text_cache.render(self.font, "PAUSED - ESC to Resume", True, (255,255,255))
+                self.screen.blit(resume_text, resume_text.get_rect(center=(self.WIDTH/2, self.HEIGHT/2)))
+                self.paused_frame = self.screen.copy() # Frozen until the game is resumed
+
+    def draw_hold_frame(self):
+        """While a scene is built: the old scene's last frame, darkening a step per frame."""
+        if self.hold_frame is None:
+            self.hold_frame = self.screen.copy() # Still shows the last frame presented
+        self.screen.blit(self.hold_frame, (0, 0))
+        shade = min(200, 50 * self.scene_load.frames)
+        if shade:
+            self.screen.blit(overlay_pool.panel((self.WIDTH, self.HEIGHT), (0, 0, 0, shade)), (0, 0))
+
+    def draw_playing_frame_dirty(self, dt_seconds):
+        """
+        Dirty-rect version of draw_frame for the "playing" state. Only the areas covered
+        by moving entities and overlays (this frame and last frame) are restored from the
+        cached background, redrawn and presented with pygame.display.update(rects).
+        """
+        renderer = self.dirty_renderer
+        overlay_items = self.collect_overlay_items()
+        current_rects = collect_entity_screen_rects(self.player, self.npcs, self.enemies, self.projectile_pool, self.camera.rect, self.zoom)
+        current_rects.extend(rect for rect, _ in overlay_items)
+
+        if renderer.needs_full_redraw(self.static_layer, self.camera.rect, self.zoom):
+            # Camera scrolled or scene changed: the cached background is stale
+            renderer.capture_background(self.static_layer, self.camera.rect, self.zoom)
+            self.screen.blit(renderer.background_frame, (0, 0))
+            dirty_rects = None
+        else:
+            dirty_rects = renderer.restore(self.screen, current_rects)
+
+        draw_objects(self.screen, self.player, [], self.npcs, self.enemies, self.projectile_pool, self.camera.rect, self.zoom)
+        self.update_light_angle(dt_seconds)
+        for _, draw_item in overlay_items:
+            draw_item()
+        renderer.present(current_rects, dirty_rects)
 
+    def update_light_angle(self, dt_seconds):
+        if self.player and self.player.alive:
+            self.light_angle += 0.05 * (dt_seconds * self.FPS if dt_seconds > 0 else 1)
+            # draw_darkness_with_light(self.screen, self.player, self.camera.rect, self.zoom, int(100 + math.sin(self.light_angle) * 8)) # Optional light effect
+
+    def handle_events(self, events):
+        """Processes one frame's worth of pygame events. Returns False when the game should quit."""
+        running = True
+        for event in events:
+            if event.type == pygame.QUIT: running = False
+            
+            # Dialog choice input handling (should take precedence)
+            if self.dialog_choice_active:
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        if self.state == "playing": self.state = "paused"
-                        elif self.state == "paused": self.state = "playing"
-                    
-                    if self.state == "playing":
-                        if event.key == pygame.K_SPACE: self.jump_requested = True
-                        if event.key == pygame.K_e: 
-                            if self.active_dialog: 
-                                self.advance_dialog()
-                            elif self.npc_interaction_candidate: 
-                                self.start_interaction(self.npc_interaction_candidate)
-                        
-                        # Temp Scene Switchers
-                        if self.scenes_data:
-                            # ... (scene switcher logic remains same)
-                            current_scene_index = next((i for i, s_data in enumerate(self.scenes_data) if s_data['id'] == self.current_scene_id), -1)
-                            if current_scene_index != -1:
-                                if event.key == pygame.K_PAGEUP:
-                                    self.load_scene(self.scenes_data[(current_scene_index - 1 + len(self.scenes_data)) % len(self.scenes_data)]['id'])
-                                if event.key == pygame.K_PAGEDOWN:
-                                    self.load_scene(self.scenes_data[(current_scene_index + 1) % len(self.scenes_data)]['id'])
+                    if event.key == pygame.K_UP or event.key == pygame.K_w:
+                        self.dialog_choice_selected_index = (self.dialog_choice_selected_index - 1 + len(self.dialog_choice_options)) % len(self.dialog_choice_options)
+                        self.layout_dialog_choice_options()
+                    elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
+                        self.dialog_choice_selected_index = (self.dialog_choice_selected_index + 1) % len(self.dialog_choice_options)
+                        self.layout_dialog_choice_options()
+                    elif event.key == pygame.K_RETURN or event.key == pygame.K_e: 
+                        if self.dialog_choice_callback:
+                            self.dialog_choice_callback(self.dialog_choice_selected_index)
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1: 
+                        mouse_pos = event.pos
+                        for i, option_rect in enumerate(self.choice_option_rects):
+                            if option_rect.collidepoint(mouse_pos):
+                                self.dialog_choice_selected_index = i 
+                                if self.dialog_choice_callback:
+                                    self.dialog_choice_callback(self.dialog_choice_selected_index)
+                                break 
+                if event.type != pygame.QUIT : # Consume event if choice is active
+                    continue # Skip other event processing for this event
             
-            # --- Game State Updates ---
-            if self.state == "playing":
-                if not self.player.alive: self.state = "menu" # Check for player death
-                
-                self.update_npc_interaction_candidate() 
-                self.handle_input() # Player movement and attack input
-                
-                if self.player.alive:
-                    self.player.update(dt_seconds, self.enemies) # Player update, including attack checks
-                    self.player.apply_gravity()
-                    self.check_vertical_collisions() # Player vertical collisions
-                
-                self.camera.update(self.player, self.current_world_width, self.current_world_height)
-                
-                # Update NPCs (including Witcher's special behavior)
-                for npc_instance in self.npcs:
-                    if isinstance(npc_instance, WitcherNPC):
-                        npc_instance.update_behavior(dt_seconds, self.player.rect, self.platforms)
-                    # Add other general NPC update logic here if needed (e.g., animations, simple movements)
-
-                # Update Enemies
-                for i_enemy in self.enemies[:]: 
-                    if i_enemy.alive:
-                        damage_val = i_enemy.update(dt_seconds, self.player.rect, self.platforms, current_game_time_seconds)
-                        if damage_val > 0 and self.player.alive:
-                            self.player.take_damage(damage_val)
-                            if not self.player.alive:
-                                print("Player died, returning to menu.")
-                                self.state = "menu"
-                                # Reset dialog/interaction states on player death
-                                self.dialog_choice_active = False 
-                                self.active_dialog = [] 
-                                self.current_dialog_line_index = 0
-                                self.interacting_npc = None
-                                self.last_dialog_key_spoken_by_npc = None
-                                break # Stop processing enemies if player died
-                    else: 
-                        if i_enemy.uid and i_enemy.uid not in self.defeated_enemy_uids:
-                            self.defeated_enemy_uids.add(i_enemy.uid)
-                            print(f"Enemy {i_enemy.uid} permanently defeated and recorded.")
-                        self.enemies.remove(i_enemy) 
+            # Regular event handling if not in dialog choice
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                mouse_pos = event.pos
+                if self.state == "menu":
+                    # ... (menu button logic remains the same)
+                    play_rect_center_x = self.WIDTH // 2
+                    play_rect_center_y = self.HEIGHT // 2 - 40
+                    play_rect = self.start_button_img.get_rect(center=(play_rect_center_x, play_rect_center_y)) if self.start_button_img else pygame.Rect(play_rect_center_x - 100, play_rect_center_y - 25, 200, 50)
+                    exit_rect_center_y = self.HEIGHT // 2 + 40
+                    exit_rect = self.exit_button_img.get_rect(center=(play_rect_center_x, exit_rect_center_y)) if self.exit_button_img else pygame.Rect(play_rect_center_x - 100, exit_rect_center_y - 25, 200, 50)
+                    if play_rect.collidepoint(mouse_pos):
+                        self.state = "playing"
+                        self.reset_game()
+                    elif exit_rect.collidepoint(mouse_pos): running = False
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    if self.state == "playing": self.state = "paused"
+                    elif self.state == "paused": self.state = "playing"
+                    self.paused_frame = None # Captured again on the next paused frame
                 
-                # Update Projectiles & Check Collisions
-                for proj in self.projectiles[:]:
-                    if proj.alive:
-                        proj.update(dt_seconds)
-                        if self.player.alive and proj.rect.colliderect(self.player.rect):
-                            self.player.take_damage(proj.damage)
-                            proj.alive = False # Projectile hits once
-                            if not self.player.alive:
-                                print("Player died from projectile, returning to menu.")
-                                self.state = "menu" 
-                                # Reset dialog/interaction states
-                                self.dialog_choice_active = False; self.active_dialog = []; # etc.
-                                break # Stop processing projectiles if player died
-                    if not proj.alive:
-                        self.projectiles.remove(proj)
-
-                if self.jump_requested:
-                    if self.player.on_ground and self.player.alive and not self.active_dialog:
-                        self.player.jump()
-                    self.jump_requested = False
-                
-                if self.state == "playing": # Re-check as player might have died
-                    self.check_scene_location_triggers()
-
-            # --- Drawing ---
-            self.screen.fill((10, 10, 10)) # Default dark background
-            if self.state == "menu":
-                # ... (menu drawing remains the same)
-                if self.home_screen_img: 
-                    self.screen.blit(pygame.transform.scale(self.home_screen_img, (self.WIDTH, self.HEIGHT)), (0,0))
-                elif self.background_image_assets.get('main_bg'): 
-                    self.screen.blit(pygame.transform.scale(self.background_image_assets['main_bg'], (self.WIDTH, self.HEIGHT)), (0,0))
+                if self.state == "playing":
+                    if event.key == pygame.K_SPACE: self.jump_requested = True
+                    if event.key == pygame.K_e: 
+                        if self.active_dialog: 
+                            self.advance_dialog()
+                        elif self.npc_interaction_candidate: 
+                            self.start_interaction(self.npc_interaction_candidate)
+                    
+                    # Temp Scene Switchers
+                    if self.current_scene:
+                        if event.key == pygame.K_PAGEUP:
+                            self.request_scene(self.current_scene.prev_id)
+                        if event.key == pygame.K_PAGEDOWN:
+                            self.request_scene(self.current_scene.next_id)
+        return running
+
+    def index_entities(self):
+        """Refills the dynamic spatial index with this step's player, NPCs and enemies."""
+        index = self.entity_index
+        index.clear()
+        if self.player: index.insert(self.player, 'player')
+        index.insert_all(self.npcs, 'npc')
+        index.insert_all(self.enemies, 'enemy')
+
+    def update(self, dt_seconds, current_game_time_seconds):
+        """Advances the "playing" state by one physics step of dt_seconds."""
+        if not self.player.alive: self.state = "menu" # Check for player death
+        
+        self.index_entities()
+        self.update_npc_interaction_candidate() 
+        self.handle_input(dt_seconds) # Player movement and attack input
+        
+        if self.player.alive:
+            self.player.update(dt_seconds, self.enemies, self.get_key_state(), self.entity_index) # Player update, including attack checks
+            self.player.apply_gravity(dt_seconds=dt_seconds)
+            self.check_vertical_collisions() # Player vertical collisions
+        
+        self.camera.update(self.player, self.current_world_width, self.current_world_height)
+        
+        # Update NPCs (including Witcher's special behavior)
+        for npc_instance in self.npcs:
+            if isinstance(npc_instance, WitcherNPC):
+                npc_instance.update_behavior(dt_seconds, self.player.rect, self.platforms)
+            # Add other general NPC update logic here if needed (e.g., animations, simple movements)
+
+        # Update Enemies
+        if self.enemy_batch:
+            self.update_enemies_batched(dt_seconds, current_game_time_seconds)
+        else:
+            for i_enemy in self.enemies[:]: 
+                if i_enemy.alive:
+                    damage_val = i_enemy.update(dt_seconds, self.player.rect, self.platforms, current_game_time_seconds, self.platform_grid, self.collision_grid)
+                    if damage_val > 0 and self.player.alive:
+                        self.player.take_damage(damage_val)
+                        if not self.player.alive:
+                            self.handle_player_killed_by_enemy()
+                            break # Stop processing enemies if player died
                 else: 
-                    self.screen.fill((30, 30, 70)) 
+                    self.record_defeated_enemy(i_enemy)
+                    self.enemies.remove(i_enemy) 
+        
+        # Update Projectiles & Check Collisions
+        pool = self.projectile_pool
+        pool.update(dt_seconds)
+        if self.player.alive:
+            # One batched AABB test against the player, hits handled in firing order
+            for i in pool.colliding(self.player.rect):
+                self.player.take_damage(int(pool.damage[i]))
+                pool.kill(i) # Projectile hits once
+                if not self.player.alive:
+                    print("Player died from projectile, returning to menu.")
+                    self.state = "menu" 
+                    # Reset dialog/interaction states
+                    self.dialog_choice_active = False; self.active_dialog = []; # etc.
+                    break # Stop processing projectiles if player died
+
+        if self.jump_requested:
+            if self.player.on_ground and self.player.alive and not self.active_dialog:
+                self.player.jump()
+            self.jump_requested = False
+        
+        if self.state == "playing": # Re-check as player might have died
+            self.check_scene_location_triggers()
+
+    def update_enemies_batched(self, dt_seconds, current_game_time_seconds):
+        """Enemy part of update() with every alive enemy stepped at once by self.enemy_batch."""
+        defeated = [i_enemy for i_enemy in self.enemies if not i_enemy.alive]
+        for i_enemy in defeated:
+            self.record_defeated_enemy(i_enemy)
+            self.enemies.remove(i_enemy)
+        hits = self.enemy_batch.update(self.enemies, dt_seconds, self.player.rect, self.platforms,
+                                       current_game_time_seconds, self.platform_grid, self.collision_grid)
+        for i_enemy, damage_val in hits:
+            if damage_val > 0 and self.player.alive:
+                self.player.take_damage(damage_val)
+                if not self.player.alive:
+                    self.handle_player_killed_by_enemy()
+                    break
+
+    def record_defeated_enemy(self, i_enemy):
+        if i_enemy.uid and i_enemy.uid not in self.defeated_enemy_uids:
+            self.defeated_enemy_uids.add(i_enemy.uid)
+            print(f"Enemy {i_enemy.uid} permanently defeated and recorded.")
+
+    def handle_player_killed_by_enemy(self):
+        print("Player died, returning to menu.")
+        self.state = "menu"
+        # Reset dialog/interaction states on player death
+        self.dialog_choice_active = False 
+        self.active_dialog = [] 
+        self.current_dialog_line_index = 0
+        self.interacting_npc = None
+        self.last_dialog_key_spoken_by_npc = None
 
-                if self.start_button_img: 
-                    self.screen.blit(self.start_button_img, self.start_button_img.get_rect(center=(self.WIDTH//2, self.HEIGHT//2 - 40)))
-                if self.exit_button_img: 
-                    self.screen.blit(self.exit_button_img, self.exit_button_img.get_rect(center=(self.WIDTH//2, self.HEIGHT//2 + 40)))
-            
-            elif self.state == "playing" or self.state == "paused":
-                # Use the new draw_background_scaled_with_camera if you want parallax/zoomable backgrounds
-                # For now, using simple scaled background
-                if self.current_background:
-                    # Simple scaling:
-                    self.screen.blit(pygame.transform.scale(self.current_background, (self.WIDTH, self.HEIGHT)), (0, 0))
-                    # OR for camera-scaled background (ensure self.current_background is large enough):
-                    # draw_background_scaled_with_camera(self.screen, self.current_background, self.camera.rect, self.WIDTH, self.HEIGHT)
-                else: self.screen.fill((30,30,30)) # Fallback bg color
-                
-                # Pass self.projectiles to draw_objects
-                draw_objects(self.screen, self.player, self.platforms, self.npcs, self.enemies, self.projectiles, self.camera.rect, self.zoom)
-                
-                if self.player and self.player.alive:
-                    self.light_angle += 0.05 * (dt_seconds * self.FPS if dt_seconds > 0 else 1)
-                    # draw_darkness_with_light(self.screen, self.player, self.camera.rect, self.zoom, int(100 + math.sin(self.light_angle) * 8)) # Optional light effect
-
-                # Interaction Prompt Drawing
-                if self.npc_interaction_candidate and not self.active_dialog:
-                    # ... (interaction prompt drawing remains the same)
-                    prompt_text = "[E] Interact"
-                    prompt_surf = self.interaction_prompt_font.render(prompt_text, True, (255, 255, 255))
-                    npc_world_rect = self.npc_interaction_candidate.rect
-                    prompt_world_x = npc_world_rect.centerx
-                    prompt_world_y = npc_world_rect.top - 7 
-                    prompt_screen_x = int((prompt_world_x - self.camera.rect.x) * self.zoom)
-                    prompt_screen_y = int((prompt_world_y - self.camera.rect.y) * self.zoom)
-                    prompt_display_rect = prompt_surf.get_rect(midbottom=(prompt_screen_x, prompt_screen_y))
-                    bg_padding_x = 5; bg_padding_y = 2
-                    bg_rect = prompt_display_rect.inflate(bg_padding_x * 2, bg_padding_y * 2)
-                    prompt_bg_surface = pygame.Surface(bg_rect.size, pygame.SRCALPHA)
-                    pygame.draw.rect(prompt_bg_surface, (0, 0, 0, 170), prompt_bg_surface.get_rect(), border_radius=3)
-                    self.screen.blit(prompt_bg_surface, bg_rect.topleft)
-                    self.screen.blit(prompt_surf, prompt_display_rect)
-
-                # UI Elements (Health, Geo, Coords)
-                # ... (UI drawing remains the same)
-                health_surf = self.font.render(f"Health: {self.player.health if self.player else 'N/A'}", True, (255,255,255))
-                self.screen.blit(health_surf, (10,10))
-                geo_surf = self.font.render(f"Geo: {self.player_data['geo']}", True, (255,223,0))
-                self.screen.blit(geo_surf, (10,40))
-                if self.player:
-                    coords_surf = self.font.render(f"Coords: ({int(self.player.rect.x)}, {int(self.player.rect.y)})", True, (200,200,200))
-                    self.screen.blit(coords_surf, (10, 70))
-
-
-                # Dialog Box and Dialog Choice Prompt
-                if self.active_dialog and self.interacting_npc:
-                    # ... (dialog box drawing remains the same)
-                    pygame.draw.rect(self.screen, (30,30,30,210), self.dialog_box_rect) # Semi-transparent
-                    pygame.draw.rect(self.screen, (200,200,200), self.dialog_box_rect, 2) # Border
-                    if 0 <= self.current_dialog_line_index < len(self.active_dialog):
-                        draw_text(self.screen, self.active_dialog[self.current_dialog_line_index], self.dialog_font, (230,230,230), self.dialog_box_rect.inflate(-20,-20))
-                    prompt_surf = self.dialog_font.render("E >", True, (180,180,180))
-                    self.screen.blit(prompt_surf, (self.dialog_box_rect.right - prompt_surf.get_width()-10, self.dialog_box_rect.bottom - prompt_surf.get_height()-5))
-                
-                if self.dialog_choice_active: # Must be drawn after normal dialog box potentially
-                    self.draw_dialog_choice_prompt()
-                
-                if self.state == "paused":
-                    # ... (paused overlay drawing remains the same)
-                    overlay = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
-                    overlay.fill((0,0,0,150)) # alpha
-                    self.screen.blit(overlay, (0,0))
-                    resume_text = self.font.render("PAUSED - ESC to Resume", True, (255,255,255))
-                    self.screen.blit(resume_text, resume_text.get_rect(center=(self.WIDTH/2, self.HEIGHT/2)))
-            
+    def interpolated_objects(self):
+        """Everything whose rect moves during a step and is drawn from it."""
+        objects = [self.camera]
+        if self.player: objects.append(self.player)
+        objects.extend(self.npcs)
+        objects.extend(self.enemies) # Projectiles interpolate themselves, see ProjectilePool.render_alpha
+        return objects
+
+    def snapshot_positions(self):
+        self.previous_positions = {id(obj): (obj, obj.rect.x, obj.rect.y) for obj in self.interpolated_objects()}
+
+    def advance_simulation(self, frame_dt):
+        """
+        Feeds frame_dt into the accumulator and runs as many fixed physics_dt steps as it
+        covers, at most max_steps_per_frame. Time beyond that cap is dropped, so one long
+        stall cannot turn into a spiral of ever slower catch-up frames. Returns the step count.
+        """
+        if self.state != "playing" or self.scene_loading:
+            self.sim_accumulator = 0.0 # Don't fast-forward through time spent paused, in the menu or loading a scene
+            return 0
+        self.sim_accumulator += frame_dt
+        steps = 0
+        while self.sim_accumulator >= self.physics_dt and self.state == "playing":
+            if self.scene_loading:
+                self.sim_accumulator = 0.0 # A step started a scene change: hold until it is built
+                break
+            if steps == self.max_steps_per_frame:
+                self.dropped_sim_time += self.sim_accumulator
+                self.sim_accumulator = 0.0
+                break
+            self.step_simulation()
+            self.sim_accumulator -= self.physics_dt
+            steps += 1
+        return steps
+
+    def step_simulation(self):
+        """Advances the "playing" state by exactly one physics_dt step."""
+        if self.scene_load:
+            self.finish_scene_load() # Requested scene changes take effect here, built or not (replays don't wait for frames)
+        self.snapshot_positions()
+        self.game_time_seconds += self.physics_dt
+        self.update(self.physics_dt, self.game_time_seconds)
+        self.sim_steps += 1
+
+    def render_interpolated(self, dt_seconds):
+        """
+        Renders with every moving rect blended between its position before and after the
+        last step by the fraction of a step left in the accumulator. Positions are put back
+        afterwards; the simulation never sees interpolated values.
+        """
+        if self.state != "playing" or not self.previous_positions:
+            self.render(dt_seconds)
+            return
+        alpha = min(1.0, self.sim_accumulator / self.physics_dt)
+        moved = []
+        for obj in self.interpolated_objects():
+            previous = self.previous_positions.get(id(obj))
+            if previous is None or previous[0] is not obj: continue # Spawned during the last step
+            x, y = obj.rect.x, obj.rect.y
+            if (x, y) == previous[1:]: continue
+            moved.append((obj, x, y))
+            obj.rect.x = round(previous[1] + (x - previous[1]) * alpha)
+            obj.rect.y = round(previous[2] + (y - previous[2]) * alpha)
+        self.projectile_pool.render_alpha = alpha
+        try:
+            self.render(dt_seconds)
+        finally:
+            for obj, x, y in moved:
+                obj.rect.x, obj.rect.y = x, y
+            self.projectile_pool.render_alpha = 1.0
+
+    def render(self, dt_seconds):
+        if self.state == "playing" and self.scene_loading:
+            self.draw_hold_frame()
+            self.dirty_renderer.invalidate()
             pygame.display.flip()
+        elif self.state == "playing" and self.dirty_rect_rendering:
+            self.draw_playing_frame_dirty(dt_seconds) # Presents only the changed areas
+        else:
+            self.draw_frame(dt_seconds)
+            self.dirty_renderer.invalidate() # Next dirty-rect frame must start from a full redraw
+            pygame.display.flip()
+
+    def run(self):
+        running = True
+        while running:
+            dt_seconds = self.clock.tick(self.FPS) / 1000.0
+
+            events = pygame.event.get()
+            if self.recorder: self.recorder.begin_frame(events, pygame.key.get_pressed())
+            running = self.handle_events(events)
+            if self.scene_load:
+                self.scene_load.run(self.scene_build_budget) # A slice of the scene being loaded
+            steps = self.advance_simulation(dt_seconds)
+            if self.recorder: self.recorder.end_frame(steps)
+            self.render_interpolated(dt_seconds)
+            self.assets.convert_prefetched() # Finish neighbour scenes' prefetched images, a little per frame
         
+        if self.recorder: self.recorder.save(self)
+        self.assets.shutdown()
         pygame.quit()
         sys.exit()
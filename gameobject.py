@@ -1,5 +1,6 @@
 # gameobject.py
 import pygame
+from sprite_cache import sprite_cache
 
 class GameObject:
     def __init__(self, x, y, width, height):
@@ -9,10 +10,11 @@ class GameObject:
         pass 
 
 class Platform(GameObject):
-    def __init__(self, x, y, width, height, image, is_wall=False):
+    def __init__(self, x, y, width, height, image, is_wall=False, variants=None):
         super().__init__(x, y, width, height)
         self.image = image
         self.is_wall = is_wall
+        self.variants = variants # image_variants.ImageVariants of the image, or None
 
     def draw(self, screen, camera_rect, zoom):
         if not self.image: return
@@ -23,16 +25,18 @@ class Platform(GameObject):
         scaled_height = int(self.rect.height * zoom)
         if scaled_width <= 0 or scaled_height <= 0: return
 
-        scaled_img = pygame.transform.scale(self.image, (scaled_width, scaled_height))
+        # Scale from the variant closest to the zoomed size, not from the full source image
+        image = self.variants.closest((scaled_width, scaled_height)) if self.variants else self.image
+        scaled_img = sprite_cache.get(image, (scaled_width, scaled_height))
         screen.blit(scaled_img, (screen_x, screen_y))
 
-def create_platforms_for_level(platform_definitions, platform_image_assets):
+def create_platforms_for_level(platform_definitions, assets): # assets: AssetManager
     platforms = []
     for p_def in platform_definitions:
         x, y, width, height, image_key, is_wall = p_def
-        image = platform_image_assets.get(image_key)
+        image = assets.get(image_key, size=(width, height))
         if image:
-            platforms.append(Platform(x, y, width, height, image, is_wall))
+            platforms.append(Platform(x, y, width, height, image, is_wall, assets.variants(image_key)))
         else:
             print(f"Warning: Platform image_key '{image_key}' not found in assets. Platform not created.")
     return platforms
@@ -70,43 +74,3 @@ class Animation:
     def get_current_frame(self):
         if not self.frames: return None
         return self.frames[self.current_frame_index]
-
-# NEW Projectile class
-class Projectile(GameObject):
-    def __init__(self, x, y, width, height, image, velocity_x, velocity_y, damage, max_lifetime_seconds=5):
-        super().__init__(x, y, width, height)
-        self.image = image
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.damage = damage
-        self.alive = True
-        self.lifetime = 0
-        self.max_lifetime = max_lifetime_seconds
-
-    def update(self, dt_seconds):
-        if not self.alive:
-            return
-        self.rect.x += self.velocity_x * dt_seconds
-        self.rect.y += self.velocity_y * dt_seconds
-        self.lifetime += dt_seconds
-        if self.lifetime > self.max_lifetime:
-            self.alive = False
-
-    def draw(self, screen, camera_rect, zoom):
-        if not self.alive or not self.image:
-            return
-        
-        screen_x = int((self.rect.x - camera_rect.x) * zoom)
-        screen_y = int((self.rect.y - camera_rect.y) * zoom)
-        
-        # Assuming projectile image is already desired size, or scale it if needed
-        # For simplicity, let's assume it's pre-scaled or small enough
-        # scaled_width = int(self.rect.width * zoom) 
-        # scaled_height = int(self.rect.height * zoom)
-        # if scaled_width <= 0 or scaled_height <= 0: return
-        # scaled_img = pygame.transform.scale(self.image, (scaled_width, scaled_height))
-        
-        # If projectile image is small and shouldn't scale with world zoom, draw it directly
-        # For now, let's make it scale like other game objects
-        scaled_img = pygame.transform.scale(self.image, (int(self.rect.width * zoom), int(self.rect.height * zoom)))
-        screen.blit(scaled_img, (screen_x, screen_y))
@@ -0,0 +1,61 @@
+# image_variants.py
+import math
+import struct
+import pygame
+
+MIP_LEVELS = (1, 2, 4) # Native, half and quarter size
+
+def png_size(path):
+    """(width, height) from a PNG header without decoding the image; None if `path` is not a readable PNG."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+def mip_sizes(native_size):
+    """Native, half and quarter size of an image (never below 1x1)."""
+    return [(max(1, native_size[0] // level), max(1, native_size[1] // level)) for level in MIP_LEVELS]
+
+def _distance(size, target):
+    """How far apart two sizes are as a scale factor: 0 for equal, the same for 2x bigger or 2x smaller."""
+    return max(abs(math.log(size[0] / max(1, target[0]))), abs(math.log(size[1] / max(1, target[1]))))
+
+def closest_size(sizes, target):
+    """The size of `sizes` closest to `target` in scale; on a tie the bigger one, so it is scaled down rather than up."""
+    return min(sizes, key=lambda size: (_distance(size, target), -size[0] * size[1]))
+
+def variant_plan(native_size, draw_sizes, max_zoom=1.0):
+    """
+    The sizes worth keeping of an image of `native_size` drawn at `draw_sizes`: each draw
+    size exactly, plus (if the camera can zoom in) the mip level closest to each draw size
+    at `max_zoom`. The native image itself is only kept if one of those is its size.
+    """
+    sizes = set(draw_sizes)
+    if max_zoom > 1.0:
+        levels = mip_sizes(native_size)
+        for w, h in draw_sizes:
+            sizes.add(closest_size(levels, (w * max_zoom, h * max_zoom)))
+    return sorted(sizes)
+
+def make_variants(source, sizes):
+    """
+    `source` scaled to each of `sizes` with pygame.transform.scale (nearest neighbour), as
+    images were scaled at load before there were variants, so they look exactly the same.
+    Works on decoded surfaces that are not converted yet, so it is safe off the main thread.
+    """
+    return {size: source if source.get_size() == tuple(size) else pygame.transform.scale(source, size) for size in sizes}
+
+class ImageVariants:
+    """The resident variants of one image, by size. Draw code asks for the one closest to what it draws."""
+    def __init__(self, surfaces):
+        self.surfaces = dict(surfaces) # (width, height) -> surface
+
+    def closest(self, size):
+        return self.surfaces[closest_size(self.surfaces, size)]
+
+    def largest(self):
+        return self.surfaces[max(self.surfaces, key=lambda size: size[0] * size[1])]
@@ -1,6 +1,83 @@
 #main.py
-from game import Game # Make sure your main game class is in game.py
+import sys
+import argparse
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="G The Bugs")
+    parser.add_argument("--dirty-rects", action="store_true", help="Only repaint changed screen areas (software rendering)")
+    parser.add_argument("--batch-enemies", action="store_true", help="Update all enemies together with NumPy (see enemy_batch.py)")
+    parser.add_argument("--tick-rate", type=int, default=60, help="Fixed physics steps per second (independent of frame rate)")
+    parser.add_argument("--benchmark", action="store_true", help="Run headless for a fixed number of frames and report frame times")
+    parser.add_argument("--scene", default="scene1", help="Scene id to benchmark (see scene_config.SCENES_DATA)")
+    parser.add_argument("--frames", type=int, default=600, help="Number of frames to benchmark")
+    parser.add_argument("--input-script", help="JSON input script for the benchmark (default: built-in walk/jump/attack loop)")
+    parser.add_argument("--output", help="Write the benchmark report as JSON to this file")
+    parser.add_argument("--transition-benchmark", action="store_true",
+                        help="Compare worst-case frame times of scene changes loaded in one frame vs. spread over frames")
+    parser.add_argument("--record", metavar="PATH", help="Record this session's input (replayable with --replay)")
+    parser.add_argument("--seed", type=int, help="Seed for the game's random number generator")
+    parser.add_argument("--replay", metavar="PATH", help="Replay a recording headless at full speed and verify its checksum")
+    parser.add_argument("--render-replay", action="store_true", help="Also draw every frame during --replay (for timing)")
+    parser.add_argument("--asset-report", action="store_true", help="Print what the asset store holds when the program exits")
+    parser.add_argument("--build-asset-cache", action="store_true", help="Decode every image once into the binary asset cache and exit")
+    parser.add_argument("--build-atlas", action="store_true", help="Pack the small platform images into atlas sheets and exit")
+    parser.add_argument("--no-asset-cache", action="store_true", help="Load images from their PNGs, without reading or writing the asset cache")
+    parser.add_argument("--asset-cache-benchmark", action="store_true", help="Compare loading every asset from PNG vs. the asset cache")
+    parser.add_argument("--blit-benchmark", action="store_true", help="Compare per-scene blit times of per-pixel alpha images vs. their fastest format")
+    parser.add_argument("--profile-startup", metavar="TRACE", nargs="?", const="startup_trace.json",
+                        help="Time startup up to the first frame of scene 1 per phase and per image, and write a Chrome trace (default: startup_trace.json)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    game_instance = Game()
-    game_instance.run()
+    args = parse_args()
+    if args.asset_report:
+        import atexit
+        from asset_store import asset_store
+        atexit.register(asset_store.print_report)
+    if args.replay:
+        import replay # Sets up the headless SDL drivers before pygame starts
+        from asset_cache import ASSET_CACHE_PATH
+        # The game's own cache, as when playing: scene changes in the replay are timed too
+        report = replay.run_replay(args.replay, render=args.render_replay, asset_cache_path=None if args.no_asset_cache else ASSET_CACHE_PATH)
+        replay.print_replay_report(report)
+        sys.exit(0 if report["match"] else 1)
+    elif args.build_asset_cache:
+        import asset_cache
+        count = asset_cache.build_asset_cache()
+        print(f"Wrote {count} images to {asset_cache.ASSET_CACHE_PATH}")
+    elif args.build_atlas:
+        import atlas
+        index = atlas.build_atlases()
+        print(f"Packed {len(index['entries'])} images into {len(index['sheets'])} sheets in {atlas.ATLAS_DIR}")
+    elif args.profile_startup:
+        import startup_profile
+        startup_profile.print_startup_profile(startup_profile.run_startup_profile(args.profile_startup))
+    elif args.asset_cache_benchmark:
+        import asset_cache
+        asset_cache.print_cache_benchmark(asset_cache.benchmark_asset_loading())
+    elif args.blit_benchmark:
+        import blit_format
+        blit_format.print_blit_benchmark(blit_format.benchmark_scene_blits())
+    elif args.transition_benchmark:
+        import benchmark # Sets up the headless SDL drivers before pygame starts
+        report = benchmark.run_transition_benchmark()
+        benchmark.print_transition_report(report)
+        if args.output:
+            benchmark.write_report(report, args.output)
+    elif args.benchmark:
+        import benchmark # Sets up the headless SDL drivers before pygame starts
+        script = benchmark.load_input_script(args.input_script) if args.input_script else None
+        report = benchmark.run_benchmark(args.scene, args.frames, script, dirty_rect_rendering=args.dirty_rects, tick_rate=args.tick_rate,
+                                         enemy_batching=args.batch_enemies)
+        benchmark.print_report(report)
+        if args.output:
+            benchmark.write_report(report, args.output)
+    else:
+        from game import Game # Make sure your main game class is in game.py
+        from asset_cache import ASSET_CACHE_PATH
+        game_instance = Game(dirty_rect_rendering=args.dirty_rects, tick_rate=args.tick_rate, enemy_batching=args.batch_enemies,
+                             seed=args.seed, asset_cache_path=None if args.no_asset_cache else ASSET_CACHE_PATH)
+        if args.record:
+            from replay import InputRecorder
+            game_instance.recorder = InputRecorder(args.record)
+        game_instance.run()
@@ -1,7 +1,7 @@
 # npc.py
 import pygame
-import random # For Witcher's random jumps
-from gameobject import Animation, Projectile # Import Projectile
+from gameobject import Animation
+from sprite_cache import sprite_cache
 
 # --- DIALOGS ---
 truth_seeker_dialogs = {
@@ -44,6 +44,7 @@ class NPC(pygame.sprite.Sprite):
         super().__init__()
         self.name = name
         self.rect = pygame.Rect(x, y, width, height)
+        self.spawn_pos = (x, y)
         self.base_dialogs = base_dialogs 
         
         self.image_surface_original = image_surface # Store original for Witcher
@@ -61,6 +62,12 @@ class NPC(pygame.sprite.Sprite):
         self.active = True 
         self.current_dialog_key = "default"
 
+    def respawn(self):
+        """Back to the state __init__ leaves it in (for a scene entered again)."""
+        self.rect.topleft = self.spawn_pos
+        self.active = True
+        self.current_dialog_key = "default"
+
     def interact(self, player_data, story_flags_from_game):
         current_dialog_lines = ["..."] 
         self.current_dialog_key = "fallback"
@@ -130,18 +137,14 @@ class NPC(pygame.sprite.Sprite):
         if not self.active or not self.image: 
             return
         
-        # If self.image is dynamically changed by an animation, it will be reflected here
-        current_image_to_draw = self.image 
-
         scaled_width = int(self.rect.width * zoom)
         scaled_height = int(self.rect.height * zoom)
         if scaled_width <= 0 or scaled_height <= 0: return
 
+        # If self.image is dynamically changed by an animation, it will be reflected here.
         # Check for facing if the NPC has this attribute (Witcher will)
-        if hasattr(self, 'facing') and self.facing == "left":
-             current_image_to_draw = pygame.transform.flip(current_image_to_draw, True, False)
-
-        scaled_img = pygame.transform.scale(current_image_to_draw, (scaled_width, scaled_height))
+        flip_x = hasattr(self, 'facing') and self.facing == "left"
+        scaled_img = sprite_cache.get(self.image, (scaled_width, scaled_height), flip_x=flip_x)
         screen_x = int((self.rect.x - camera_rect.x) * zoom)
         screen_y = int((self.rect.y - camera_rect.y) * zoom)
         screen.blit(scaled_img, (screen_x, screen_y))
@@ -151,7 +154,8 @@ class WitcherNPC(NPC):
     def __init__(self, x, y, width, height, name, base_dialogs, image_surface, witcher_image2, bullet_image_asset, game_ref):
         super().__init__(x, y, width, height, name, base_dialogs, image_surface)
         
-        self.game_ref = game_ref # Reference to the main game object to add projectiles
+        self.game_ref = game_ref # Reference to the main game object, projectiles go into its projectile_pool
+        self.rng = game_ref.rng # Seeded game RNG, keeps jumps reproducible in replays
         self.original_y = y # To return after jump
         self.witcher_frame1 = image_surface # Already scaled by NPC init, but we might want originals
         self.witcher_frame2 = witcher_image2
@@ -172,7 +176,7 @@ class WitcherNPC(NPC):
         self.gravity = 0.5 # Simple gravity for Witcher
         self.jump_interval_min = 3.0 # Min seconds between jumps
         self.jump_interval_max = 7.0 # Max seconds
-        self.time_to_next_jump = random.uniform(self.jump_interval_min, self.jump_interval_max)
+        self.time_to_next_jump = self.rng.uniform(self.jump_interval_min, self.jump_interval_max)
         self.time_since_last_jump_check = 0
 
         # Projectile mechanics
@@ -184,14 +188,26 @@ class WitcherNPC(NPC):
 
         self.facing = "right" # or "left"
 
+    def respawn(self):
+        super().respawn()
+        self.image = self.idle_image
+        self.jump_anim.reset()
+        self.is_jumping = False
+        self.velocity_y = 0
+        self.time_to_next_jump = self.rng.uniform(self.jump_interval_min, self.jump_interval_max) # Drawn like __init__ does, replays stay in step
+        self.time_since_last_jump_check = 0
+        self.time_since_last_shot = self.projectile_cooldown
+        self.facing = "right"
+
     def update_behavior(self, dt_seconds, player_rect, platforms): # platforms might be needed for landing
         self.time_since_last_jump_check += dt_seconds
         self.time_since_last_shot += dt_seconds
 
         # --- Jumping Logic ---
         if self.is_jumping:
-            self.velocity_y += self.gravity
-            self.rect.y += self.velocity_y
+            tick_scale = dt_seconds * 60.0 # Jump arc is tuned in 60 Hz ticks
+            self.velocity_y += self.gravity * tick_scale
+            self.rect.y += self.velocity_y * tick_scale
             self.image = self.jump_anim.get_current_frame() # Update image from jump animation
             self.jump_anim.update(dt_seconds)
 
@@ -201,7 +217,7 @@ class WitcherNPC(NPC):
                 self.is_jumping = False
                 self.velocity_y = 0
                 self.image = self.idle_image # Back to idle image
-                self.time_to_next_jump = random.uniform(self.jump_interval_min, self.jump_interval_max)
+                self.time_to_next_jump = self.rng.uniform(self.jump_interval_min, self.jump_interval_max)
                 self.time_since_last_jump_check = 0
         else: # Not currently jumping, check if should jump
             if self.time_since_last_jump_check >= self.time_to_next_jump:
@@ -237,15 +253,12 @@ class WitcherNPC(NPC):
                 proj_vel_y = (dy / magnitude) * self.projectile_speed
 
             # Spawn projectile (adjust spawn position based on Witcher size/facing)
-            bullet_w, bullet_h = 10, 10 # Or get from bullet_image.get_size()
+            pool = self.game_ref.projectile_pool
+            bullet_w, bullet_h = pool.width, pool.height # Every pooled projectile shares one size
             spawn_x = self.rect.centerx
             if self.facing == "right":
                 spawn_x = self.rect.right
             else:
                 spawn_x = self.rect.left - bullet_w
             
-            new_projectile = Projectile(spawn_x, self.rect.centery - bullet_h / 2,
-                                        bullet_w, bullet_h,
-                                        self.bullet_image,
-                                        proj_vel_x, proj_vel_y, self.projectile_damage)
-            self.game_ref.projectiles.append(new_projectile) # Add to game's list
+            pool.spawn(spawn_x, self.rect.centery - bullet_h / 2, proj_vel_x, proj_vel_y, self.projectile_damage)
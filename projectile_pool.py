@@ -0,0 +1,132 @@
+# projectile_pool.py
+import numpy as np
+import pygame
+from sprite_cache import sprite_cache
+
+class ProjectilePool:
+    """
+    Every live projectile of a scene, stored as parallel NumPy arrays (struct of arrays)
+    instead of one Projectile object each. Slots [0, count) are in use, in firing order;
+    dead ones are compacted away after each update, and the arrays only grow (doubling)
+    so spawning does not allocate once the pool has warmed up.
+    All projectiles share one size and image: they are drawn from a single cached surface.
+    """
+    # Above this many on-screen projectiles, dirty-rect mode gets one bounding rect instead of one each
+    MAX_SEPARATE_SCREEN_RECTS = 64
+    # One array per field; prev_x/prev_y hold the position before the last update (render interpolation),
+    # vx/vy are in pixels per second
+    FIELDS = (('x', np.float64), ('y', np.float64), ('prev_x', np.float64), ('prev_y', np.float64),
+              ('vx', np.float64), ('vy', np.float64), ('lifetime', np.float64), ('max_lifetime', np.float64),
+              ('damage', np.int32), ('alive', bool))
+
+    def __init__(self, image=None, width=10, height=10, capacity=256):
+        self.image = image
+        self.width = width
+        self.height = height
+        self.count = 0
+        self.render_alpha = 1.0 # Interpolation factor between prev_* and current positions (see Game.render_interpolated)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """(Re)creates the arrays with room for `capacity` projectiles, keeping the live ones."""
+        for name, dtype in self.FIELDS:
+            array = np.zeros(capacity, dtype=dtype)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, velocity_x, velocity_y, damage, max_lifetime_seconds=5):
+        """Adds one projectile with its top-left corner at (x, y)."""
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.vx[i] = velocity_x
+        self.vy[i] = velocity_y
+        self.lifetime[i] = 0.0
+        self.max_lifetime[i] = max_lifetime_seconds
+        self.damage[i] = damage
+        self.alive[i] = True
+        self.count += 1
+        return i
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, dt_seconds):
+        """Moves every projectile, expires old ones and compacts the dead away."""
+        n = self.count
+        if not n: return
+        self.compact() # Drop projectiles killed since the last update (e.g. by hits)
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.vx[:n] * dt_seconds
+        self.y[:n] += self.vy[:n] * dt_seconds
+        self.lifetime[:n] += dt_seconds
+        self.alive[:n] &= self.lifetime[:n] <= self.max_lifetime[:n]
+        self.compact()
+
+    def compact(self):
+        """Moves live projectiles to the front, keeping their order."""
+        n = self.count
+        alive = self.alive[:n]
+        if alive.all(): return
+        keep = np.flatnonzero(alive)
+        m = len(keep)
+        for name, _ in self.FIELDS:
+            array = getattr(self, name)
+            array[:m] = array[keep]
+        self.count = m
+
+    def colliding(self, rect):
+        """Indices of live projectiles overlapping `rect`, in firing order (one batched AABB test)."""
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        hit = (self.alive[:n] & (x < rect.right) & (x + self.width > rect.left)
+               & (y < rect.bottom) & (y + self.height > rect.top))
+        return np.flatnonzero(hit)
+
+    def kill(self, index):
+        self.alive[index] = False
+
+    def _screen_positions(self, camera_rect, zoom, view_rect):
+        """Integer screen positions of the live projectiles touching `view_rect`, plus the culled count."""
+        n = self.count
+        alpha = self.render_alpha
+        x, y = self.x[:n], self.y[:n]
+        if alpha < 1.0:
+            x = self.prev_x[:n] + (x - self.prev_x[:n]) * alpha
+            y = self.prev_y[:n] + (y - self.prev_y[:n]) * alpha
+        alive = self.alive[:n]
+        visible = (alive & (x < view_rect.right) & (x + self.width > view_rect.left)
+                   & (y < view_rect.bottom) & (y + self.height > view_rect.top))
+        screen_x = ((x[visible] - camera_rect.x) * zoom).astype(np.int32) # Truncates like int() in the draw() methods
+        screen_y = ((y[visible] - camera_rect.y) * zoom).astype(np.int32)
+        return screen_x, screen_y, int(np.count_nonzero(alive)) - len(screen_x)
+
+    def draw(self, screen, camera_rect, zoom, view_rect):
+        """Blits every visible projectile with one batched call. Returns (drawn, culled)."""
+        if not self.count or not self.image: return 0, 0
+        size = (int(self.width * zoom), int(self.height * zoom))
+        if size[0] <= 0 or size[1] <= 0: return 0, 0
+        surface = sprite_cache.get(self.image, size)
+        screen_x, screen_y, culled = self._screen_positions(camera_rect, zoom, view_rect)
+        screen.blits([(surface, pos) for pos in zip(screen_x.tolist(), screen_y.tolist())], doreturn=False)
+        return len(screen_x), culled
+
+    def screen_rects(self, camera_rect, zoom, view_rect):
+        """Screen rects draw() would cover (merged into one when there are many)."""
+        if not self.count or not self.image: return []
+        size = (int(self.width * zoom), int(self.height * zoom))
+        screen_x, screen_y, _ = self._screen_positions(camera_rect, zoom, view_rect)
+        if not len(screen_x): return []
+        if len(screen_x) > self.MAX_SEPARATE_SCREEN_RECTS:
+            left, top = int(screen_x.min()), int(screen_y.min())
+            return [pygame.Rect(left, top, int(screen_x.max()) - left + size[0], int(screen_y.max()) - top + size[1])]
+        return [pygame.Rect(sx, sy, size[0], size[1]) for sx, sy in zip(screen_x.tolist(), screen_y.tolist())]
@@ -0,0 +1,145 @@
+# replay.py
+import os
+import gzip
+import json
+import time
+import hashlib
+
+# Replays run without a window; must be set before pygame opens a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from benchmark import ScriptedKeys
+
+REPLAY_VERSION = 1
+
+# Every key constant pygame knows; held keys are recorded by key code, as get_key_state() is indexed
+ALL_KEYS = sorted({getattr(pygame, name) for name in dir(pygame) if name.startswith("K_")})
+
+# Only these event types affect the game (see Game.handle_events); everything else is not recorded
+RECORDED_EVENT_TYPES = {pygame.QUIT: "QUIT", pygame.KEYDOWN: "KEYDOWN", pygame.MOUSEBUTTONDOWN: "MOUSEBUTTONDOWN"}
+
+def _encode_event(event):
+    name = RECORDED_EVENT_TYPES[event.type]
+    if event.type == pygame.KEYDOWN:
+        return [name, event.key]
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return [name, event.button, list(event.pos)]
+    return [name]
+
+def _decode_event(data):
+    name = data[0]
+    if name == "KEYDOWN":
+        return pygame.event.Event(pygame.KEYDOWN, key=data[1], mod=0, unicode="", scancode=0)
+    if name == "MOUSEBUTTONDOWN":
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=data[1], pos=tuple(data[2]))
+    return pygame.event.Event(pygame.QUIT)
+
+def state_checksum(game):
+    """SHA-1 over the player, enemy, projectile and story-flag state: equal for equal simulations."""
+    player = game.player
+    pool = game.projectile_pool
+    n = pool.count
+    state = (
+        game.state, game.current_scene_id, game.sim_steps,
+        tuple(player.rect), player.velocity_y, player.on_ground, player.health, player.alive,
+        [(e.uid, tuple(e.rect), e.velocity_y, e.health, e.direction, e.facing, e.is_attacking) for e in game.enemies],
+        [(n_.name, tuple(n_.rect)) for n_ in game.npcs],
+        (pool.x[:n].tolist(), pool.y[:n].tolist(), pool.alive[:n].tolist()),
+        sorted(game.defeated_enemy_uids), sorted(game.story_flags.items()),
+    )
+    return hashlib.sha1(repr(state).encode()).hexdigest()
+
+class InputRecorder:
+    """
+    Logs what Game.run feeds the simulation each frame: the relevant events, the held
+    keys (only when they change) and how many fixed steps were simulated. Saved with the
+    RNG seed and tick rate as gzip-compressed JSON.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.frames = [] # [steps, held key list or None if unchanged, [events]]
+        self.last_held = None
+        self.pending = None
+
+    def begin_frame(self, events, pressed):
+        held = [key for key in ALL_KEYS if pressed[key]]
+        events = [_encode_event(e) for e in events if e.type in RECORDED_EVENT_TYPES]
+        self.pending = [0, None if held == self.last_held else held, events]
+        self.last_held = held
+
+    def end_frame(self, steps):
+        self.pending[0] = steps
+        self.frames.append(self.pending)
+        self.pending = None
+
+    def save(self, game):
+        data = {
+            "version": REPLAY_VERSION,
+            "seed": game.seed,
+            "tick_rate": game.tick_rate,
+            "enemy_batching": game.enemy_batch is not None,
+            "frames": self.frames,
+            "checksum": state_checksum(game),
+        }
+        with gzip.open(self.path, "wt") as f:
+            json.dump(data, f, separators=(",", ":"))
+        print(f"Recorded {len(self.frames)} frames to {self.path} (checksum {data['checksum']})")
+
+def load_replay(path):
+    with gzip.open(path, "rt") as f:
+        data = json.load(f)
+    if data.get("version") != REPLAY_VERSION:
+        raise ValueError(f"{path}: unsupported replay version {data.get('version')!r}")
+    return data
+
+def run_replay(path, render=False, asset_cache_path=None):
+    """
+    Plays a recording back headless as fast as possible: each frame's events and held keys
+    are fed in and exactly the recorded number of fixed steps is simulated. Returns a report
+    with the final checksum, whether it matches the recorded one, and timings. Images come
+    from their PNGs unless an `asset_cache_path` is given, so a replay writes no cache file.
+    """
+    data = load_replay(path)
+    from game import Game # Imported here so the SDL env vars above are in place first
+    game = Game(tick_rate=data["tick_rate"], enemy_batching=data["enemy_batching"], seed=data["seed"],
+                asset_cache_path=asset_cache_path)
+    keys = ScriptedKeys(frozenset())
+    game.get_key_state = lambda: keys
+
+    start = time.perf_counter()
+    frames_played = 0
+    for steps, held, events in data["frames"]:
+        if held is not None:
+            keys = ScriptedKeys(frozenset(held))
+        pygame.event.pump() # Keep SDL's own queue drained, its events are not used
+        running = game.handle_events([_decode_event(e) for e in events])
+        for _ in range(steps):
+            if game.state != "playing": break
+            game.step_simulation()
+        if render:
+            game.render(game.physics_dt)
+        frames_played += 1
+        if not running: break
+    elapsed = time.perf_counter() - start
+
+    checksum = state_checksum(game)
+    game.assets.shutdown()
+    pygame.quit()
+    return {
+        "replay": path,
+        "frames": frames_played,
+        "sim_steps": game.sim_steps,
+        "seconds": elapsed,
+        "steps_per_second": game.sim_steps / elapsed if elapsed > 0 else 0.0,
+        "checksum": checksum,
+        "expected_checksum": data.get("checksum"),
+        "match": checksum == data.get("checksum"),
+    }
+
+def print_replay_report(report):
+    status = "OK" if report["match"] else "MISMATCH"
+    print(f"Replay {report['replay']}: {report['frames']} frames, {report['sim_steps']} steps in "
+          f"{report['seconds']:.3f}s ({report['steps_per_second']:.0f} steps/s)")
+    print(f"Checksum {report['checksum']} (recorded {report['expected_checksum']}): {status}")
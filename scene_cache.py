@@ -0,0 +1,79 @@
+# scene_cache.py
+from collections import OrderedDict
+
+class SceneInstance:
+    """
+    What Game.load_scene builds for one scene: its platforms and the indices and static
+    layer derived from them, plus the NPC and enemy objects made so far (by definition
+    index; made the first time they appear, then respawned on every later visit).
+    """
+    def __init__(self, scene, background, world_size, platforms, platform_grid, collision_grid, static_layer, enemy_uids):
+        self.scene = scene
+        self.background = background
+        self.world_size = world_size
+        self.platforms = platforms
+        self.platform_grid = platform_grid
+        self.collision_grid = collision_grid
+        self.static_layer = static_layer
+        self.enemy_uids = enemy_uids # One per enemy definition
+        self.npcs = {} # npc definition index -> NPC
+        self.enemies = {} # enemy definition index -> Enemy
+        self.fresh = set() # NPCs and enemies made by the build and not shown yet; they start as they are
+        self.bytes = self._estimate_bytes()
+
+    def _estimate_bytes(self):
+        """Rough resident size: the static layer and the collision grid arrays (objects are small next to them)."""
+        total = self.static_layer.get_pitch() * self.static_layer.get_height() if self.static_layer else 0
+        if self.collision_grid:
+            total += sum(a.nbytes for a in self.collision_grid.cells.values())
+            total += sum(a.nbytes for a in self.collision_grid.area.values())
+        return total
+
+class SceneCache:
+    """
+    The most recently visited SceneInstances, so walking back into a scene swaps the
+    built one back in instead of rebuilding it. At most `capacity` instances and about
+    `max_bytes` are kept; the least recently visited go first, but never the newest.
+    """
+    def __init__(self, capacity=4, max_bytes=32 * 1024 * 1024):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.instances = OrderedDict() # scene_id -> SceneInstance, least recently visited first
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, scene_id):
+        instance = self.instances.get(scene_id)
+        if instance is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.instances.move_to_end(scene_id)
+        return instance
+
+    def put(self, instance):
+        old = self.instances.pop(instance.scene.id, None)
+        if old: self.current_bytes -= old.bytes
+        self.instances[instance.scene.id] = instance
+        self.current_bytes += instance.bytes
+        while len(self.instances) > 1 and (len(self.instances) > self.capacity or self.current_bytes > self.max_bytes):
+            _, evicted = self.instances.popitem(last=False)
+            self.current_bytes -= evicted.bytes
+            self.evictions += 1
+
+    def clear(self):
+        self.instances.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        return {
+            'scenes': list(self.instances),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
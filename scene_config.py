@@ -13,6 +13,9 @@ SCENE_ID_SHRINE_START = SCENE_ID_SCENE1 # Let's make scene1 the starting scene
 GAME_WIDTH = 1200
 GAME_HEIGHT = 600
 # Define the scene data structure
+# Enemy definitions can opt in to 'edge_aware': True, which makes the enemy turn around at
+# platform edges instead of walking off (see Enemy.at_ledge). None of the scenes below use
+# it yet, so their patrols (and recorded replays) stay as they were.
 SCENES_DATA = [
     {
         "id": SCENE_ID_SCENE1,
@@ -0,0 +1,50 @@
+# scene_loader.py
+import time
+
+def run_steps(steps):
+    """Runs a step generator (see SceneLoad) to the end in one go and returns its result."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as finished:
+            return finished.value
+
+class SceneLoad:
+    """
+    A scene change in progress. `steps` is a generator that does one small piece of the
+    work per next() (load an asset, make a platform, blit one image into the static
+    layer...) and returns the finished result. run() does as many pieces as fit in a
+    per-frame time budget, so building a big scene is spread over several frames instead
+    of stalling one; Game swaps the result in once done (see Game.finish_scene_load).
+    """
+    def __init__(self, scene, steps, player_pos=None):
+        self.scene = scene
+        self.steps = steps
+        self.player_pos = player_pos # Where the transition puts the player, None for the scene's start position
+        self.done = False
+        self.result = None
+        self.frames = 0 # Frames run() has been called on
+        self.busy_seconds = 0.0 # Time spent in steps, over all frames
+        self.longest_slice_seconds = 0.0
+
+    def run(self, budget_seconds):
+        """Runs steps until `budget_seconds` are used up or the load is done (at least one step, so it always progresses)."""
+        if self.done: return True
+        start = time.perf_counter()
+        self.frames += 1
+        while True:
+            try:
+                next(self.steps)
+            except StopIteration as finished:
+                self.done = True
+                self.result = finished.value
+                break
+            if time.perf_counter() - start >= budget_seconds: break
+        elapsed = time.perf_counter() - start
+        self.busy_seconds += elapsed
+        self.longest_slice_seconds = max(self.longest_slice_seconds, elapsed)
+        return self.done
+
+    def finish(self):
+        """Runs every remaining step now."""
+        return self.run(float('inf'))
@@ -0,0 +1,161 @@
+# scene_registry.py
+from dataclasses import dataclass
+import pygame
+from scene_config import SCENES_DATA
+
+LOCATION_TRANSITION_TYPES = ('player_at_location', 'player_at_location_and_flag')
+
+class SceneConfigError(ValueError):
+    """Raised when SCENES_DATA is malformed; the message names the scene and entry at fault."""
+
+@dataclass(frozen=True, slots=True)
+class Transition:
+    type: str
+    trigger_rect: pygame.Rect # Built once; treat as read-only
+    target_scene_id: str
+    target_player_pos: tuple = None
+    required_story_flag: str = None
+    must_all_enemies_be_slain: bool = False
+
+@dataclass(frozen=True, slots=True)
+class Scene:
+    id: str
+    index: int # Position in SCENES_DATA
+    background_key: str
+    world_dimensions: tuple # None means "use the game's default"
+    player_start_pos: tuple
+    platform_definitions: tuple
+    npc_definitions: tuple # The raw definition dicts, in file order
+    enemy_definitions: tuple
+    transitions: tuple # Transition objects of the location types, in file order
+    npc_definitions_by_name: dict
+    neighbours: tuple # Ids of scenes reachable from here (transitions and dialog scene changes)
+    prev_id: str # Scene before / after this one in SCENES_DATA order (wrapping), for the debug switcher
+    next_id: str
+
+    def npc_definition(self, name):
+        return self.npc_definitions_by_name.get(name)
+
+class SceneRegistry:
+    """
+    SCENES_DATA compiled once into immutable Scene objects, indexed by id. Everything the
+    game asks about scenes every frame (trigger rects, NPC definitions, neighbours, the
+    previous/next scene) is precomputed here, so lookups are dictionary hits.
+    """
+    def __init__(self, scenes_data):
+        self.scenes = {}
+        self.order = []
+        raw_by_id = {}
+        for index, scene_def in enumerate(scenes_data):
+            scene_id = scene_def.get('id') if isinstance(scene_def, dict) else None
+            if not scene_id:
+                raise SceneConfigError(f"Scene #{index} in SCENES_DATA has no 'id'.")
+            if scene_id in raw_by_id:
+                raise SceneConfigError(f"Scene id '{scene_id}' is defined twice (entries #{raw_by_id[scene_id][0]} and #{index}).")
+            raw_by_id[scene_id] = (index, scene_def)
+            self.order.append(scene_id)
+
+        count = len(self.order)
+        for scene_id, (index, scene_def) in raw_by_id.items():
+            self.scenes[scene_id] = _compile_scene(scene_def, index, raw_by_id,
+                                                   self.order[(index - 1) % count], self.order[(index + 1) % count])
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, scene_id):
+        return scene_id in self.scenes
+
+    def __iter__(self):
+        return (self.scenes[scene_id] for scene_id in self.order)
+
+    def get(self, scene_id):
+        """The Scene with `scene_id`, or None."""
+        return self.scenes.get(scene_id)
+
+    def first(self):
+        return self.scenes[self.order[0]] if self.order else None
+
+def _require(scene_id, what, value, check, expected):
+    if not check(value):
+        raise SceneConfigError(f"Scene '{scene_id}': {what} should be {expected}, got {value!r}.")
+    return value
+
+def _is_point(value):
+    return isinstance(value, (tuple, list)) and len(value) == 2 and all(isinstance(v, (int, float)) for v in value)
+
+def _compile_transition(scene_id, i, transition, raw_by_id):
+    where = f"transition #{i}"
+    target = transition.get('target_scene_id')
+    if target not in raw_by_id:
+        raise SceneConfigError(f"Scene '{scene_id}': {where} targets unknown scene {target!r}. "
+                               f"Known scenes: {', '.join(raw_by_id)}.")
+    coords = _require(scene_id, f"{where} 'rect_coords'", transition.get('rect_coords'),
+                      lambda v: isinstance(v, (tuple, list)) and len(v) == 4, "(x, y, width, height)")
+    target_pos = transition.get('target_player_pos')
+    if target_pos is not None:
+        _require(scene_id, f"{where} 'target_player_pos'", target_pos, _is_point, "an (x, y) pair")
+    return Transition(transition['type'], pygame.Rect(coords), target, target_pos,
+                      transition.get('required_story_flag'), bool(transition.get('must_all_enemies_be_slain', False)))
+
+def _compile_scene(scene_def, index, raw_by_id, prev_id, next_id):
+    scene_id = scene_def['id']
+    player_start_pos = _require(scene_id, "'player_start_pos'", scene_def.get('player_start_pos'), _is_point, "an (x, y) pair")
+    world_dimensions = scene_def.get('world_dimensions')
+    if world_dimensions is not None:
+        _require(scene_id, "'world_dimensions'", world_dimensions, _is_point, "a (width, height) pair")
+
+    platforms = tuple(scene_def.get('platform_definitions', []))
+    for i, platform_def in enumerate(platforms):
+        _require(scene_id, f"platform #{i}", platform_def,
+                 lambda v: isinstance(v, (tuple, list)) and len(v) == 6, "(x, y, w, h, image_key, is_wall)")
+
+    npc_by_name = {}
+    for i, npc_def in enumerate(scene_def.get('npc_definitions', [])):
+        for key in ('name', 'x', 'y', 'image_key'):
+            if key not in npc_def:
+                raise SceneConfigError(f"Scene '{scene_id}': NPC #{i} is missing '{key}'.")
+        if npc_def['name'] in npc_by_name:
+            raise SceneConfigError(f"Scene '{scene_id}': NPC name '{npc_def['name']}' is used twice.")
+        npc_by_name[npc_def['name']] = npc_def
+
+    for i, enemy_def in enumerate(scene_def.get('enemy_definitions', [])):
+        for key in ('x', 'y'):
+            if key not in enemy_def:
+                raise SceneConfigError(f"Scene '{scene_id}': enemy #{i} is missing '{key}'.")
+
+    neighbours = []
+    transitions = []
+    for i, transition in enumerate(scene_def.get('transitions', [])):
+        if transition.get('type') not in LOCATION_TRANSITION_TYPES:
+            continue # Other trigger types are not handled by the game (yet)
+        compiled = _compile_transition(scene_id, i, transition, raw_by_id)
+        transitions.append(compiled)
+        neighbours.append(compiled.target_scene_id)
+    for npc_def in npc_by_name.values():
+        dialog_target = (npc_def.get('on_interaction_end') or {}).get('next_scene_if_flag_is_also_set')
+        if dialog_target:
+            target = dialog_target.get('scene_id')
+            if target not in raw_by_id:
+                raise SceneConfigError(f"Scene '{scene_id}': NPC '{npc_def['name']}' changes to unknown scene {target!r}.")
+            neighbours.append(target)
+
+    return Scene(
+        id=scene_id,
+        index=index,
+        background_key=scene_def.get('background_key'),
+        world_dimensions=tuple(world_dimensions) if world_dimensions else None,
+        player_start_pos=tuple(player_start_pos),
+        platform_definitions=platforms,
+        npc_definitions=tuple(npc_by_name.values()),
+        enemy_definitions=tuple(scene_def.get('enemy_definitions', [])),
+        transitions=tuple(transitions),
+        npc_definitions_by_name=npc_by_name,
+        neighbours=tuple(dict.fromkeys(neighbours)), # De-duplicated, first occurrence order
+        prev_id=prev_id,
+        next_id=next_id,
+    )
+
+def compile_scenes(scenes_data=SCENES_DATA):
+    """Validates `scenes_data` and returns its SceneRegistry. Raises SceneConfigError on bad data."""
+    return SceneRegistry(scenes_data)
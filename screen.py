@@ -1,5 +1,10 @@
 # screen.py
+import time
 import pygame
+from collections import OrderedDict
+from sprite_cache import sprite_cache
+from startup_profile import startup_profiler
+from blit_format import fast_format
 
 class Camera:
     def __init__(self, width, height, zoom):
@@ -22,97 +27,30 @@ class Camera:
         if self.rect.height < 1: self.rect.height = 1
 
 
-def load_assets(screen_width_for_scaling, screen_height_for_scaling):
-    assets = {}
+def _decode_image(path):
+    """Reads one image file. Returns None (and logs) if it is missing or unreadable. Safe off the main thread."""
+    start = time.perf_counter()
     try:
-        assets['start_button_img'] = pygame.transform.scale(pygame.image.load("assets/image/start_button.png").convert_alpha(), (200, 100))
-        assets['exit_button_img'] = pygame.transform.scale(pygame.image.load("assets/image/exit_button.png").convert_alpha(), (200, 100))
-        assets['home_screen'] = pygame.image.load("assets/image/home_screen.png").convert_alpha()
-        
-        # Scene 1 Assets
-        assets['bg1'] = pygame.image.load("assets/image/platform/pl1/bg1.png").convert() # Assuming pl1 is your scene1 folder
-        assets['floor1_1'] = pygame.image.load("assets/image/platform/pl1/floor1_1.png").convert_alpha()
-        assets['floor1_2'] = pygame.image.load("assets/image/platform/pl1/floor1_2.png").convert_alpha()
-        assets['floor1_3'] = pygame.image.load("assets/image/platform/pl1/floor1_3.png").convert_alpha() # Corrected key
-        assets['floor1_4'] = pygame.image.load("assets/image/platform/pl1/floor1_4.png").convert_alpha()
-        assets['wall1'] = pygame.image.load("assets/image/platform/pl1/wall1.png").convert_alpha() # Assuming wall1 is the left wall
-        assets['truth_seeker_img'] = pygame.image.load("assets/image/truth_seeker.gif").convert_alpha() # Corrected path assuming .gif
-
-        # Scene 2 Assets (already partially there, consolidated)
-        assets['second_bg'] = pygame.image.load("assets/image/platform/pl2/bg2.png").convert() # Renamed from main_bg potentially
-        assets['floor1_img'] = pygame.image.load("assets/image/platform/pl2/floor2_1.png").convert_alpha() # This was your 'floor1_img' for scene 2
-        assets['floor2_img'] = pygame.image.load("assets/image/platform/pl2/floor2_2.png").convert_alpha()
-        assets['platform_img'] = pygame.image.load("assets/image/platform/pl2/platform2.png").convert_alpha()
-        assets['benchbottom_img'] = pygame.image.load("assets/image/platform/pl2/benchbottom.png").convert_alpha()
-        assets['benchside2_1_img'] = pygame.image.load("assets/image/platform/pl2/benchside2_1.png").convert_alpha()
-        assets['benchside2_2_img'] = pygame.image.load("assets/image/platform/pl2/benchside2_2.png").convert_alpha()
-        assets['wall_img'] = pygame.image.load("assets/image/platform/pl2/wall2_1.png").convert_alpha()   
-        assets['steelsoul_img'] = pygame.image.load("assets/image/steelsoul.png").convert_alpha() # Assuming steelsoul is a character or item in scene 2
-
-        # Scene 3 Assets
-        assets['bg3'] = pygame.transform.scale(pygame.image.load("assets/image/platform/pl3/bg3.png").convert(), (1600, screen_height_for_scaling))
-        assets['floor3_1'] = pygame.image.load("assets/image/platform/pl3/floor3_1.png").convert_alpha()
-        assets['floor3_2'] = pygame.image.load("assets/image/platform/pl3/floor3_2.png").convert_alpha()
-        assets['upfloor3_1'] = pygame.image.load("assets/image/platform/pl3/upfloor3_1.png").convert_alpha()
-        assets['upfloor3_2'] = pygame.image.load("assets/image/platform/pl3/upfloor3_2.png").convert_alpha()
-        assets['upfloor3_3'] = pygame.image.load("assets/image/platform/pl3/upfloor3_3.png").convert_alpha()
-        assets['upfloor3_4'] = pygame.image.load("assets/image/platform/pl3/upfloor3_4.png").convert_alpha()
-        assets['upfloor3_5'] = pygame.image.load("assets/image/platform/pl3/upfloor3_5.png").convert_alpha()
-        assets['upfloor3_6'] = pygame.image.load("assets/image/platform/pl3/upfloor3_6.png").convert_alpha()
-        assets['floatfloor3'] = pygame.image.load("assets/image/platform/pl3/floatfloor3.png").convert_alpha()
-        assets['wall3'] = pygame.image.load("assets/image/platform/pl3/wall3.png").convert_alpha()
-        assets['noze_img'] = pygame.image.load("assets/image/noze.png").convert_alpha()
-        
-        # Scene 4 Assets
-        assets['bg4'] = pygame.image.load("assets/image/platform/pl4/bg4.png").convert()
-        assets['floor4_1'] = pygame.image.load("assets/image/platform/pl4/floor4_1.png").convert_alpha()
-        assets['floor4_2'] = pygame.image.load("assets/image/platform/pl4/floor4_2.png").convert_alpha()
-        assets['floor4_3'] = pygame.image.load("assets/image/platform/pl4/floor4_3.png").convert_alpha()
-        assets['wall4_1'] = pygame.image.load("assets/image/platform/pl4/wall4_1.png").convert_alpha()
-        assets['wall4_2'] = pygame.image.load("assets/image/platform/pl4/wall4_2.png").convert_alpha()
-        assets['hornhead_img'] = pygame.image.load("assets/image/Hornhead.png").convert_alpha() 
-
-        # Scene 5 Assets
-        assets['bg5'] = pygame.image.load("assets/image/platform/pl5/bg5.png").convert()
-        assets['floor5_1'] = pygame.image.load("assets/image/platform/pl5/floor5_1.png").convert_alpha()
-        assets['floor5_2'] = pygame.image.load("assets/image/platform/pl5/floor5_2.png").convert_alpha()
-        assets['wall5_1'] = pygame.image.load("assets/image/platform/pl5/wall5_1.png").convert_alpha()
-        assets['wall5_2'] = pygame.image.load("assets/image/platform/pl5/wall5_2.png").convert_alpha()
-
-        # Witcher Assets
-        assets['witcher_img'] = pygame.image.load("assets/image/boss1.png").convert_alpha()
-        assets['witcher2_img'] = pygame.image.load("assets/image/boss2.png").convert_alpha() # New Witcher frame
-        assets['bullet_img'] = pygame.image.load("assets/image/bullet.png").convert_alpha()   # New Bullet
-
-        # General Backgrounds (if still used or as fallbacks) - some might be redundant now
-        assets['main_bg'] = assets.get('second_bg') # Default main_bg to scene 2 bg for now
-        # assets['forest_bg'] = pygame.image.load("assets/image/platform/forest_bg.png").convert_alpha() # Example path
-        # assets['mountain_bg'] = pygame.image.load("assets/image/platform/mountain_bg.png").convert_alpha() # Example path
-        # assets['ruins_bg'] = pygame.image.load("assets/image/platform/ruins_bg.png").convert_alpha() # Example path
-
-
-    except pygame.error as e:
+        surface = pygame.image.load(path)
+    except (pygame.error, FileNotFoundError) as e:
         print(f"Error loading an asset in screen.py: {e}")
-    
-    placeholder_surface = pygame.Surface((50,50)); placeholder_surface.fill((255,0,255)) # Magenta
-    keys_to_check = [
-        'start_button_img', 'exit_button_img', 'home_screen',
-        'bg1', 'floor1_1', 'floor1_2', 'floor1_3', 'floor1_4', # scene 1
-        'second_bg', 'floor1_img', 'floor2_img', 'platform_img', # scene 2 (using existing names)
-        'benchbottom_img', 'benchside2_1_img', 'benchside2_2_img', 'wall_img',
-        'truth_seeker_img', 'steelsoul_img', 'noze_img', 'hornhead_img', 
-        'bg3', 'floor3_1', 'floor3_2', 'upfloor3_1', 'upfloor3_2', 'upfloor3_3', 'upfloor3_4', # scene 3
-        'upfloor3_5', 'upfloor3_6', 'floatfloor3', 'wall3',
-        'bg4', 'floor4_1', 'floor4_2', 'floor4_3', 'wall4_1', 'wall4_2', # scene 4
-        'bg5', 'floor5_1', 'floor5_2', 'wall5_1', 'wall5_2', # scene 5
-        'witcher_img', 'witcher2_img', 'bullet_img', # witcher
-        'main_bg', 'forest_bg', 'mountain_bg', 'ruins_bg' # general backgrounds
-    ]
-    for key in keys_to_check:
-        if key not in assets:
-            assets[key] = placeholder_surface
-            print(f"Using placeholder for missing asset: {key}")
-    return assets
+        surface = None
+    startup_profiler.asset("decode", path, start, surface)
+    return surface
+
+def _convert_image(surface, alpha=True, scale_to=None, path=None):
+    """Converts a decoded image to the display format (main thread only), optionally rescaled. `path` only names it for the startup profile."""
+    start = time.perf_counter()
+    surface = surface.convert_alpha() if alpha else surface.convert()
+    if scale_to:
+        surface = pygame.transform.scale(surface, scale_to)
+    startup_profiler.asset("convert", path or "?", start, surface)
+    return surface
+
+def _load_image(path, alpha=True, scale_to=None):
+    """Loads and converts one image, in its fastest blit format (see blit_format). Returns None (and logs) if it is missing or unreadable."""
+    surface = _decode_image(path)
+    return fast_format(_convert_image(surface, alpha, scale_to, path))[0] if surface else None
 
 def draw_background_scaled_with_camera(screen, background_surface, camera_world_view_rect, screen_render_width, screen_render_height):
     """
@@ -143,6 +81,11 @@ def draw_background_scaled_with_camera(screen, background_surface, camera_world_
         # Clamped view is invalid or has no area
         return
 
+    if clamped_view_rect.size == (screen_render_width, screen_render_height):
+        # No zoom: copy the visible area straight across, nothing to rescale
+        screen.blit(background_surface, (0, 0), clamped_view_rect)
+        return
+
     try:
         # Take the subsurface corresponding to what the camera sees in the world
         bg_sub_view = background_surface.subsurface(clamped_view_rect)
@@ -159,29 +102,193 @@ def draw_background_scaled_with_camera(screen, background_surface, camera_world_
         print(f"  Clamped_view_rect: {clamped_view_rect}")
         # screen.fill((25,0,0)) # Fallback color to indicate an error
 
-def draw_objects(screen, player, platforms, npcs, enemies_list, projectiles_list, camera_rect, zoom): # Added projectiles_list
+def build_static_layer(background_surface, platforms, world_width, world_height):
+    """
+    Composites the scene background and every (static) platform into one
+    world-sized surface. Built once per load_scene; each frame only the part
+    seen by the camera is blitted, so the platform count no longer matters.
+    """
+    layer = pygame.Surface((max(1, world_width), max(1, world_height))).convert()
+    for _ in static_layer_steps(layer, background_surface, platforms): pass
+    return layer
+
+def static_layer_steps(layer, background_surface, platforms):
+    """Draws build_static_layer's content into `layer`, yielding after the background and after each platform."""
+    if background_surface:
+        layer.blit(_fit(background_surface, layer.get_size()), (0, 0))
+    else:
+        layer.fill((30,30,30)) # Fallback bg color
+    yield
+
     for platform in platforms:
-        platform.draw(screen, camera_rect, zoom)
+        if not platform.image or platform.rect.width <= 0 or platform.rect.height <= 0: continue
+        if not platform.rect.colliderect(layer.get_rect()): continue # Outside the world, never visible
+        layer.blit(_fit(platform.image, platform.rect.size), platform.rect.topleft)
+        yield
+
+def _fit(surface, size):
+    """`surface` at `size`; asset variants usually have it already, then nothing is rescaled."""
+    return surface if surface.get_size() == tuple(size) else pygame.transform.scale(surface, size)
+
+# Per-frame culling counters, refreshed by every draw_objects call
+render_stats = {'drawn': 0, 'culled': 0}
+
+def draw_objects(screen, player, platforms, npcs, enemies_list, projectile_pool, camera_rect, zoom, cull_margin=64): # projectile_pool: ProjectilePool or None
+    sprite_cache.set_zoom(zoom) # Cached transforms are only valid for one zoom level
+    # Anything not touching the camera view (plus a margin) is skipped before any scaling work
+    view_rect = camera_rect.inflate(cull_margin * 2, cull_margin * 2)
+    drawn = 0
+    culled = 0
+
+    for platform in platforms:
+        if view_rect.colliderect(platform.rect):
+            platform.draw(screen, camera_rect, zoom); drawn += 1
+        else: culled += 1
     
     for npc_instance in npcs: 
         if npc_instance.active: 
-            npc_instance.draw(screen, camera_rect, zoom)
+            if view_rect.colliderect(npc_instance.rect):
+                npc_instance.draw(screen, camera_rect, zoom); drawn += 1
+            else: culled += 1
 
     for enemy in enemies_list: 
         if enemy.alive:
-            enemy.draw(screen, camera_rect, zoom)
+            if view_rect.colliderect(enemy.rect):
+                enemy.draw(screen, camera_rect, zoom); drawn += 1
+            else: culled += 1
 
-    for projectile in projectiles_list: # DRAW PROJECTILES
-        if projectile.alive:
-            projectile.draw(screen, camera_rect, zoom)
+    if projectile_pool: # DRAW PROJECTILES, all in one batched blit
+        pool_drawn, pool_culled = projectile_pool.draw(screen, camera_rect, zoom, view_rect)
+        drawn += pool_drawn; culled += pool_culled
 
     if player and player.alive:
-        player.draw(screen, camera_rect, zoom)
+        player.draw(screen, camera_rect, zoom); drawn += 1
+
+    render_stats['drawn'] = drawn
+    render_stats['culled'] = culled
  
 
+def entity_screen_rect(world_rect, camera_rect, zoom):
+    """Screen-space rect an object with `world_rect` is drawn into (same maths as the draw() methods)."""
+    return pygame.Rect(int((world_rect.x - camera_rect.x) * zoom), int((world_rect.y - camera_rect.y) * zoom),
+                       int(world_rect.width * zoom), int(world_rect.height * zoom))
+
+def collect_entity_screen_rects(player, npcs, enemies_list, projectile_pool, camera_rect, zoom, cull_margin=64):
+    """Screen rects of every dynamic object draw_objects would draw this frame."""
+    view_rect = camera_rect.inflate(cull_margin * 2, cull_margin * 2)
+    rects = []
+    for npc_instance in npcs:
+        if npc_instance.active and view_rect.colliderect(npc_instance.rect):
+            rects.append(entity_screen_rect(npc_instance.rect, camera_rect, zoom))
+    for enemy in enemies_list:
+        if enemy.alive and view_rect.colliderect(enemy.rect):
+            rects.append(entity_screen_rect(enemy.rect, camera_rect, zoom))
+    if projectile_pool:
+        rects.extend(projectile_pool.screen_rects(camera_rect, zoom, view_rect))
+    if player and player.alive:
+        rects.append(entity_screen_rect(player.rect, camera_rect, zoom))
+    return rects
+
+def merge_rects(rects, bounds):
+    """Clips rects to `bounds` and unions overlapping ones until the result is disjoint."""
+    merged = []
+    for rect in rects:
+        rect = rect.inflate(2, 2).clip(bounds) # 1px slack for the int() rounding in draw()
+        if rect.width <= 0 or rect.height <= 0: continue
+        hit = rect.collidelist(merged)
+        while hit != -1:
+            rect = rect.union(merged.pop(hit))
+            hit = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+class DirtyRectRenderer:
+    """
+    Keeps the camera's view of the static layer in a screen-sized surface and tracks
+    the screen rects drawn last frame, so a frame can be produced by restoring only
+    the old + new rects of moving things and presenting them with display.update.
+    Any camera scroll, zoom change or new static layer (scene change) forces a full redraw.
+    """
+    def __init__(self, screen_size):
+        self.screen_size = screen_size
+        self.background_frame = pygame.Surface(screen_size).convert()
+        self.previous_rects = []
+        self.last_layer = None
+        self.last_camera_rect = None
+        self.last_zoom = None
+        self.full_redraws = 0
+        self.partial_redraws = 0
+
+    def invalidate(self):
+        self.last_layer = None
+
+    def needs_full_redraw(self, static_layer, camera_rect, zoom):
+        return (self.last_layer is None or static_layer is not self.last_layer or
+                camera_rect != self.last_camera_rect or zoom != self.last_zoom)
+
+    def capture_background(self, static_layer, camera_rect, zoom):
+        self.background_frame.fill((10, 10, 10)) # Default dark background
+        draw_background_scaled_with_camera(self.background_frame, static_layer, camera_rect, *self.screen_size)
+        self.last_layer = static_layer
+        self.last_camera_rect = camera_rect.copy()
+        self.last_zoom = zoom
+
+    def restore(self, screen, current_rects):
+        """Paints the cached background over last frame's and this frame's rects; returns the merged dirty rects."""
+        dirty_rects = merge_rects(self.previous_rects + current_rects, screen.get_rect())
+        for rect in dirty_rects:
+            screen.blit(self.background_frame, rect.topleft, rect)
+        return dirty_rects
+
+    def present(self, current_rects, dirty_rects=None):
+        """Shows the frame: the whole screen if dirty_rects is None, otherwise just those areas."""
+        self.previous_rects = current_rects
+        if dirty_rects is None:
+            pygame.display.flip()
+            self.full_redraws += 1
+        else:
+            pygame.display.update(dirty_rects)
+            self.partial_redraws += 1
+
+class OverlayPool:
+    """
+    Translucent SRCALPHA surfaces created once per size and reused every frame.
+    panel() returns a prebuilt, read-only panel for a (size, color, border_radius);
+    scratch() returns a reusable surface the caller redraws itself (e.g. the darkness overlay).
+    """
+    def __init__(self, max_panels=64):
+        self.max_panels = max_panels
+        self.panels = {}
+        self.scratch_surfaces = {}
+
+    def panel(self, size, color, border_radius=0):
+        key = (tuple(size), tuple(color), border_radius)
+        surface = self.panels.get(key)
+        if surface is None:
+            if len(self.panels) >= self.max_panels:
+                self.panels.clear() # Only a handful of sizes are ever live, start over
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            if border_radius:
+                pygame.draw.rect(surface, color, surface.get_rect(), border_radius=border_radius)
+            else:
+                surface.fill(color)
+            self.panels[key] = surface
+        return surface
+
+    def scratch(self, size, tag):
+        key = (tuple(size), tag)
+        surface = self.scratch_surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            self.scratch_surfaces[key] = surface
+        return surface
+
+# Shared instance for pause, prompt, choice box and darkness overlays
+overlay_pool = OverlayPool()
+
 def draw_darkness_with_light(screen, player, camera_rect, zoom, light_radius=120):
     if not player: return
-    overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+    overlay = overlay_pool.scratch(screen.get_size(), 'darkness')
     overlay.fill((0, 0, 0, 180)) 
 
     player_screen_pos = (
@@ -194,21 +301,82 @@ def draw_darkness_with_light(screen, player, camera_rect, zoom, light_radius=120
     screen.blit(overlay, (0, 0))
 
 
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by (font, text, color, antialias, background),
+    so HUD strings and dialog lines are only re-rendered when their value changes.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, aa, color, bkg=None):
+        """Same arguments as font.render, with the font first."""
+        key = (font, text, tuple(color), aa, tuple(bkg) if bkg else None)
+        image = self.entries.get(key)
+        if image:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = font.render(text, aa, color, bkg)
+        if bkg: image.set_colorkey(bkg)
+        self.entries[key] = image
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return image
+
+# Shared instance for HUD, prompts and dialog text
+text_cache = TextCache()
+
+_wrap_cache = OrderedDict() # (font, text, width) -> tuple of wrapped lines
+_WRAP_CACHE_MAX_ENTRIES = 128
+
+def _find_line_break(text, font, width):
+    """Length of the first line of `text` that fits in `width`, breaking after a space when possible."""
+    # Binary search for the first prefix that reaches the width (prefix widths only grow)
+    lo, hi = 1, len(text)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if font.size(text[:mid])[0] < width: lo = mid + 1
+        else: hi = mid
+    i = lo
+    if i < len(text):
+        space_break = text.rfind(" ", 0, i) + 1
+        if space_break > 0: i = space_break # A single word wider than the box is cut where it overflows
+    return i
+
+def wrap_text(text, font, width):
+    """Splits `text` into lines no wider than `width`. Layouts are memoized per (font, text, width)."""
+    key = (font, text, width)
+    lines = _wrap_cache.get(key)
+    if lines is not None:
+        _wrap_cache.move_to_end(key)
+        return lines
+
+    lines = []
+    while text:
+        i = _find_line_break(text, font, width)
+        lines.append(text[:i])
+        text = text[i:]
+    lines = tuple(lines)
+    _wrap_cache[key] = lines
+    if len(_wrap_cache) > _WRAP_CACHE_MAX_ENTRIES:
+        _wrap_cache.popitem(last=False)
+    return lines
+
 def draw_text(surface, text, font, color, rect, aa=True, bkg=None): # Keep your text wrapper
     y = rect.top
     line_spacing = -2
     font_height = font.size("Tg")[1]
-    while text:
-        i = 1
+    consumed = 0
+    for line in wrap_text(text, font, rect.width):
         if y + font_height > rect.bottom: break
-        while font.size(text[:i])[0] < rect.width and i < len(text):
-            i += 1
-        if i < len(text): i = text.rfind(" ", 0, i) + 1
-        
-        image = font.render(text[:i], aa, color, bkg)
-        if bkg: image.set_colorkey(bkg)
-        
+        image = text_cache.render(font, line, aa, color, bkg)
         surface.blit(image, (rect.left, y))
         y += font_height + line_spacing
-        text = text[i:]
-    return text
+        consumed += len(line)
+    return text[consumed:]
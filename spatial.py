@@ -0,0 +1,110 @@
+# spatial.py
+
+class StaticGrid:
+    """
+    Uniform-grid broadphase for objects that never move (platforms).
+    Built once per scene from the platform list; query() returns only the
+    objects whose rect overlaps the given (swept) rect, in their original
+    list order so collision resolution behaves exactly like a full scan.
+    """
+    def __init__(self, objects, cell_size=128):
+        self.cell_size = cell_size
+        self.objects = list(objects)
+        self.cells = {} # (cx, cy) -> list of object indices, ascending
+        for index, obj in enumerate(self.objects):
+            for cell in self._cells_for(obj.rect):
+                self.cells.setdefault(cell, []).append(index)
+
+    def _cells_for(self, rect):
+        cs = self.cell_size
+        x0, y0 = rect.left // cs, rect.top // cs
+        x1, y1 = (rect.right - 1) // cs, (rect.bottom - 1) // cs
+        for cx in range(x0, max(x0, x1) + 1):
+            for cy in range(y0, max(y0, y1) + 1):
+                yield (cx, cy)
+
+    def query(self, rect):
+        """Objects overlapping `rect`, in the order they were given to the grid."""
+        cells = self.cells
+        found = set()
+        for cell in self._cells_for(rect):
+            indices = cells.get(cell)
+            if indices:
+                found.update(indices)
+        objects = self.objects
+        return [objects[i] for i in sorted(found) if rect.colliderect(objects[i].rect)]
+
+class DynamicGrid:
+    """
+    Loose uniform grid for things that move (enemies, NPCs, projectiles, the player).
+    Cleared and refilled every physics step: each object goes into the single cell
+    holding its rect's center, and queries widen their search by the largest half
+    size inserted so far, so inserting stays O(1) whatever the object size.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {} # (cx, cy) -> list of (order, kind, obj)
+        self.count = 0
+        self.max_half_w = 0
+        self.max_half_h = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+        self.max_half_w = 0
+        self.max_half_h = 0
+
+    def insert(self, obj, kind):
+        rect = obj.rect
+        cs = self.cell_size
+        cell = (rect.centerx // cs, rect.centery // cs)
+        self.cells.setdefault(cell, []).append((self.count, kind, obj))
+        self.count += 1
+        half_w, half_h = (rect.width + 1) // 2, (rect.height + 1) // 2
+        if half_w > self.max_half_w: self.max_half_w = half_w
+        if half_h > self.max_half_h: self.max_half_h = half_h
+
+    def insert_all(self, objects, kind):
+        for obj in objects:
+            self.insert(obj, kind)
+
+    def _candidates(self, left, top, right, bottom, kind):
+        """Entries whose center cell lies in the (loosened) area, in insertion order."""
+        cs = self.cell_size
+        x0, y0 = int((left - self.max_half_w) // cs), int((top - self.max_half_h) // cs)
+        x1, y1 = int((right + self.max_half_w) // cs), int((bottom + self.max_half_h) // cs)
+        cells = self.cells
+        found = []
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            # Area spans more cells than are occupied: walk the occupied ones instead
+            for (cx, cy), entries in cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    found.extend(entries)
+        else:
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    entries = cells.get((cx, cy))
+                    if entries:
+                        found.extend(entries)
+        found.sort(key=lambda entry: entry[0])
+        return [(k, obj) for _, k, obj in found if kind is None or k == kind]
+
+    def query_rect(self, rect, kind=None):
+        """Objects (of `kind`, if given) whose rect overlaps `rect`, in insertion order."""
+        return [obj for _, obj in self._candidates(rect.left, rect.top, rect.right, rect.bottom, kind)
+                if rect.colliderect(obj.rect)]
+
+    def nearest_within(self, point, radius, kind=None, predicate=None):
+        """
+        The object (of `kind`, passing `predicate`) whose rect center is closest to
+        `point` and at most `radius` away. Ties go to the object inserted first.
+        """
+        px, py = point
+        best, best_dist_sq = None, radius * radius
+        for _, obj in self._candidates(px - radius, py - radius, px + radius, py + radius, kind):
+            cx, cy = obj.rect.center
+            dist_sq = (cx - px) ** 2 + (cy - py) ** 2
+            if dist_sq <= best_dist_sq and (best is None or dist_sq < best_dist_sq):
+                if predicate is None or predicate(obj):
+                    best, best_dist_sq = obj, dist_sq
+        return best
@@ -0,0 +1,75 @@
+# sprite_cache.py
+import pygame
+from collections import OrderedDict
+
+class SpriteCache:
+    """
+    Shared LRU cache of scaled / flipped copies of sprite frames.
+    Entries are keyed by (source surface, target size, flip_x) and the total
+    size of the cached surfaces is kept under max_bytes.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # key -> (surface, bytes)
+        self.current_bytes = 0
+        self.zoom = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_zoom(self, zoom):
+        """Drops every cached surface when the zoom level changes."""
+        if zoom != self.zoom:
+            self.clear()
+            self.zoom = zoom
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def get(self, surface, size, flip_x=False):
+        """Returns `surface` flipped (optional) and scaled to `size`, reusing earlier results."""
+        size = (int(size[0]), int(size[1]))
+        if not flip_x and size == surface.get_size():
+            self.hits += 1 # Nothing to transform, the source can be blitted directly
+            return surface
+
+        key = (surface, size, flip_x)
+        entry = self.entries.get(key)
+        if entry:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        transformed = surface
+        if flip_x:
+            transformed = pygame.transform.flip(transformed, True, False)
+        if transformed.get_size() != size:
+            transformed = pygame.transform.scale(transformed, size)
+        if transformed.get_colorkey():
+            transformed.set_colorkey(transformed.get_colorkey(), pygame.RLEACCEL) # Transforms keep the colorkey but not its RLE
+
+        entry_bytes = transformed.get_pitch() * transformed.get_height()
+        if entry_bytes > self.max_bytes:
+            return transformed # Too big to keep, hand it back uncached
+
+        self.entries[key] = (transformed, entry_bytes)
+        self.current_bytes += entry_bytes
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+        return transformed
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.current_bytes,
+        }
+
+# Shared instance used by every draw() method
+sprite_cache = SpriteCache()
@@ -0,0 +1,133 @@
+# startup_profile.py
+import json
+import time
+import threading
+from contextlib import contextmanager
+import pygame
+
+def surface_format(surface):
+    """Short description of a surface's pixel format, e.g. '32bpp alpha', '32bpp colorkey' or '24bpp'."""
+    if surface is None: return "-"
+    alpha = " alpha" if surface.get_flags() & pygame.SRCALPHA else " colorkey" if surface.get_colorkey() else ""
+    return f"{surface.get_bitsize()}bpp{alpha}"
+
+class StartupProfiler:
+    """
+    Records how long startup takes and where: named phases (pygame.init, fonts, the first
+    load_scene...) and every image decode, cache read, convert, resample and format pass,
+    with the bytes and pixel format of the surface it produced. Does nothing until enabled, so the hooks
+    in screen.py, asset_cache.py and asset_manager.py cost a flag check otherwise.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.events = [] # dicts: kind, name, start, end, thread, bytes, format (times in seconds since origin)
+        self.lock = threading.Lock() # Decodes also run on the prefetch worker
+
+    def enable(self):
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.events = []
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add("phase", name, start, None)
+
+    def asset(self, kind, path, start, surface):
+        """One image operation on `path` that began at perf_counter() `start` and produced `surface` (None if it failed)."""
+        if self.enabled:
+            self._add(kind, path, start, surface)
+
+    def _add(self, kind, name, start, surface):
+        end = time.perf_counter()
+        event = {
+            'kind': kind,
+            'name': name,
+            'start': start - self.origin,
+            'end': end - self.origin,
+            'thread': threading.current_thread().name,
+            'bytes': surface.get_width() * surface.get_height() * surface.get_bytesize() if surface else 0,
+            'format': surface_format(surface) if kind != "phase" else "",
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def report(self):
+        """Events sorted by duration, longest first, plus the total time and bytes per kind."""
+        with self.lock:
+            events = sorted(self.events, key=lambda e: -(e['end'] - e['start']))
+        totals = {}
+        for e in events:
+            total = totals.setdefault(e['kind'], {'count': 0, 'seconds': 0.0, 'bytes': 0})
+            total['count'] += 1
+            total['seconds'] += e['end'] - e['start']
+            total['bytes'] += e['bytes']
+        return {'events': events, 'totals': totals}
+
+    def write_chrome_trace(self, path):
+        """Writes the events in Chrome's trace format (open with chrome://tracing or ui.perfetto.dev)."""
+        with self.lock:
+            events = list(self.events)
+        threads = {name: tid for tid, name in enumerate(dict.fromkeys(e['thread'] for e in events), start=1)}
+        trace = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                 for name, tid in threads.items()]
+        for e in events:
+            trace.append({
+                "name": e['name'], "cat": e['kind'], "ph": "X", "pid": 1, "tid": threads[e['thread']],
+                "ts": round(e['start'] * 1e6, 1), "dur": round((e['end'] - e['start']) * 1e6, 1),
+                "args": {"bytes": e['bytes'], "format": e['format']} if e['kind'] != "phase" else {},
+            })
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+# Shared instance the loading code reports to; main.py enables it for --profile-startup
+startup_profiler = StartupProfiler()
+
+def run_startup_profile(trace_path="startup_trace.json"):
+    """
+    Starts the game the way a player does, up to the first rendered frame of scene 1
+    (as if Start was clicked at once), with the profiler on. Writes the Chrome trace to
+    `trace_path` and returns the report.
+    """
+    startup_profiler.enable()
+    with startup_profiler.phase("startup"):
+        with startup_profiler.phase("import game"):
+            from game import Game
+        with startup_profiler.phase("Game.__init__"):
+            game = Game()
+        with startup_profiler.phase("menu frame"):
+            game.render(game.physics_dt)
+        with startup_profiler.phase("first load_scene"):
+            game.state = "playing" # What clicking Start does
+            game.reset_game()
+        with startup_profiler.phase("first frame"):
+            game.render(game.physics_dt)
+    game.assets.shutdown()
+    pygame.quit()
+    startup_profiler.write_chrome_trace(trace_path)
+    report = startup_profiler.report()
+    report['trace'] = trace_path
+    return report
+
+def print_startup_profile(report, limit=40):
+    events = report['events']
+    phases = [e for e in events if e['kind'] == "phase"]
+    assets = [e for e in events if e['kind'] != "phase"]
+    print("Startup phases (longest first):")
+    for e in phases:
+        print(f"  {(e['end'] - e['start']) * 1000:9.1f} ms  {e['name']}")
+    print(f"\nImage operations (longest {min(limit, len(assets))} of {len(assets)}):")
+    print(f"  {'ms':>9}  {'KB':>8}  {'format':<12}{'kind':<10}{'thread':<15}path")
+    for e in assets[:limit]:
+        print(f"  {(e['end'] - e['start']) * 1000:9.2f}  {e['bytes'] / 1024:8.0f}  {e['format']:<12}{e['kind']:<10}{e['thread']:<15}{e['name']}")
+    print("\nTotals per kind:")
+    for kind, total in sorted(report['totals'].items(), key=lambda item: -item[1]['seconds']):
+        print(f"  {kind:<10}{total['count']:5d} x  {total['seconds'] * 1000:9.1f} ms  {total['bytes'] / (1024 * 1024):8.1f} MB")
+    print(f"\nChrome trace written to {report['trace']}")
@@ -0,0 +1,73 @@
+# tests/test_asset_cache.py
+import os
+import pygame
+import pytest
+import asset_cache
+from asset_cache import AssetCache, HEADER
+
+def source_image(tmp_path, name="src.png", color=(10, 20, 30, 255)):
+    path = str(tmp_path / name)
+    surface = pygame.Surface((8, 6), pygame.SRCALPHA)
+    surface.fill(color)
+    pygame.image.save(surface, path)
+    return path, surface
+
+def saved_cache(tmp_path):
+    path, surface = source_image(tmp_path)
+    cache = AssetCache(str(tmp_path / "cache.bin"))
+    cache.put(path, True, None, surface)
+    assert cache.save()
+    return cache, path
+
+def test_save_replaces_the_mapped_file(tmp_path):
+    cache, path = saved_cache(tmp_path)
+    old_mapping = cache.mapped
+    assert cache.lookup(path, True) is not None # Converted and dropped, as AssetManager does
+    other, surface = source_image(tmp_path, "other.png", (200, 0, 0, 255))
+    cache.put(other, True, None, surface)
+    assert cache.save()
+    assert old_mapping.closed # Unmapped before the file was replaced
+    assert pygame.image.tobytes(cache.lookup(other, True), "RGBA") == pygame.image.tobytes(surface, "RGBA")
+    assert cache.lookup(path, True) is not None # Old entries were carried over
+
+def test_save_waits_while_a_lookup_still_uses_the_mapping(tmp_path):
+    cache, path = saved_cache(tmp_path)
+    unconverted = cache.lookup(path, True)
+    other, surface = source_image(tmp_path, "other.png")
+    cache.put(other, True, None, surface)
+    assert not cache.save()
+    assert pygame.image.tobytes(unconverted, "RGBA")[:4] == bytes((10, 20, 30, 255)) # Still readable
+    del unconverted
+    assert cache.save() # The new entry was kept for this
+    assert cache.lookup(other, True) is not None
+
+@pytest.mark.parametrize("damage", ["truncated", "index"])
+def test_corrupt_file_is_rebuilt(tmp_path, damage):
+    cache, path = saved_cache(tmp_path)
+    cache._close()
+    with open(cache.path, "r+b") as f:
+        if damage == "truncated":
+            f.truncate(HEADER.size - 3)
+        else:
+            f.seek(HEADER.size)
+            f.write(b"\xff" * 16)
+            f.seek(-8, os.SEEK_END)
+            f.write(b"\xff" * 8) # Breaks the JSON index
+    rebuilt = AssetCache(cache.path)
+    assert rebuilt.index == {} and rebuilt.lookup(path, True) is None
+    _, surface = source_image(tmp_path)
+    rebuilt.put(path, True, None, surface)
+    assert rebuilt.save()
+    assert AssetCache(cache.path).lookup(path, True) is not None
+
+def test_hit_does_not_hash_an_unchanged_source(tmp_path, monkeypatch):
+    cache, path = saved_cache(tmp_path)
+    reopened = AssetCache(cache.path)
+    monkeypatch.setattr(asset_cache, "_source_hash", lambda path: pytest.fail("hashed " + path))
+    assert reopened.lookup(path, True) is not None
+
+def test_changed_source_is_a_miss(tmp_path):
+    cache, path = saved_cache(tmp_path)
+    source_image(tmp_path, color=(99, 99, 99, 255)) # Same file, new content
+    os.utime(path, ns=(0, 12345)) # Even if its size did not change, its mtime did
+    assert AssetCache(cache.path).lookup(path, True) is None
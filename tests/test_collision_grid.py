@@ -0,0 +1,96 @@
+# tests/test_collision_grid.py
+import random
+import numpy as np
+import pygame
+import pytest
+from collision_grid import CollisionGrid
+from gameobject import Platform
+from scene_registry import compile_scenes
+from asset_manager import DEFAULT_WORLD_SIZE
+
+SCENES = list(compile_scenes())
+LAYER_FILTERS = {
+    'ground': lambda platform: not platform.is_wall,
+    'wall': lambda platform: platform.is_wall,
+    'solid': lambda platform: True,
+}
+
+def scene_platforms(scene):
+    return [Platform(x, y, width, height, None, is_wall) for x, y, width, height, _, is_wall in scene.platform_definitions]
+
+def brute_rect(platforms, layer, rect):
+    """What the grid answers, the way the rect-based checks did it: colliderect against every platform."""
+    return any(platform.rect.colliderect(rect) for platform in platforms if LAYER_FILTERS[layer](platform))
+
+def probes(scene, count=400, seed=1):
+    """Random probe rects over the scene's world, a little beyond its edges, and on platform borders."""
+    rng = random.Random(seed)
+    width, height = scene.world_dimensions or DEFAULT_WORLD_SIZE
+    rects = []
+    for _ in range(count):
+        rects.append(pygame.Rect(rng.randint(-50, width + 50), rng.randint(-50, height + 50), rng.randint(0, 120), rng.randint(0, 120)))
+    for x, y, w, h, _, _ in scene.platform_definitions:
+        for px, py in ((x - 1, y - 1), (x, y), (x + w - 1, y + h - 1), (x + w, y + h)):
+            rects.append(pygame.Rect(px, py, 1, 1))
+            rects.append(pygame.Rect(px - 3, py, 6, 1))
+            rects.append(pygame.Rect(px, py - 3, 1, 6))
+    return rects
+
+def grid_answers(grid, rect, layer):
+    """Every probe of the grid that asks about `rect` (point, row and column probes for thin rects)."""
+    answers = {'rect_any': grid.rect_any(rect, layer)}
+    if rect.height == 1:
+        answers['row_span'] = grid.row_span(rect.top, rect.left, rect.right, layer)
+        answers['row_spans'] = bool(grid.row_spans(np.array([rect.top]), np.array([rect.left]), np.array([rect.right]), layer)[0])
+    if rect.width == 1:
+        answers['column_span'] = grid.column_span(rect.left, rect.top, rect.bottom, layer)
+    if rect.size == (1, 1):
+        answers['point'] = grid.point(rect.left, rect.top, layer)
+        answers['points'] = bool(grid.points(np.array([rect.left]), np.array([rect.top]), layer)[0])
+    return answers
+
+def thin_probes(rect):
+    """The probe rect plus its top row, left column and top-left pixel, so every probe kind is exercised."""
+    return [rect, pygame.Rect(rect.left, rect.top, rect.width, 1), pygame.Rect(rect.left, rect.top, 1, rect.height),
+            pygame.Rect(rect.topleft, (1, 1))]
+
+@pytest.mark.parametrize("scene", SCENES, ids=[scene.id for scene in SCENES])
+def test_exact_at_cell_size_1(scene):
+    platforms = scene_platforms(scene)
+    width, height = scene.world_dimensions or DEFAULT_WORLD_SIZE
+    grid = CollisionGrid(platforms, width, height, cell_size=1)
+    for probe in probes(scene):
+        for rect in thin_probes(probe):
+            for layer in LAYER_FILTERS:
+                expected = brute_rect(platforms, layer, rect)
+                for name, answer in grid_answers(grid, rect, layer).items():
+                    assert answer == expected, (name, layer, rect)
+
+@pytest.mark.parametrize("cell_size", [4, 8])
+@pytest.mark.parametrize("scene", SCENES, ids=[scene.id for scene in SCENES])
+def test_bigger_cells_only_over_report(scene, cell_size):
+    platforms = scene_platforms(scene)
+    width, height = scene.world_dimensions or DEFAULT_WORLD_SIZE
+    grid = CollisionGrid(platforms, width, height, cell_size=cell_size)
+    for probe in probes(scene):
+        for rect in thin_probes(probe):
+            for layer in LAYER_FILTERS:
+                expected = brute_rect(platforms, layer, rect)
+                # A false positive is only allowed within one cell of a platform
+                near = brute_rect(platforms, layer, rect.inflate(2 * cell_size, 2 * cell_size))
+                for name, answer in grid_answers(grid, rect, layer).items():
+                    if expected: assert answer, (name, layer, rect) # Never misses a platform
+                    elif answer: assert near, (name, layer, rect)
+
+def test_vectorized_probes_match_scalar():
+    scene = SCENES[0]
+    grid = CollisionGrid(scene_platforms(scene), *(scene.world_dimensions or DEFAULT_WORLD_SIZE), cell_size=4)
+    rng = np.random.default_rng(3)
+    y = rng.integers(-20, 620, 500)
+    x0 = rng.integers(-20, 1220, 500)
+    x1 = x0 + rng.integers(-5, 80, 500) # Includes empty and reversed spans
+    spans = grid.row_spans(y, x0, x1)
+    points = grid.points(x0, y)
+    for i in range(len(y)):
+        assert spans[i] == grid.row_span(int(y[i]), int(x0[i]), int(x1[i]))
+        assert points[i] == grid.point(int(x0[i]), int(y[i]))
@@ -0,0 +1,61 @@
+# tests/test_enemy_edges.py
+import pygame
+import pytest
+from collision_grid import CollisionGrid
+from enemy import Enemy
+from enemy_batch import EnemyBatch
+from gameobject import Platform
+
+DT = 1.0 / 60.0
+FAR_AWAY = pygame.Rect(5000, 5000, 40, 50) # The player, out of every enemy's reach
+
+def make_enemy(edge_aware):
+    frames = {name: pygame.Surface((60, 60)) for name in ('idle', 'walk1', 'walk2', 'attack1', 'attack2', 'attack3')}
+    enemy = Enemy(180, 340, 60, 60, frames, edge_aware=edge_aware)
+    enemy.patrol_bounds = (-1000, 1000) # Only the ledge can turn it around
+    enemy.on_ground = True
+    return enemy
+
+def ledge_world():
+    """One 200 px ledge (x 100-300, top at y 400) above an empty world."""
+    platforms = [Platform(100, 400, 200, 30, None)]
+    return platforms, CollisionGrid(platforms, 1200, 600, cell_size=4)
+
+def run_scalar(enemy, platforms, grid, steps):
+    trace = []
+    for step in range(steps):
+        enemy.update(DT, FAR_AWAY, platforms, step * DT, None, grid)
+        trace.append((tuple(enemy.rect), enemy.direction))
+    return trace
+
+def run_batched(enemy, platforms, grid, steps):
+    batch = EnemyBatch()
+    trace = []
+    for step in range(steps):
+        batch.update([enemy], DT, FAR_AWAY, platforms, step * DT, None, grid)
+        trace.append((tuple(enemy.rect), enemy.direction))
+    return trace
+
+@pytest.mark.parametrize("run", [run_scalar, run_batched], ids=["scalar", "batched"])
+def test_edge_aware_enemy_turns_at_both_edges(run):
+    platforms, grid = ledge_world()
+    enemy = make_enemy(edge_aware=True)
+    trace = run(enemy, platforms, grid, 600) # 10 s at 80 px/s: several crossings of the ledge
+    directions = [direction for _, direction in trace]
+    assert 1 in directions and -1 in directions
+    turns = sum(1 for a, b in zip(directions, directions[1:]) if a != b)
+    assert turns >= 4 # Turned at the right and at the left edge, more than once
+    for (x, y, w, h), _ in trace:
+        assert y + h == 400 # Never walked off
+        assert 100 - w < x < 300 # Its feet always still overlap the ledge
+
+@pytest.mark.parametrize("run", [run_scalar, run_batched], ids=["scalar", "batched"])
+def test_enemy_without_edge_awareness_walks_off(run):
+    platforms, grid = ledge_world()
+    enemy = make_enemy(edge_aware=False)
+    trace = run(enemy, platforms, grid, 200)
+    assert trace[-1][0][1] + 60 > 400 # Fell past the ledge top
+
+def test_scalar_and_batched_paths_agree():
+    platforms, grid = ledge_world()
+    assert run_scalar(make_enemy(True), platforms, grid, 600) == run_batched(make_enemy(True), platforms, grid, 600)
@@ -0,0 +1,34 @@
+# tests/test_image_variants.py
+import pygame
+import pytest
+from asset_cache import _init_display
+from asset_manager import AssetManager, ASSET_FILES
+from asset_store import AssetStore
+from scene_registry import compile_scenes
+
+def scaled_at_load(key, size):
+    """`key` at `size` the way images were loaded before they had variants: converted, then nearest-neighbour scaled."""
+    path, alpha, scale_to = ASSET_FILES[key]
+    surface = pygame.image.load(path)
+    surface = surface.convert_alpha() if alpha else surface.convert()
+    if scale_to: surface = pygame.transform.scale(surface, scale_to)
+    return pygame.transform.scale(surface, size)
+
+def pixels(surface):
+    return pygame.image.tobytes(surface.convert_alpha(), "RGBA")
+
+@pytest.mark.parametrize("key", ["bg3", "floor3_1", "floor3_2"]) # bg3 is scaled to its scale_to first
+def test_variants_look_as_before(key):
+    _init_display()
+    assets = AssetManager(compile_scenes(), prefetch=False, store=AssetStore(), optimize_formats=False)
+    assets.load_keys((key,))
+    for size, surface in assets.variants(key).surfaces.items():
+        assert pixels(surface) == pixels(scaled_at_load(key, size)), size
+    assets.shutdown()
+
+def test_worker_read_leaves_only_converting():
+    _init_display()
+    assets = AssetManager(compile_scenes(), prefetch=False, store=AssetStore())
+    cached, made = assets._read_variants("floor3_1") # What the prefetch worker does
+    assert not cached and sorted(made) == assets.variant_plans["floor3_1"] # Already at their sizes
+    assets.shutdown()
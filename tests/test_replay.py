@@ -0,0 +1,60 @@
+# tests/test_replay.py
+import pygame
+import replay
+from benchmark import ScriptedKeys
+from game import Game
+
+class Session:
+    """Drives a Game frame by frame the way replay.run_replay does, recording the input."""
+    def __init__(self, path):
+        self.game = Game(seed=5, asset_cache_path=None)
+        self.recorder = replay.InputRecorder(str(path))
+        self.keys = ScriptedKeys(frozenset())
+        self.game.get_key_state = lambda: self.keys
+
+    def frame(self, events=(), held=()):
+        self.keys = ScriptedKeys(frozenset(held))
+        self.recorder.begin_frame(list(events), self.keys)
+        self.game.handle_events(list(events))
+        if self.game.state == "playing":
+            self.game.step_simulation()
+        self.recorder.end_frame(1)
+
+    def frames_until(self, done, limit, **frame_input):
+        for _ in range(limit):
+            if done(): return
+            self.frame(**frame_input)
+        assert done()
+
+def key(k):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, mod=0, unicode="", scancode=0)
+
+def click(pos):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=tuple(pos))
+
+def test_dialog_choice_click_replays_headless(tmp_path):
+    path = tmp_path / "choice.json.gz"
+    session = Session(path)
+    game = session.game
+    session.frame([click((game.WIDTH // 2, game.HEIGHT // 2 - 40))]) # Start
+    session.frames_until(lambda: game.current_scene_id == "scene2", 1, events=[key(pygame.K_PAGEDOWN)])
+    session.frames_until(lambda: game.current_scene_id == "scene3", 1, events=[key(pygame.K_PAGEDOWN)])
+    # Noze stands on the ledge above the cave floor: go down to the floor, then jump up onto it from the right
+    session.frames_until(lambda: game.player.rect.bottom >= 560, 600, held=[pygame.K_RIGHT])
+    session.frames_until(lambda: game.player.rect.x <= 760, 600, held=[pygame.K_LEFT])
+    session.frame([key(pygame.K_SPACE)], held=[pygame.K_LEFT])
+    noze_reachable = lambda: game.npc_interaction_candidate is not None and game.npc_interaction_candidate.name == "noze"
+    session.frames_until(noze_reachable, 200, held=[pygame.K_LEFT])
+    session.frames_until(lambda: game.dialog_choice_active, 20, events=[key(pygame.K_e)])
+
+    # Nothing has been drawn: the option rects must exist anyway
+    no_rect = game.choice_option_rects[game.dialog_choice_options.index("No")]
+    session.frame([click(no_rect.center)])
+    assert not game.dialog_choice_active
+    assert game.story_flags["noze_item_declined"]
+    for _ in range(30): session.frame()
+    session.recorder.save(game)
+    game.assets.shutdown()
+
+    report = replay.run_replay(str(path))
+    assert report["match"], report
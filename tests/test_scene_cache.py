@@ -0,0 +1,50 @@
+# tests/test_scene_cache.py
+from asset_manager import ASSET_FILES, STORE_OWNER
+from game import Game
+
+ROUTE = ("scene1", "scene2", "scene3", "scene4", "scene5") # One more scene than the cache keeps
+
+def visit_all():
+    game = Game(seed=1, asset_cache_path=None)
+    game.state = "playing"
+    for scene_id in ROUTE:
+        game.load_scene(scene_id)
+    return game
+
+def held_by_assets(assets, key):
+    """True if every surface of `key` still has an AssetManager reference in the store."""
+    path, alpha, scale_to = ASSET_FILES[key]
+    if assets.atlas and key in assets.atlas: return True # An atlas view, not in the store
+    if assets.surfaces[key] is assets.placeholder: return True # Missing file: nothing stored
+    variants = assets.variant_sets.get(key)
+    sizes = list(variants.surfaces) if variants else [scale_to]
+    entries = [assets.store.entries.get(assets.store.content_key(path, alpha, size)) for size in sizes]
+    return all(entry and STORE_OWNER in entry.owners for entry in entries)
+
+def test_cached_scenes_keep_their_assets():
+    game = visit_all()
+    cached = list(game.scene_cache.instances)
+    assert "scene1" not in cached # Evicted, and unpinned with it
+    assert list(game.assets.pinned_scenes) == cached
+    for scene_id in cached:
+        for key in game.assets.scene_keys[scene_id]:
+            assert key in game.assets.surfaces, (scene_id, key)
+            assert held_by_assets(game.assets, key), (scene_id, key)
+    game.assets.shutdown()
+
+def test_cached_scene_is_entered_without_loading_assets():
+    game = visit_all()
+    misses, loads = game.assets.prefetch_misses, game.assets.loads
+    game.load_scene("scene2") # Visited three scenes ago: no longer among the resident scenes, but cached
+    assert game.scene_cache.hits == 1
+    assert game.assets.prefetch_misses == misses
+    assert game.assets.loads == loads
+    game.assets.shutdown()
+
+def test_clearing_the_scene_cache_unpins():
+    game = visit_all()
+    game.clear_scene_cache()
+    assert game.assets.pinned_scenes == ()
+    assert set(game.assets.resident_scenes) == {"scene4", "scene5"}
+    assert all(key in game.assets._needed_keys() for key in game.assets.surfaces)
+    game.assets.shutdown()